@@ -3,14 +3,19 @@
 Command line tool to validate Office document XML files against XSD schemas and tracked changes.
 
 Usage:
-    python validate.py <dir> --original <original_file>
+    python validate.py <dir> --original <original_file> [--jobs N]
 """
 
 import argparse
 import sys
 from pathlib import Path
 
-from validation import DOCXSchemaValidator, PPTXSchemaValidator, RedliningValidator
+from validation import (
+    BaseSchemaValidator,
+    DOCXSchemaValidator,
+    PPTXSchemaValidator,
+    RedliningValidator,
+)
 
 
 def main():
@@ -30,6 +35,13 @@ def main():
         action="store_true",
         help="Enable verbose output",
     )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of worker processes for XSD validation (default: 1)",
+    )
     args = parser.parse_args()
 
     # Validate paths
@@ -55,7 +67,12 @@ def main():
     # Run validators
     success = True
     for V in validators:
-        validator = V(unpacked_dir, original_file, verbose=args.verbose)
+        if issubclass(V, BaseSchemaValidator):
+            validator = V(
+                unpacked_dir, original_file, verbose=args.verbose, jobs=args.jobs
+            )
+        else:
+            validator = V(unpacked_dir, original_file, verbose=args.verbose)
         if not validator.validate():
             success = False
 
@@ -2,11 +2,12 @@
 Validator for tracked changes in Word documents.
 """
 
-import subprocess
-import tempfile
+import difflib
 import zipfile
 from pathlib import Path
 
+import lxml.etree
+
 
 class RedliningValidator:
     """Validator for tracked changes in Word documents."""
@@ -27,92 +28,73 @@ class RedliningValidator:
             print(f"FAILED - Modified document.xml not found at {modified_file}")
             return False
 
-        # First, check if there are any tracked changes by Claude to validate
+        # Extract the text without Claude's tracked changes; the same pass tells
+        # whether there are any tracked changes by Claude to validate
         try:
-            import xml.etree.ElementTree as ET
-
-            tree = ET.parse(modified_file)
-            root = tree.getroot()
-
-            # Check for w:del or w:ins tags authored by Claude
-            del_elements = root.findall(".//w:del", self.namespaces)
-            ins_elements = root.findall(".//w:ins", self.namespaces)
-
-            # Filter to only include changes by Claude
-            claude_del_elements = [
-                elem
-                for elem in del_elements
-                if elem.get(f"{{{self.namespaces['w']}}}author") == "Claude"
-            ]
-            claude_ins_elements = [
-                elem
-                for elem in ins_elements
-                if elem.get(f"{{{self.namespaces['w']}}}author") == "Claude"
-            ]
-
-            # Redlining validation is only needed if tracked changes by Claude have been used.
-            if not claude_del_elements and not claude_ins_elements:
-                if self.verbose:
-                    print("PASSED - No tracked changes by Claude found.")
-                return True
-
-        except Exception:
-            # If we can't parse the XML, continue with full validation
-            pass
-
-        # Create temporary directory for unpacking original docx
-        with tempfile.TemporaryDirectory() as temp_dir:
-            temp_path = Path(temp_dir)
-
-            # Unpack original docx
-            try:
-                with zipfile.ZipFile(self.original_docx, "r") as zip_ref:
-                    zip_ref.extractall(temp_path)
-            except Exception as e:
-                print(f"FAILED - Error unpacking original docx: {e}")
-                return False
-
-            original_file = temp_path / "word" / "document.xml"
-            if not original_file.exists():
-                print(
-                    f"FAILED - Original document.xml not found in {self.original_docx}"
-                )
-                return False
-
-            # Parse both XML files using xml.etree.ElementTree for redlining validation
-            try:
-                import xml.etree.ElementTree as ET
-
-                modified_tree = ET.parse(modified_file)
-                modified_root = modified_tree.getroot()
-                original_tree = ET.parse(original_file)
-                original_root = original_tree.getroot()
-            except ET.ParseError as e:
-                print(f"FAILED - Error parsing XML files: {e}")
-                return False
-
-            # Remove Claude's tracked changes from both documents
-            self._remove_claude_tracked_changes(original_root)
-            self._remove_claude_tracked_changes(modified_root)
-
-            # Extract and compare text content
-            modified_text = self._extract_text_content(modified_root)
-            original_text = self._extract_text_content(original_root)
-
-            if modified_text != original_text:
-                # Show detailed character-level differences for each paragraph
-                error_message = self._generate_detailed_diff(
-                    original_text, modified_text
-                )
-                print(error_message)
-                return False
+            modified_paragraphs, has_claude_changes = self._extract_paragraphs(
+                modified_file
+            )
+        except lxml.etree.XMLSyntaxError as e:
+            print(f"FAILED - Error parsing XML files: {e}")
+            return False
 
+        # Redlining validation is only needed if tracked changes by Claude have been used.
+        if not has_claude_changes:
             if self.verbose:
-                print("PASSED - All changes by Claude are properly tracked")
+                print("PASSED - No tracked changes by Claude found.")
             return True
 
-    def _generate_detailed_diff(self, original_text, modified_text):
-        """Generate detailed word-level differences using git word diff."""
+        # Read the original document.xml without unpacking the original docx
+        try:
+            original_file = self._open_original_document()
+        except (OSError, zipfile.BadZipFile) as e:
+            print(f"FAILED - Error unpacking original docx: {e}")
+            return False
+
+        if original_file is None:
+            print(f"FAILED - Original document.xml not found in {self.original_docx}")
+            return False
+
+        try:
+            with original_file:
+                original_paragraphs, _ = self._extract_paragraphs(original_file)
+        except lxml.etree.XMLSyntaxError as e:
+            print(f"FAILED - Error parsing XML files: {e}")
+            return False
+        except (OSError, zipfile.BadZipFile) as e:
+            print(f"FAILED - Error unpacking original docx: {e}")
+            return False
+
+        if modified_paragraphs != original_paragraphs:
+            # Show detailed character-level differences for each paragraph
+            error_message = self._generate_detailed_diff(
+                original_paragraphs, modified_paragraphs
+            )
+            print(error_message)
+            return False
+
+        if self.verbose:
+            print("PASSED - All changes by Claude are properly tracked")
+        return True
+
+    def _open_original_document(self):
+        """Open the original word/document.xml, or return None if it is missing.
+
+        The file is read straight from the original docx; an unpacked original
+        directory is read in place.
+        """
+        if self.original_docx.is_dir():
+            original_file = self.original_docx / "word" / "document.xml"
+            return original_file.open("rb") if original_file.exists() else None
+
+        with zipfile.ZipFile(self.original_docx, "r") as zip_ref:
+            try:
+                return zip_ref.open("word/document.xml")
+            except KeyError:
+                return None
+
+    def _generate_detailed_diff(self, original_paragraphs, modified_paragraphs):
+        """Generate detailed character-level differences of the changed paragraphs."""
         error_parts = [
             "FAILED - Document text doesn't match after removing Claude's tracked changes",
             "",
@@ -125,154 +107,143 @@ class RedliningValidator:
             "  - To reject another's INSERTION: Nest <w:del> inside their <w:ins>",
             "  - To restore another's DELETION: Add new <w:ins> AFTER their <w:del>",
             "",
+            "Differences:",
+            "============",
+            self._get_paragraph_diff(original_paragraphs, modified_paragraphs),
         ]
+        return "\n".join(error_parts)
 
-        # Show git word diff
-        git_diff = self._get_git_word_diff(original_text, modified_text)
-        if git_diff:
-            error_parts.extend(["Differences:", "============", git_diff])
-        else:
-            error_parts.append("Unable to generate word diff (git not available)")
+    def _get_paragraph_diff(self, original_paragraphs, modified_paragraphs):
+        """Generate a word diff of the paragraphs that differ.
 
-        return "\n".join(error_parts)
+        Paragraphs are aligned as whole (hashed) strings first, so identical
+        paragraphs are skipped and only changed ones are compared character by
+        character. Like git's plain word diff, each changed paragraph is shown
+        on one line with removed text as [-...-] and added text as {+...+}.
+        """
+        prefix, suffix = _common_affixes(original_paragraphs, modified_paragraphs)
+        original_paragraphs = original_paragraphs[
+            prefix : len(original_paragraphs) - suffix
+        ]
+        modified_paragraphs = modified_paragraphs[
+            prefix : len(modified_paragraphs) - suffix
+        ]
 
-    def _get_git_word_diff(self, original_text, modified_text):
-        """Generate word diff using git with character-level precision."""
-        try:
-            with tempfile.TemporaryDirectory() as temp_dir:
-                temp_path = Path(temp_dir)
-
-                # Create two files
-                original_file = temp_path / "original.txt"
-                modified_file = temp_path / "modified.txt"
-
-                original_file.write_text(original_text, encoding="utf-8")
-                modified_file.write_text(modified_text, encoding="utf-8")
-
-                # Try character-level diff first for precise differences
-                result = subprocess.run(
-                    [
-                        "git",
-                        "diff",
-                        "--word-diff=plain",
-                        "--word-diff-regex=.",  # Character-by-character diff
-                        "-U0",  # Zero lines of context - show only changed lines
-                        "--no-index",
-                        str(original_file),
-                        str(modified_file),
-                    ],
-                    capture_output=True,
-                    text=True,
-                )
-
-                if result.stdout.strip():
-                    # Clean up the output - remove git diff header lines
-                    lines = result.stdout.split("\n")
-                    # Skip the header lines (diff --git, index, +++, ---, @@)
-                    content_lines = []
-                    in_content = False
-                    for line in lines:
-                        if line.startswith("@@"):
-                            in_content = True
-                            continue
-                        if in_content and line.strip():
-                            content_lines.append(line)
-
-                    if content_lines:
-                        return "\n".join(content_lines)
-
-                # Fallback to word-level diff if character-level is too verbose
-                result = subprocess.run(
-                    [
-                        "git",
-                        "diff",
-                        "--word-diff=plain",
-                        "-U0",  # Zero lines of context
-                        "--no-index",
-                        str(original_file),
-                        str(modified_file),
-                    ],
-                    capture_output=True,
-                    text=True,
-                )
-
-                if result.stdout.strip():
-                    lines = result.stdout.split("\n")
-                    content_lines = []
-                    in_content = False
-                    for line in lines:
-                        if line.startswith("@@"):
-                            in_content = True
-                            continue
-                        if in_content and line.strip():
-                            content_lines.append(line)
-                    return "\n".join(content_lines)
-
-        except (subprocess.CalledProcessError, FileNotFoundError, Exception):
-            # Git not available or other error, return None to use fallback
-            pass
-
-        return None
-
-    def _remove_claude_tracked_changes(self, root):
-        """Remove tracked changes authored by Claude from the XML root."""
-        ins_tag = f"{{{self.namespaces['w']}}}ins"
-        del_tag = f"{{{self.namespaces['w']}}}del"
-        author_attr = f"{{{self.namespaces['w']}}}author"
-
-        # Remove w:ins elements
-        for parent in root.iter():
-            to_remove = []
-            for child in parent:
-                if child.tag == ins_tag and child.get(author_attr) == "Claude":
-                    to_remove.append(child)
-            for elem in to_remove:
-                parent.remove(elem)
-
-        # Unwrap content in w:del elements where author is "Claude"
-        deltext_tag = f"{{{self.namespaces['w']}}}delText"
-        t_tag = f"{{{self.namespaces['w']}}}t"
-
-        for parent in root.iter():
-            to_process = []
-            for child in parent:
-                if child.tag == del_tag and child.get(author_attr) == "Claude":
-                    to_process.append((child, list(parent).index(child)))
-
-            # Process in reverse order to maintain indices
-            for del_elem, del_index in reversed(to_process):
-                # Convert w:delText to w:t before moving
-                for elem in del_elem.iter():
-                    if elem.tag == deltext_tag:
-                        elem.tag = t_tag
-
-                # Move all children of w:del to its parent before removing w:del
-                for child in reversed(list(del_elem)):
-                    parent.insert(del_index, child)
-                parent.remove(del_elem)
-
-    def _extract_text_content(self, root):
-        """Extract text content from Word XML, preserving paragraph structure.
+        lines = []
+        matcher = difflib.SequenceMatcher(
+            None, original_paragraphs, modified_paragraphs, autojunk=False
+        )
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag == "equal":
+                continue
+            removed = original_paragraphs[i1:i2]
+            added = modified_paragraphs[j1:j2]
+            # Pair up replaced paragraphs; any extra ones were removed or added
+            for original, modified in zip(removed, added):
+                lines.append(_diff_characters(original, modified))
+            lines.extend(f"[-{text}-]" for text in removed[len(added) :])
+            lines.extend(f"{{+{text}+}}" for text in added[len(removed) :])
+        return "\n".join(lines)
+
+    def _extract_paragraphs(self, source):
+        """Stream the paragraph texts of a document.xml, minus Claude's tracked changes.
+
+        Text inside Claude's <w:ins> is dropped and text deleted by Claude is
+        kept, so the result matches the document before Claude's edits. As in
+        the document, a paragraph's text includes that of nested paragraphs
+        (e.g., in text boxes).
 
         Empty paragraphs are skipped to avoid false positives when tracked
         insertions add only structural elements without text content.
+
+        Args:
+            source: Path or binary file object of the document.xml
+
+        Returns:
+            tuple: (paragraph texts, whether tracked changes by Claude were found)
         """
-        p_tag = f"{{{self.namespaces['w']}}}p"
-        t_tag = f"{{{self.namespaces['w']}}}t"
-
-        paragraphs = []
-        for p_elem in root.findall(f".//{p_tag}"):
-            # Get all text elements within this paragraph
-            text_parts = []
-            for t_elem in p_elem.findall(f".//{t_tag}"):
-                if t_elem.text:
-                    text_parts.append(t_elem.text)
-            paragraph_text = "".join(text_parts)
-            # Skip empty paragraphs - they don't affect content validation
-            if paragraph_text:
-                paragraphs.append(paragraph_text)
-
-        return "\n".join(paragraphs)
+        w = self.namespaces["w"]
+        p_tag = f"{{{w}}}p"
+        t_tag = f"{{{w}}}t"
+        deltext_tag = f"{{{w}}}delText"
+        ins_tag = f"{{{w}}}ins"
+        del_tag = f"{{{w}}}del"
+        author_attr = f"{{{w}}}author"
+
+        paragraphs = []  # Paragraph texts in document order, set when they end
+        open_paragraphs = []  # (index, text parts) of the enclosing paragraphs
+        insertions = 0  # Depth of Claude's <w:ins> elements
+        deletions = 0  # Depth of Claude's <w:del> elements
+        has_claude_changes = False
+
+        events = lxml.etree.iterparse(
+            source,
+            events=("start", "end"),
+            tag=(p_tag, t_tag, deltext_tag, ins_tag, del_tag),
+        )
+        for event, elem in events:
+            tag = elem.tag
+            if tag == ins_tag or tag == del_tag:
+                if elem.get(author_attr) == "Claude":
+                    step = 1 if event == "start" else -1
+                    if tag == ins_tag:
+                        insertions += step
+                    else:
+                        deletions += step
+                    has_claude_changes = True
+            elif insertions:
+                continue
+            elif tag == p_tag:
+                if event == "start":
+                    open_paragraphs.append((len(paragraphs), []))
+                    paragraphs.append(None)
+                else:
+                    index, text_parts = open_paragraphs.pop()
+                    paragraphs[index] = "".join(text_parts)
+                    if not open_paragraphs:
+                        elem.clear()
+            elif event == "end" and (
+                tag == t_tag or (tag == deltext_tag and deletions)
+            ):
+                if elem.text:
+                    for _, text_parts in open_paragraphs:
+                        text_parts.append(elem.text)
+
+        return [text for text in paragraphs if text], has_claude_changes
+
+
+def _common_affixes(a, b):
+    """Return the lengths of the common prefix and suffix of two sequences."""
+    limit = min(len(a), len(b))
+    prefix = 0
+    while prefix < limit and a[prefix] == b[prefix]:
+        prefix += 1
+    suffix = 0
+    while suffix < limit - prefix and a[-1 - suffix] == b[-1 - suffix]:
+        suffix += 1
+    return prefix, suffix
+
+
+def _diff_characters(original, modified):
+    """Return modified with character-level [-removed-] and {+added+} markers."""
+    prefix, suffix = _common_affixes(original, modified)
+    original_middle = original[prefix : len(original) - suffix]
+    modified_middle = modified[prefix : len(modified) - suffix]
+
+    parts = [original[:prefix]]
+    matcher = difflib.SequenceMatcher(
+        None, original_middle, modified_middle, autojunk=False
+    )
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            parts.append(original_middle[i1:i2])
+            continue
+        if i1 < i2:
+            parts.append(f"[-{original_middle[i1:i2]}-]")
+        if j1 < j2:
+            parts.append(f"{{+{modified_middle[j1:j2]}+}}")
+    parts.append(original[len(original) - suffix :])
+    return "".join(parts)
 
 
 if __name__ == "__main__":
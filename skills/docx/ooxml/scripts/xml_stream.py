@@ -0,0 +1,69 @@
+"""
+XML serialization helpers shared by the stream engines of pack.py and unpack.py.
+
+Both engines walk lxml iterparse events and write the markup themselves;
+these functions serialize start tags, comments and processing instructions,
+and escape text and attribute values the same way in both directions.
+"""
+
+import lxml.etree
+
+XML_NAMESPACE = "http://www.w3.org/XML/1998/namespace"
+
+
+def reject_entity_declarations(root):
+    """Refuse documents with an internal DTD subset, as defusedxml does."""
+    if root.getroottree().docinfo.internalDTD is not None:
+        raise ValueError("XML with a DTD internal subset is not supported")
+
+
+def qualified_name(element):
+    """Return the prefixed tag name of an lxml element (e.g. "w:p")."""
+    local_name = element.tag.rpartition("}")[2]
+    return f"{element.prefix}:{local_name}" if element.prefix else local_name
+
+
+def start_tag(element, namespaces, scope):
+    """Serialize a start tag without its closing ">"."""
+    parts = ["<", qualified_name(element)]
+    for prefix, uri in namespaces:
+        name = f"xmlns:{prefix}" if prefix else "xmlns"
+        parts.append(f' {name}="{escape_attribute(uri)}"')
+    for name, value in element.items():
+        if name[0] == "{":
+            uri, _, local_name = name[1:].partition("}")
+            prefix = scope.get(uri) or next(
+                p for p, u in element.nsmap.items() if p and u == uri
+            )
+            name = f"{prefix}:{local_name}"
+        parts.append(f' {name}="{escape_attribute(value)}"')
+    return "".join(parts)
+
+
+def misc_node(node):
+    """Serialize a comment or processing instruction."""
+    if isinstance(node, lxml.etree._Comment):
+        return f"<!--{node.text or ''}-->"
+    return f"<?{node.target} {node.text}?>" if node.text else f"<?{node.target}?>"
+
+
+def escape_text(text):
+    """Escape character data."""
+    if "&" in text:
+        text = text.replace("&", "&amp;")
+    if "<" in text:
+        text = text.replace("<", "&lt;")
+    if ">" in text:
+        text = text.replace(">", "&gt;")
+    return text
+
+
+def escape_attribute(value):
+    """Escape an attribute value for use inside double quotes."""
+    value = escape_text(value)
+    if '"' in value:
+        value = value.replace('"', "&quot;")
+    for char, ref in (("\n", "&#10;"), ("\r", "&#13;"), ("\t", "&#9;")):
+        if char in value:
+            value = value.replace(char, ref)
+    return value
@@ -16,17 +16,23 @@ Usage:
     # Add comments
     doc.add_comment(start=node, end=node, text="Comment text")
     doc.reply_to_comment(parent_comment_id=0, text="Reply text")
+    doc.add_comments([{"start": node, "end": node, "text": "Comment text"}, ...])
 
     # Suggest tracked changes
     doc["word/document.xml"].suggest_deletion(node)  # Delete content
     doc["word/document.xml"].revert_insertion(ins_node)  # Reject insertion
     doc["word/document.xml"].revert_deletion(del_node)  # Reject deletion
+    doc["word/document.xml"].apply_edits([("replace_node", node, xml), ...])  # Many edits
 
     # Save
     doc.save()
+
+    # Parse with lxml instead of minidom (faster, less memory on large documents)
+    doc = Document('workspace/unpacked', backend="lxml")
 """
 
 import html
+import os
 import random
 import shutil
 import tempfile
@@ -34,11 +40,10 @@ from datetime import datetime, timezone
 from pathlib import Path
 
 from defusedxml import minidom
-from ooxml.scripts.pack import pack_document
 from ooxml.scripts.validation.docx import DOCXSchemaValidator
 from ooxml.scripts.validation.redlining import RedliningValidator
 
-from .utilities import XMLEditor
+from .utilities import Fragment, LxmlXMLEditor, XMLEditor
 
 # Path to template files
 TEMPLATE_DIR = Path(__file__).parent / "templates"
@@ -73,18 +78,8 @@ class DocxXMLEditor(XMLEditor):
         self.initials = initials
 
     def _get_next_change_id(self):
-        """Get the next available change ID by checking all tracked change elements."""
-        max_id = -1
-        for tag in ("w:ins", "w:del"):
-            elements = self.dom.getElementsByTagName(tag)
-            for elem in elements:
-                change_id = elem.getAttribute("w:id")
-                if change_id:
-                    try:
-                        max_id = max(max_id, int(change_id))
-                    except ValueError:
-                        pass
-        return max_id + 1
+        """Allocate the next available change ID of the tracked change elements."""
+        return self._allocate_id(("w:ins", "w:del"), "w:id")
 
     def _ensure_w16du_namespace(self):
         """Ensure w16du namespace is declared on the root element."""
@@ -261,6 +256,13 @@ class DocxXMLEditor(XMLEditor):
         self._inject_attributes_to_nodes(nodes)
         return nodes
 
+    def apply_edits(self, edits):
+        """Apply edits with automatic attribute injection."""
+        results = super().apply_edits(edits)
+        for nodes in results:
+            self._inject_attributes_to_nodes(nodes)
+        return results
+
     def revert_insertion(self, elem):
         """Reject an insertion by wrapping its content in a deletion.
 
@@ -336,6 +338,7 @@ class DocxXMLEditor(XMLEditor):
 
             # Inject attributes to the deletion wrapper
             self._inject_attributes_to_nodes([del_wrapper])
+            self.mark_changed([ins_elem])
 
         return [elem]
 
@@ -528,6 +531,7 @@ class DocxXMLEditor(XMLEditor):
 
             # Inject attributes to the deletion wrapper
             self._inject_attributes_to_nodes([del_wrapper])
+            self.mark_changed([del_wrapper])
 
             return del_wrapper
 
@@ -586,6 +590,7 @@ class DocxXMLEditor(XMLEditor):
 
             # Inject attributes to the deletion wrapper
             self._inject_attributes_to_nodes([del_wrapper])
+            self.mark_changed([elem])
 
             return elem
 
@@ -593,6 +598,18 @@ class DocxXMLEditor(XMLEditor):
             raise ValueError(f"Element must be w:r or w:p, got {elem.nodeName}")
 
 
+class LxmlDocxXMLEditor(DocxXMLEditor, LxmlXMLEditor):
+    """DocxXMLEditor that parses with lxml, see LxmlXMLEditor.
+
+    Nodes are lxml elements that also support the minidom API, so all
+    DocxXMLEditor methods work unchanged.
+    """
+
+
+# Editor class used by Document for each backend
+EDITOR_CLASSES = {"minidom": DocxXMLEditor, "lxml": LxmlDocxXMLEditor}
+
+
 def _generate_hex_id() -> str:
     """Generate random 8-character hex ID for para/durable IDs.
 
@@ -609,6 +626,55 @@ def _generate_rsid() -> str:
     return "".join(random.choices("0123456789ABCDEF", k=8))
 
 
+def _link_tree(source, target, suffixes=None):
+    """Mirror a directory with hard links, copying files that cannot be linked.
+
+    A write through a link changes the source file too, so linked files must
+    be replaced (see _replace_file), never rewritten in place.
+
+    Args:
+        source: Directory to mirror
+        target: Directory to create
+        suffixes: Optional tuple of file suffixes to include (default: all files)
+
+    Returns:
+        Set of relative POSIX paths in target that are hard links to source
+    """
+    linked = set()
+    target.mkdir(parents=True)
+    for path in sorted(source.rglob("*")):
+        dest = target / path.relative_to(source)
+        if path.is_dir():
+            dest.mkdir(exist_ok=True)
+        elif suffixes is None or path.suffix in suffixes:
+            try:
+                os.link(path, dest)
+                linked.add(dest.relative_to(target).as_posix())
+            except OSError:
+                # Different filesystem or no hard link support
+                shutil.copy2(path, dest)
+    return linked
+
+
+def _replace_file(source, dest):
+    """Copy source over dest with a rename, so other links keep the old content."""
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=dest.parent, prefix=f".{dest.name}.")
+    os.close(fd)
+    try:
+        shutil.copy2(source, temp_path)
+        os.replace(temp_path, dest)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def _file_signature(path):
+    """Return (inode, size, mtime) used to detect changed workspace files."""
+    stat = path.stat()
+    return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+
 class Document:
     """Manages comments in unpacked Word documents."""
 
@@ -619,31 +685,60 @@ class Document:
         track_revisions=False,
         author="Claude",
         initials="C",
+        backend="minidom",
     ):
         """
         Initialize with path to unpacked Word document directory.
         Automatically sets up comment infrastructure (people.xml, RSIDs).
 
+        Edits happen in a workspace at self.unpacked_path. Its files are hard
+        links to the originals until opened through doc[...], so add new files
+        there freely, but replace existing ones (delete first, or os.replace)
+        instead of writing over them, which would change the original too.
+
         Args:
             unpacked_dir: Path to unpacked DOCX directory (must contain word/ subdirectory)
             rsid: Optional RSID to use for all comment elements. If not provided, one will be generated.
             track_revisions: If True, enables track revisions in settings.xml (default: False)
             author: Default author name for comments (default: "Claude")
             initials: Default author initials for comments (default: "C")
+            backend: XML parser for the editors, "minidom" (default) or "lxml".
+                     "lxml" parses faster and uses less memory on large documents.
         """
+        if backend not in EDITOR_CLASSES:
+            raise ValueError(
+                f"Unknown backend {backend!r}, expected one of {list(EDITOR_CLASSES)}"
+            )
+        self.backend = backend
         self.original_path = Path(unpacked_dir)
 
         if not self.original_path.exists() or not self.original_path.is_dir():
             raise ValueError(f"Directory not found: {unpacked_dir}")
 
-        # Create temporary directory with subdirectories for unpacked content and baseline
-        self.temp_dir = tempfile.mkdtemp(prefix="docx_")
+        # Create copy-on-write workspace: files are hard links to the originals
+        # until opened for editing through __getitem__ (see _materialize).
+        # It sits beside the original when possible, since links cannot cross
+        # filesystems and the system temp directory is often a different one
+        try:
+            self.temp_dir = tempfile.mkdtemp(
+                prefix=".docx_", dir=self.original_path.resolve().parent
+            )
+        except OSError:
+            self.temp_dir = tempfile.mkdtemp(prefix="docx_")
         self.unpacked_path = Path(self.temp_dir) / "unpacked"
-        shutil.copytree(self.original_path, self.unpacked_path)
+        self._linked_parts = _link_tree(self.original_path, self.unpacked_path)
 
-        # Pack original directory into temporary .docx for validation baseline (outside unpacked dir)
-        self.original_docx = Path(self.temp_dir) / "original.docx"
-        pack_document(self.original_path, self.original_docx, validate=False)
+        # Validation baseline links the original XML parts (outside unpacked dir);
+        # it is only read, and save() replaces originals rather than rewriting them
+        self.original_docx = Path(self.temp_dir) / "original"
+        _link_tree(self.original_path, self.original_docx, suffixes=(".xml", ".rels"))
+
+        # Workspace state used by save() to write back only changed files
+        self._signatures = {
+            path.relative_to(self.unpacked_path).as_posix(): _file_signature(path)
+            for path in self.unpacked_path.rglob("*")
+            if path.is_file()
+        }
 
         self.word_path = self.unpacked_path / "word"
 
@@ -704,8 +799,9 @@ class Document:
             file_path = self.unpacked_path / xml_path
             if not file_path.exists():
                 raise ValueError(f"XML file not found: {xml_path}")
+            self._materialize(xml_path)
             # Use DocxXMLEditor with RSID, author, and initials for all editors
-            self._editors[xml_path] = DocxXMLEditor(
+            self._editors[xml_path] = EDITOR_CLASSES[self.backend](
                 file_path, rsid=self.rsid, author=self.author, initials=self.initials
             )
         return self._editors[xml_path]
@@ -830,6 +926,76 @@ class Document:
         self.next_comment_id += 1
         return comment_id
 
+    def add_comments(self, comments) -> list:
+        """
+        Add many comments at once, e.g. the findings of an automated review.
+
+        Same result as calling add_comment() for each spec in order, but every
+        XML part is parsed and updated once for the whole batch instead of once
+        per comment.
+
+        Args:
+            comments: Iterable of dicts with the add_comment() arguments
+                      ("start", "end" and "text")
+
+        Returns:
+            List of the comment IDs created, in order
+
+        Example:
+            ids = doc.add_comments([
+                {"start": node, "end": node, "text": "Define this term"},
+                {"start": para, "end": para, "text": "Needs a citation"},
+            ])
+        """
+        new_comments = {}
+        anchor_edits = []
+        comment_xml = []
+        comment_ex_xml = []
+        comment_id_xml = []
+        comment_extensible_xml = []
+
+        for spec in comments:
+            comment_id = self.next_comment_id + len(new_comments)
+            para_id = _generate_hex_id()
+            durable_id = _generate_hex_id()
+            end = spec["end"]
+
+            # Comment ranges in document.xml, placed as add_comment() does
+            start_xml = self._comment_range_start_xml(comment_id)
+            anchor_edits.append(("insert_before", spec["start"], start_xml))
+            end_action = "append_to" if end.tagName == "w:p" else "insert_after"
+            end_xml = self._comment_range_end_xml(comment_id)
+            anchor_edits.append((end_action, end, end_xml))
+
+            comment_xml.append(self._comment_xml(comment_id, para_id, spec["text"]))
+            comment_ex_xml.append(self._comment_ex_xml(para_id, parent_para_id=None))
+            comment_id_xml.append(self._comment_id_xml(para_id, durable_id))
+            comment_extensible_xml.append(self._comment_extensible_xml(durable_id))
+            new_comments[comment_id] = {"para_id": para_id}
+
+        if not new_comments:
+            return []
+
+        # One pass per part for the whole batch
+        self._document.apply_edits(anchor_edits)
+        for xml_path, root_tag, fragments in (
+            ("word/comments.xml", "w:comments", comment_xml),
+            ("word/commentsExtended.xml", "w15:commentsEx", comment_ex_xml),
+            ("word/commentsIds.xml", "w16cid:commentsIds", comment_id_xml),
+            (
+                "word/commentsExtensible.xml",
+                "w16cex:commentsExtensible",
+                comment_extensible_xml,
+            ),
+        ):
+            self._append_to_comment_part(xml_path, root_tag, fragments)
+
+        # Update existing_comments so replies work
+        self.existing_comments.update(new_comments)
+
+        self.next_comment_id += len(new_comments)
+        return list(new_comments)
+
     def __del__(self):
         """Clean up temporary directory on deletion."""
         if hasattr(self, "temp_dir") and Path(self.temp_dir).exists():
@@ -861,6 +1027,8 @@ class Document:
         Save all modified XML files to disk and copy to destination directory.
 
         This persists all changes made via add_comment() and reply_to_comment().
+        When saving back to the original directory, only files that changed are
+        written; any other destination receives a full copy.
 
         Args:
             destination: Optional path to save to. If None, saves back to original directory.
@@ -881,25 +1049,42 @@ class Document:
 
         # Copy contents from temp directory to destination (or original directory)
         target_path = Path(destination) if destination else self.original_path
-        shutil.copytree(self.unpacked_path, target_path, dirs_exist_ok=True)
+        if target_path.resolve() != self.original_path.resolve():
+            shutil.copytree(self.unpacked_path, target_path, dirs_exist_ok=True)
+            return
+
+        for path in self.unpacked_path.rglob("*"):
+            if path.is_dir():
+                continue
+            rel_path = path.relative_to(self.unpacked_path).as_posix()
+            signature = _file_signature(path)
+            if self._signatures.get(rel_path) != signature:
+                # Replace rather than overwrite, so the baseline keeps the original
+                _replace_file(path, target_path / rel_path)
+                self._signatures[rel_path] = signature
 
     # ==================== Private: Initialization ====================
 
+    def _materialize(self, xml_path):
+        """Give a workspace file its own copy before it is edited.
+
+        Linked files share their content with the original directory, so
+        writing to one in place would change the original too.
+        """
+        rel_path = Path(xml_path).as_posix()
+        if rel_path in self._linked_parts:
+            file_path = self.unpacked_path / rel_path
+            _replace_file(file_path, file_path)
+            self._linked_parts.discard(rel_path)
+            self._signatures[rel_path] = _file_signature(file_path)
+
     def _get_next_comment_id(self):
         """Get the next available comment ID."""
         if not self.comments_path.exists():
             return 0
 
         editor = self["word/comments.xml"]
-        max_id = -1
-        for comment_elem in editor.dom.getElementsByTagName("w:comment"):
-            comment_id = comment_elem.getAttribute("w:id")
-            if comment_id:
-                try:
-                    max_id = max(max_id, int(comment_id))
-                except ValueError:
-                    pass
-        return max_id + 1
+        return editor.get_next_id(("w:comment",), "w:id")
 
     def _load_existing_comments(self):
         """Load existing comments from files to enable replies."""
@@ -1069,91 +1254,126 @@ class Document:
         self, comment_id, para_id, text, author, initials, timestamp
     ):
         """Add a single comment to comments.xml."""
-        if not self.comments_path.exists():
-            shutil.copy(TEMPLATE_DIR / "comments.xml", self.comments_path)
-
-        editor = self["word/comments.xml"]
-        root = editor.get_node(tag="w:comments")
-
-        escaped_text = (
-            text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+        self._append_to_comment_part(
+            "word/comments.xml",
+            "w:comments",
+            [self._comment_xml(comment_id, para_id, text)],
         )
-        # Note: w:rsidR, w:rsidRDefault, w:rsidP on w:p, w:rsidR on w:r,
-        # and w:author, w:date, w:initials on w:comment are automatically added by DocxXMLEditor
-        comment_xml = f'''<w:comment w:id="{comment_id}">
-  <w:p w14:paraId="{para_id}" w14:textId="77777777">
-    <w:r><w:rPr><w:rStyle w:val="CommentReference"/></w:rPr><w:annotationRef/></w:r>
-    <w:r><w:rPr><w:color w:val="000000"/><w:sz w:val="20"/><w:szCs w:val="20"/></w:rPr><w:t>{escaped_text}</w:t></w:r>
-  </w:p>
-</w:comment>'''
-        editor.append_to(root, comment_xml)
 
     def _add_to_comments_extended_xml(self, para_id, parent_para_id):
         """Add a single comment to commentsExtended.xml."""
-        if not self.comments_extended_path.exists():
-            shutil.copy(
-                TEMPLATE_DIR / "commentsExtended.xml", self.comments_extended_path
-            )
-
-        editor = self["word/commentsExtended.xml"]
-        root = editor.get_node(tag="w15:commentsEx")
-
-        if parent_para_id:
-            xml = f'<w15:commentEx w15:paraId="{para_id}" w15:paraIdParent="{parent_para_id}" w15:done="0"/>'
-        else:
-            xml = f'<w15:commentEx w15:paraId="{para_id}" w15:done="0"/>'
-        editor.append_to(root, xml)
+        self._append_to_comment_part(
+            "word/commentsExtended.xml",
+            "w15:commentsEx",
+            [self._comment_ex_xml(para_id, parent_para_id)],
+        )
 
     def _add_to_comments_ids_xml(self, para_id, durable_id):
         """Add a single comment to commentsIds.xml."""
-        if not self.comments_ids_path.exists():
-            shutil.copy(TEMPLATE_DIR / "commentsIds.xml", self.comments_ids_path)
-
-        editor = self["word/commentsIds.xml"]
-        root = editor.get_node(tag="w16cid:commentsIds")
-
-        xml = f'<w16cid:commentId w16cid:paraId="{para_id}" w16cid:durableId="{durable_id}"/>'
-        editor.append_to(root, xml)
+        self._append_to_comment_part(
+            "word/commentsIds.xml",
+            "w16cid:commentsIds",
+            [self._comment_id_xml(para_id, durable_id)],
+        )
 
     def _add_to_comments_extensible_xml(self, durable_id):
         """Add a single comment to commentsExtensible.xml."""
-        if not self.comments_extensible_path.exists():
-            shutil.copy(
-                TEMPLATE_DIR / "commentsExtensible.xml", self.comments_extensible_path
-            )
+        self._append_to_comment_part(
+            "word/commentsExtensible.xml",
+            "w16cex:commentsExtensible",
+            [self._comment_extensible_xml(durable_id)],
+        )
 
-        editor = self["word/commentsExtensible.xml"]
-        root = editor.get_node(tag="w16cex:commentsExtensible")
+    def _append_to_comment_part(self, xml_path, root_tag, xml_contents):
+        """Append XML fragments to the root of a comment part, creating it if needed."""
+        file_path = self.unpacked_path / xml_path
+        if not file_path.exists():
+            shutil.copy(TEMPLATE_DIR / file_path.name, file_path)
 
-        xml = f'<w16cex:commentExtensible w16cex:durableId="{durable_id}"/>'
-        editor.append_to(root, xml)
+        editor = self[xml_path]
+        root = editor.get_node(tag=root_tag)
+        editor.apply_edits([("append_to", root, content) for content in xml_contents])
 
     # ==================== Private: XML Fragments ====================
 
+    def _comment_xml(self, comment_id, para_id, text):
+        """Generate XML for a comment in comments.xml.
+
+        Note: w:rsidR, w:rsidRDefault, w:rsidP on w:p, w:rsidR on w:r,
+        and w:author, w:date, w:initials on w:comment are automatically added by DocxXMLEditor.
+        """
+        return Fragment(
+            '''<w:comment w:id="{comment_id}">
+  <w:p w14:paraId="{para_id}" w14:textId="77777777">
+    <w:r><w:rPr><w:rStyle w:val="CommentReference"/></w:rPr><w:annotationRef/></w:r>
+    <w:r><w:rPr><w:color w:val="000000"/><w:sz w:val="20"/><w:szCs w:val="20"/></w:rPr><w:t>{text}</w:t></w:r>
+  </w:p>
+</w:comment>''',
+            comment_id=comment_id,
+            para_id=para_id,
+            text=text,
+        )
+
+    def _comment_ex_xml(self, para_id, parent_para_id):
+        """Generate XML for a comment in commentsExtended.xml."""
+        if parent_para_id:
+            return Fragment(
+                '<w15:commentEx w15:paraId="{para_id}" w15:paraIdParent="{parent_para_id}" w15:done="0"/>',
+                para_id=para_id,
+                parent_para_id=parent_para_id,
+            )
+        return Fragment(
+            '<w15:commentEx w15:paraId="{para_id}" w15:done="0"/>', para_id=para_id
+        )
+
+    def _comment_id_xml(self, para_id, durable_id):
+        """Generate XML for a comment in commentsIds.xml."""
+        return Fragment(
+            '<w16cid:commentId w16cid:paraId="{para_id}" w16cid:durableId="{durable_id}"/>',
+            para_id=para_id,
+            durable_id=durable_id,
+        )
+
+    def _comment_extensible_xml(self, durable_id):
+        """Generate XML for a comment in commentsExtensible.xml.
+
+        Note: w16cex:dateUtc is automatically added by DocxXMLEditor.
+        """
+        return Fragment(
+            '<w16cex:commentExtensible w16cex:durableId="{durable_id}"/>',
+            durable_id=durable_id,
+        )
+
     def _comment_range_start_xml(self, comment_id):
         """Generate XML for comment range start."""
-        return f'<w:commentRangeStart w:id="{comment_id}"/>'
+        return Fragment('<w:commentRangeStart w:id="{id}"/>', id=comment_id)
 
     def _comment_range_end_xml(self, comment_id):
         """Generate XML for comment range end with reference run.
 
         Note: w:rsidR is automatically added by DocxXMLEditor.
         """
-        return f'''<w:commentRangeEnd w:id="{comment_id}"/>
+        return Fragment(
+            '''<w:commentRangeEnd w:id="{id}"/>
 <w:r>
   <w:rPr><w:rStyle w:val="CommentReference"/></w:rPr>
-  <w:commentReference w:id="{comment_id}"/>
-</w:r>'''
+  <w:commentReference w:id="{id}"/>
+</w:r>''',
+            id=comment_id,
+        )
 
     def _comment_ref_run_xml(self, comment_id):
         """Generate XML for comment reference run.
 
         Note: w:rsidR is automatically added by DocxXMLEditor.
         """
-        return f'''<w:r>
+        return Fragment(
+            '''<w:r>
   <w:rPr><w:rStyle w:val="CommentReference"/></w:rPr>
-  <w:commentReference w:id="{comment_id}"/>
-</w:r>'''
+  <w:commentReference w:id="{id}"/>
+</w:r>''',
+            id=comment_id,
+        )
 
     # ==================== Private: Metadata Updates ====================
 
@@ -2,6 +2,8 @@ from dataclasses import dataclass
 import json
 import sys
 
+from geometry import intersecting_pairs
+
 
 # Script to check that the `fields.json` file that Claude creates when analyzing PDFs
 # does not have overlapping bounding boxes. See forms.md.
@@ -30,10 +32,18 @@ def get_bounding_box_messages(fields_json_stream) -> list[str]:
         rects_and_fields.append(RectAndField(f["label_bounding_box"], "label", f))
         rects_and_fields.append(RectAndField(f["entry_bounding_box"], "entry", f))
 
+    # Only boxes on the same page whose extents intersect need to be compared.
+    indices_by_page = {}
+    for i, rf in enumerate(rects_and_fields):
+        indices_by_page.setdefault(rf.field["page_number"], []).append(i)
+    candidates = {}
+    for indices in indices_by_page.values():
+        for a, b in intersecting_pairs([rects_and_fields[i].rect for i in indices]):
+            candidates.setdefault(indices[a], []).append(indices[b])
+
     has_error = False
     for i, ri in enumerate(rects_and_fields):
-        # This is O(N^2); we can optimize if it becomes a problem.
-        for j in range(i + 1, len(rects_and_fields)):
+        for j in sorted(candidates.get(i, [])):
             rj = rects_and_fields[j]
             if ri.field["page_number"] == rj.field["page_number"] and rects_intersect(ri.rect, rj.rect):
                 has_error = True
@@ -0,0 +1,62 @@
+import unittest
+import random
+import geometry
+from geometry import intersecting_pairs
+
+
+# Currently this is not run automatically in CI; it's just for documentation and manual checking.
+class TestIntersectingPairs(unittest.TestCase):
+
+    def brute_force_pairs(self, boxes):
+        """Helper to compare every pair of boxes directly"""
+        pairs = []
+        for i, a in enumerate(boxes):
+            for j in range(i + 1, len(boxes)):
+                b = boxes[j]
+                if (min(a[0], a[2]) <= max(b[0], b[2]) and min(b[0], b[2]) <= max(a[0], a[2])
+                        and min(a[1], a[3]) <= max(b[1], b[3]) and min(b[1], b[3]) <= max(a[1], a[3])):
+                    pairs.append((i, j))
+        return pairs
+
+    def test_no_boxes(self):
+        """Test that fewer than two boxes have no pairs"""
+        self.assertEqual(intersecting_pairs([]), [])
+        self.assertEqual(intersecting_pairs([[0, 0, 10, 10]]), [])
+
+    def test_overlapping_and_disjoint(self):
+        """Test that only overlapping boxes are paired, in index order"""
+        boxes = [
+            [50, 50, 60, 60],
+            [0, 0, 10, 10],
+            [55, 55, 70, 70],
+            [5, 5, 20, 20],
+            [100, 0, 110, 10],
+        ]
+        self.assertEqual(intersecting_pairs(boxes), [(0, 2), (1, 3)])
+
+    def test_touching_boxes_are_paired(self):
+        """Test that boxes sharing an edge or a corner count as intersecting"""
+        boxes = [[0, 0, 10, 10], [10, 0, 20, 10], [0, 10, 10, 20]]
+        self.assertEqual(intersecting_pairs(boxes), [(0, 1), (0, 2), (1, 2)])
+
+    def test_reversed_edges(self):
+        """Test that edges given in either order describe the same box"""
+        boxes = [[10, 10, 0, 0], [5, 15, 15, 5]]
+        self.assertEqual(intersecting_pairs(boxes), [(0, 1)])
+
+    def test_matches_brute_force(self):
+        """Test both sweeps against comparing every pair"""
+        rng = random.Random(0)
+        for _ in range(200):
+            boxes = [
+                [rng.uniform(0, 100), rng.uniform(0, 100), rng.uniform(0, 100), rng.uniform(0, 100)]
+                for _ in range(rng.randint(2, 40))
+            ]
+            expected = self.brute_force_pairs(boxes)
+            self.assertEqual(sorted(geometry._sweep_python(boxes)), expected)
+            if geometry.np is not None:
+                self.assertEqual(sorted(geometry._sweep_numpy(boxes)), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,29 +3,72 @@
 Tool to pack a directory into a .docx, .pptx, or .xlsx file with XML formatting undone.
 
 Example usage:
-    python pack.py <input_directory> <office_file> [--force]
+    python pack.py <input_directory> <office_file> [--force] [--engine stream]
+    python pack.py <input_directory> <office_file> --original <original_file> --store-media
 """
 
 import argparse
-import shutil
+import io
+import struct
 import subprocess
 import sys
 import tempfile
 import defusedxml.minidom
+import lxml.etree
 import zipfile
+import zlib
 from pathlib import Path
 
+from xml_stream import (
+    XML_NAMESPACE,
+    reject_entity_declarations,
+    qualified_name,
+    start_tag,
+    misc_node,
+    escape_text,
+)
+
+# Available XML condensing engines (see condense_xml_content)
+ENGINES = ("minidom", "stream")
+
+# Already-compressed media that gains nothing from deflate (used by --store-media)
+STORED_MEDIA_COMPRESSION = {
+    ext: (zipfile.ZIP_STORED, None)
+    for ext in (".jpg", ".jpeg", ".png", ".gif", ".tif", ".tiff", ".wdp")
+    + (".mp3", ".m4a", ".mp4", ".m4v", ".mov", ".wmv", ".avi", ".zip")
+}
+
 
 def main():
     parser = argparse.ArgumentParser(description="Pack a directory into an Office file")
     parser.add_argument("input_directory", help="Unpacked Office document directory")
     parser.add_argument("output_file", help="Output Office file (.docx/.pptx/.xlsx)")
     parser.add_argument("--force", action="store_true", help="Skip validation")
+    parser.add_argument(
+        "--engine",
+        choices=ENGINES,
+        default="minidom",
+        help="XML condensing engine; 'stream' uses far less memory on large parts",
+    )
+    parser.add_argument(
+        "--original",
+        help="Original Office file; unchanged members are copied without recompressing",
+    )
+    parser.add_argument(
+        "--store-media",
+        action="store_true",
+        help="Store already-compressed media (JPEG, PNG, video...) without deflate",
+    )
     args = parser.parse_args()
 
     try:
         success = pack_document(
-            args.input_directory, args.output_file, validate=not args.force
+            args.input_directory,
+            args.output_file,
+            validate=not args.force,
+            engine=args.engine,
+            original_file=args.original,
+            compression=STORED_MEDIA_COMPRESSION if args.store_media else None,
         )
 
         # Show warning if validation was skipped
@@ -42,13 +85,30 @@ def main():
         sys.exit(f"Error: {e}")
 
 
-def pack_document(input_dir, output_file, validate=False):
+def pack_document(
+    input_dir,
+    output_file,
+    validate=False,
+    engine="minidom",
+    original_file=None,
+    compression=None,
+    pool=None,
+):
     """Pack a directory into an Office file (.docx/.pptx/.xlsx).
 
     Args:
         input_dir: Path to unpacked Office document directory
         output_file: Path to output Office file
         validate: If True, validates with soffice (default: False)
+        engine: XML condensing engine, "minidom" or "stream" (default: "minidom")
+        original_file: Optional Office file the directory was unpacked from.
+            Members whose content is unchanged are copied from it byte-for-byte,
+            without recompressing; only modified parts are compressed again.
+        compression: Optional dict mapping lowercase file extensions (e.g. ".png")
+            to (compress_type, compresslevel) for newly written members. Other
+            members use (zipfile.ZIP_DEFLATED, None).
+        pool: Optional soffice.SofficePool that runs the validation conversion
+            on a warm LibreOffice instance instead of starting soffice
 
     Returns:
         bool: True if successful, False if validation failed
@@ -60,35 +120,165 @@ def pack_document(input_dir, output_file, validate=False):
         raise ValueError(f"{input_dir} is not a directory")
     if output_file.suffix.lower() not in {".docx", ".pptx", ".xlsx"}:
         raise ValueError(f"{output_file} must be a .docx, .pptx, or .xlsx file")
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine {engine!r}, expected one of {ENGINES}")
+    if original_file is not None:
+        original_file = Path(original_file)
+        if original_file.resolve() == output_file.resolve():
+            raise ValueError("original_file and output_file must be different files")
 
-    # Work in temporary directory to avoid modifying original
-    with tempfile.TemporaryDirectory() as temp_dir:
-        temp_content_dir = Path(temp_dir) / "content"
-        shutil.copytree(input_dir, temp_content_dir)
-
-        # Process XML files to remove pretty-printing whitespace
-        for pattern in ["*.xml", "*.rels"]:
-            for xml_file in temp_content_dir.rglob(pattern):
-                condense_xml(xml_file)
-
-        # Create final Office file as zip archive
-        output_file.parent.mkdir(parents=True, exist_ok=True)
-        with zipfile.ZipFile(output_file, "w", zipfile.ZIP_DEFLATED) as zf:
-            for f in temp_content_dir.rglob("*"):
-                if f.is_file():
-                    zf.write(f, f.relative_to(temp_content_dir))
-
-        # Validate if requested
-        if validate:
-            if not validate_document(output_file):
-                output_file.unlink()  # Delete the corrupt file
-                return False
+    # Stream each part straight into the archive; the input directory is never modified
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    with (
+        zipfile.ZipFile(output_file, "w", zipfile.ZIP_DEFLATED) as zf,
+        _OriginalArchive(original_file) as original,
+    ):
+        for f in input_dir.rglob("*"):
+            if not f.is_file():
+                continue
+            arcname = f.relative_to(input_dir).as_posix()
+            compress_type, compresslevel = (compression or {}).get(
+                f.suffix.lower(), (zipfile.ZIP_DEFLATED, None)
+            )
+            if f.name.endswith((".xml", ".rels")):
+                content = f.read_bytes()
+                if original.is_unchanged_xml(arcname, content):
+                    original.copy_member(arcname, zf)
+                    continue
+                # Remove pretty-printing whitespace in memory
+                zinfo = zipfile.ZipInfo.from_file(f, arcname)
+                zinfo.compress_type = compress_type
+                data = condense_xml_content(content, engine)
+                zf.writestr(zinfo, data, compresslevel=compresslevel)
+            elif original.is_unchanged_file(arcname, f):
+                original.copy_member(arcname, zf)
+            else:
+                # Media and other binary parts are copied through unchanged
+                zf.write(f, arcname, compress_type, compresslevel)
+
+    # Validate if requested
+    if validate:
+        if not validate_document(output_file, pool):
+            output_file.unlink()  # Delete the corrupt file
+            return False
 
     return True
 
 
-def validate_document(doc_path):
-    """Validate document by converting to HTML with soffice."""
+class _OriginalArchive:
+    """Original Office file whose unchanged members can be reused by pack_document.
+
+    Binary members are compared by uncompressed size and CRC-32, as recorded in
+    the zip central directory, so they are never decompressed. XML members are
+    compared by canonical content, so an untouched pretty-printed part matches
+    its original. With no original file, every member is reported as changed.
+    """
+
+    def __init__(self, original_file):
+        self.zip = None
+        self.raw = None  # Separate handle for reading compressed member data
+        if original_file is not None:
+            self.zip = zipfile.ZipFile(original_file)
+            self.raw = open(original_file, "rb")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.zip is not None:
+            self.zip.close()
+            self.raw.close()
+
+    def _reusable_info(self, arcname):
+        """Return the member's ZipInfo if its compressed data can be copied as-is."""
+        if self.zip is None:
+            return None
+        try:
+            info = self.zip.getinfo(arcname)
+        except KeyError:
+            return None
+        if info.flag_bits & 0x1:  # Encrypted
+            return None
+        if max(info.file_size, info.compress_size) >= zipfile.ZIP64_LIMIT:
+            return None
+        return info
+
+    def is_unchanged_file(self, arcname, path):
+        """Check whether a file on disk has the same content as the original member."""
+        info = self._reusable_info(arcname)
+        if info is None or path.stat().st_size != info.file_size:
+            return False
+        crc = 0
+        with open(path, "rb") as f:
+            while chunk := f.read(1 << 20):
+                crc = zlib.crc32(chunk, crc)
+        return crc == info.CRC
+
+    def is_unchanged_xml(self, arcname, content):
+        """Check whether an unpacked XML part has the same content as the original.
+
+        Both sides are compared in canonical form with comments and whitespace-only
+        text between elements removed, so pretty-printing is ignored. Any other
+        difference counts as a change.
+        """
+        info = self._reusable_info(arcname)
+        if info is None:
+            return False
+        try:
+            return _canonical_xml(content) == _canonical_xml(self.zip.read(arcname))
+        except lxml.etree.XMLSyntaxError:
+            return False
+
+    def copy_member(self, arcname, zf):
+        """Append the member's compressed bytes to zf without recompressing them.
+
+        zipfile has no public API for raw copies, so the local header is written
+        from a fresh ZipInfo and the entry is registered the way ZipFile.write does.
+        """
+        info = self._reusable_info(arcname)
+        zinfo = zipfile.ZipInfo(info.filename, info.date_time)
+        zinfo.compress_type = info.compress_type
+        zinfo.CRC = info.CRC
+        zinfo.compress_size = info.compress_size
+        zinfo.file_size = info.file_size
+        zinfo.external_attr = info.external_attr
+
+        # Skip the original local header; its extra field may differ from the central one
+        source = self.raw
+        source.seek(info.header_offset)
+        header = source.read(zipfile.sizeFileHeader)
+        name_length, extra_length = struct.unpack("<HH", header[26:30])
+        source.seek(name_length + extra_length, io.SEEK_CUR)
+
+        zinfo.header_offset = zf.fp.tell()
+        zf.fp.write(zinfo.FileHeader(zip64=False))
+        remaining = info.compress_size
+        while remaining:
+            chunk = source.read(min(remaining, 1 << 20))
+            if not chunk:
+                raise ValueError(f"Truncated member in original file: {arcname}")
+            zf.fp.write(chunk)
+            remaining -= len(chunk)
+        zf.filelist.append(zinfo)
+        zf.NameToInfo[zinfo.filename] = zinfo
+        zf.start_dir = zf.fp.tell()
+
+
+def _canonical_xml(content):
+    """Return the C14N form of XML content, ignoring comments and blank text."""
+    parser = lxml.etree.XMLParser(
+        remove_blank_text=True, remove_comments=True, resolve_entities=False
+    )
+    return lxml.etree.tostring(
+        lxml.etree.fromstring(content, parser=parser), method="c14n"
+    )
+
+
+def validate_document(doc_path, pool=None):
+    """Validate document by converting to HTML with soffice.
+
+    Uses a warm instance from pool (a soffice.SofficePool) when given.
+    """
     # Determine the correct filter based on file extension
     match doc_path.suffix.lower():
         case ".docx":
@@ -100,6 +290,9 @@ def validate_document(doc_path):
 
     with tempfile.TemporaryDirectory() as temp_dir:
         try:
+            if pool is not None:
+                pool.convert(doc_path, temp_dir, filter_name, timeout=10)
+                return True
             result = subprocess.run(
                 [
                     "soffice",
@@ -122,7 +315,7 @@ def validate_document(doc_path):
         except FileNotFoundError:
             print("Warning: soffice not found. Skipping validation.", file=sys.stderr)
             return True
-        except subprocess.TimeoutExpired:
+        except (subprocess.TimeoutExpired, TimeoutError):
             print("Validation error: Timeout during conversion", file=sys.stderr)
             return False
         except Exception as e:
@@ -130,10 +323,31 @@ def validate_document(doc_path):
             return False
 
 
-def condense_xml(xml_file):
-    """Strip unnecessary whitespace and remove comments."""
-    with open(xml_file, "r", encoding="utf-8") as f:
-        dom = defusedxml.minidom.parse(f)
+def condense_xml(xml_file, engine="minidom"):
+    """Strip unnecessary whitespace and remove comments, rewriting the file in place."""
+    xml_file = Path(xml_file)
+    xml_file.write_bytes(condense_xml_content(xml_file.read_bytes(), engine))
+
+
+def condense_xml_content(content, engine="minidom"):
+    """Strip unnecessary whitespace and remove comments from XML content.
+
+    Both engines produce equivalent XML: whitespace-only text is removed except
+    inside prefixed :t elements (w:t, a:t, ...), and comments are dropped. The
+    "stream" engine writes elements as they are parsed instead of building a
+    DOM, so its memory use does not grow with the size of the part.
+
+    Args:
+        content: XML document as bytes
+        engine: "minidom" or "stream" (default: "minidom")
+
+    Returns:
+        bytes: Condensed UTF-8 encoded XML
+    """
+    if engine == "stream":
+        return _condense_xml_stream(content)
+
+    dom = defusedxml.minidom.parseString(content)
 
     # Process each element to remove whitespace and comments
     for element in dom.getElementsByTagName("*"):
@@ -150,9 +364,96 @@ def condense_xml(xml_file):
             ) or child.nodeType == child.COMMENT_NODE:
                 element.removeChild(child)
 
-    # Write back the condensed XML
-    with open(xml_file, "wb") as f:
-        f.write(dom.toxml(encoding="UTF-8"))
+    return dom.toxml(encoding="UTF-8")
+
+
+def _condense_xml_stream(content):
+    """Condense XML from lxml iterparse events without building a full tree.
+
+    Each element is serialized as soon as its events arrive and is then cleared,
+    so only the current ancestor chain stays in memory.
+    """
+    buffer = io.BytesIO()
+    out = io.TextIOWrapper(buffer, encoding="utf-8", newline="")
+    out.write('<?xml version="1.0" encoding="UTF-8"?>')
+
+    pending = None  # (node, "text" | "tail") whose text is not written yet
+    open_tag = False  # Start tag written without its closing ">"
+    new_namespaces = []  # start-ns declarations for the next element
+    scopes = [{XML_NAMESPACE: "xml"}]  # Namespace URI -> prefix for attributes
+
+    events = lxml.etree.iterparse(
+        io.BytesIO(content),
+        events=("start-ns", "start", "end", "comment", "pi"),
+        resolve_entities=False,
+        no_network=True,
+    )
+    for event, node in events:
+        if event == "start-ns":
+            new_namespaces.append(node)
+            continue
+
+        # Write the text that precedes this event
+        if pending is not None:
+            owner, attr = pending
+            text = getattr(owner, attr)
+            if attr == "tail":
+                owner = owner.getparent()
+            if text and owner is not None and (text.strip() or _is_t_element(owner)):
+                if open_tag:
+                    out.write(">")
+                    open_tag = False
+                out.write(escape_text(text))
+            pending = None
+
+        if event == "start":
+            if node.getparent() is None:
+                reject_entity_declarations(node)
+            if open_tag:
+                out.write(">")
+            scope = scopes[-1]
+            if new_namespaces:
+                scope = dict(scope)
+                scope.update((uri, prefix) for prefix, uri in new_namespaces if prefix)
+            scopes.append(scope)
+            out.write(start_tag(node, new_namespaces, scope))
+            new_namespaces = []
+            open_tag = True
+            pending = (node, "text")
+
+        elif event == "end":
+            if open_tag:
+                out.write("/>")
+                open_tag = False
+            else:
+                out.write(f"</{qualified_name(node)}>")
+            scopes.pop()
+            pending = (node, "tail")
+
+            # Drop the written subtree and any written siblings before it
+            node.clear(keep_tail=True)
+            parent = node.getparent()
+            if parent is not None:
+                while node.getprevious() is not None:
+                    del parent[0]
+
+        else:  # comment or processing instruction
+            parent = node.getparent()
+            if event == "pi" or parent is None or _is_t_element(parent):
+                if open_tag:
+                    out.write(">")
+                    open_tag = False
+                out.write(misc_node(node))
+            pending = (node, "tail")
+
+    out.flush()
+    out.detach()
+    return buffer.getvalue()
+
+
+def _is_t_element(element):
+    """Check for a prefixed text element such as w:t or a:t."""
+    return element.prefix is not None and element.tag.endswith("}t")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,451 @@
+#!/usr/bin/env python3
+"""
+Pool of warm headless LibreOffice instances for conversion and recalculation.
+
+Every instance runs with its own user profile (-env:UserInstallation), so
+concurrent instances never fight over ~/.config/libreoffice. Jobs wait for the
+next idle instance; an instance that crashes or exceeds the job timeout is
+killed and restarted.
+
+When the Python UNO bridge (python3-uno) is importable, each instance is a
+long-lived soffice process driven over a named pipe, so jobs do not pay the
+LibreOffice startup cost. Otherwise each job runs a short soffice command
+against the instance's already initialized profile.
+
+Library usage:
+    from soffice import SofficePool
+
+    with SofficePool(size=4) as pool:
+        pdf_path = pool.convert("deck.pptx", "out", "pdf")
+        pool.recalc("model.xlsx")
+
+The pool is thread-safe: submit jobs from up to `size` threads to keep every
+instance busy.
+"""
+
+import atexit
+import concurrent.futures
+import os
+import queue
+import shutil
+import signal
+import subprocess
+import tempfile
+import threading
+import time
+import uuid
+from pathlib import Path
+
+try:
+    import uno
+    from com.sun.star.beans import PropertyValue
+    from com.sun.star.connection import NoConnectException
+except ImportError:
+    uno = None
+
+DEFAULT_TIMEOUT = 60  # Seconds allowed per job
+STARTUP_TIMEOUT = 60  # Seconds allowed for an instance to start
+
+HEADLESS_ARGS = (
+    "--headless",
+    "--invisible",
+    "--nologo",
+    "--nodefault",
+    "--norestore",
+    "--nolockcheck",
+)
+
+# Basic macro used by recalc() when the UNO bridge is not available
+RECALC_MACRO = """<?xml version="1.0" encoding="UTF-8"?>
+<!DOCTYPE script:module PUBLIC "-//OpenOffice.org//DTD OfficeDocument 1.0//EN" "module.dtd">
+<script:module xmlns:script="http://openoffice.org/2000/script" script:name="Module1" script:language="StarBasic">
+    Sub RecalculateAndSave()
+      ThisComponent.calculateAll()
+      ThisComponent.store()
+      ThisComponent.close(True)
+    End Sub
+</script:module>"""
+RECALC_MACRO_URL = (
+    "vnd.sun.star.script:Standard.Module1.RecalculateAndSave"
+    "?language=Basic&location=application"
+)
+
+# Export filters for conversions that name only an extension, like "pdf"
+DEFAULT_FILTERS = {
+    ("pdf", "com.sun.star.presentation.PresentationDocument"): "impress_pdf_Export",
+    ("pdf", "com.sun.star.drawing.DrawingDocument"): "draw_pdf_Export",
+    ("pdf", "com.sun.star.sheet.SpreadsheetDocument"): "calc_pdf_Export",
+    ("pdf", "com.sun.star.text.TextDocument"): "writer_pdf_Export",
+}
+
+
+class SofficeError(RuntimeError):
+    """A LibreOffice job failed or an instance crashed."""
+
+
+class SofficePool:
+    """Fixed number of warm soffice instances that run jobs one at a time each."""
+
+    def __init__(
+        self,
+        size=1,
+        timeout=DEFAULT_TIMEOUT,
+        soffice="soffice",
+        startup_timeout=STARTUP_TIMEOUT,
+    ):
+        """Start the instances.
+
+        Args:
+            size: Number of soffice instances (default: 1)
+            timeout: Default seconds allowed per job (default: 60)
+            soffice: soffice executable (default: "soffice")
+            startup_timeout: Seconds allowed for an instance to start (default: 60)
+
+        Raises:
+            FileNotFoundError: If the soffice executable is not found
+            SofficeError: If an instance fails to start
+            TimeoutError: If an instance does not start in time
+        """
+        if size < 1:
+            raise ValueError("Pool size must be at least 1")
+        self.size = size
+        self.timeout = timeout
+        self.persistent = uno is not None
+        instance_class = _ListenerInstance if self.persistent else _CommandInstance
+        self._instances = [
+            instance_class(soffice, startup_timeout) for _ in range(size)
+        ]
+        self._idle = queue.Queue()
+        self._closed = False
+
+        try:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=size) as executor:
+                for future in [executor.submit(i.start) for i in self._instances]:
+                    future.result()
+        except BaseException:
+            self.close()
+            raise
+        for instance in self._instances:
+            self._idle.put(instance)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def convert(self, input_path, output_dir, convert_to, timeout=None):
+        """Convert a document, like `soffice --convert-to`.
+
+        Args:
+            input_path: Document to convert
+            output_dir: Directory for the converted file
+            convert_to: Target as accepted by --convert-to: an extension with an
+                optional filter name, e.g. "pdf" or "html:HTML (StarCalc)"
+            timeout: Seconds allowed for this job (default: the pool timeout)
+
+        Returns:
+            Path: The converted file, named after input_path with the new extension
+
+        Raises:
+            SofficeError: If the conversion fails
+            TimeoutError: If the conversion does not finish in time
+        """
+        input_path = Path(input_path).absolute()
+        output_path = (
+            Path(output_dir).absolute()
+            / f"{input_path.stem}.{convert_to.partition(':')[0]}"
+        )
+        self._run(
+            lambda instance: instance.convert(
+                input_path, output_path, convert_to, timeout or self.timeout
+            )
+        )
+        return output_path
+
+    def recalc(self, path, timeout=None):
+        """Recalculate all formulas of a spreadsheet and save it in place.
+
+        Args:
+            path: Spreadsheet to recalculate (.xlsx/.ods)
+            timeout: Seconds allowed for this job (default: the pool timeout)
+
+        Raises:
+            SofficeError: If the document cannot be recalculated
+            TimeoutError: If recalculation does not finish in time
+        """
+        path = Path(path).absolute()
+        self._run(lambda instance: instance.recalc(path, timeout or self.timeout))
+
+    def close(self):
+        """Stop all instances and remove their profiles."""
+        self._closed = True
+        for instance in self._instances:
+            instance.close()
+
+    def _run(self, job):
+        """Run job(instance) on the next idle instance."""
+        if self._closed:
+            raise SofficeError("The soffice pool is closed")
+        instance = self._idle.get()
+        try:
+            return job(instance)
+        finally:
+            self._idle.put(instance)
+
+
+_shared_pool = None
+_shared_pool_lock = threading.Lock()
+
+
+def shared_pool(size=1, timeout=DEFAULT_TIMEOUT):
+    """Return the process-wide pool, starting it on first use.
+
+    The pool is closed when the interpreter exits. size and timeout only apply
+    to the call that starts it.
+    """
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is None:
+            _shared_pool = SofficePool(size=size, timeout=timeout)
+            atexit.register(_shared_pool.close)
+        return _shared_pool
+
+
+class _Instance:
+    """One soffice user profile, shared by the jobs of one pool slot."""
+
+    def __init__(self, soffice, startup_timeout):
+        self.soffice = soffice
+        self.startup_timeout = startup_timeout
+        self.profile = Path(tempfile.mkdtemp(prefix="soffice-profile-"))
+
+    def command(self, *args):
+        """Return an soffice command line that uses this instance's profile."""
+        return [
+            self.soffice,
+            f"-env:UserInstallation={self.profile.as_uri()}",
+            *HEADLESS_ARGS,
+            *args,
+        ]
+
+    def close(self):
+        shutil.rmtree(self.profile, ignore_errors=True)
+
+
+class _CommandInstance(_Instance):
+    """Runs each job as a separate soffice command on a prepared profile."""
+
+    def start(self):
+        """Initialize the profile and install the recalculation macro."""
+        self._run_command(["--terminate_after_init"], self.startup_timeout)
+        macro_dir = self.profile / "user" / "basic" / "Standard"
+        macro_dir.mkdir(parents=True, exist_ok=True)
+        (macro_dir / "Module1.xba").write_text(RECALC_MACRO)
+
+    def convert(self, input_path, output_path, convert_to, timeout):
+        args = ["--convert-to", convert_to, "--outdir", str(output_path.parent)]
+        stderr = self._run_command([*args, str(input_path)], timeout)
+        if not output_path.exists():
+            raise SofficeError(stderr.strip() or f"Could not convert {input_path}")
+
+    def recalc(self, path, timeout):
+        self._run_command([RECALC_MACRO_URL, str(path)], timeout)
+
+    def _run_command(self, args, timeout):
+        """Run soffice with this profile and return its stderr.
+
+        The command runs in its own process group so a timeout also kills the
+        soffice.bin child, which would otherwise keep the profile locked.
+        """
+        process = subprocess.Popen(
+            self.command(*args),
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            text=True,
+            start_new_session=True,
+        )
+        try:
+            _, stderr = process.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            _kill_process_group(process)
+            process.communicate()
+            (self.profile / ".lock").unlink(missing_ok=True)
+            raise TimeoutError(f"soffice did not finish within {timeout}s") from None
+        if process.returncode != 0:
+            raise SofficeError(
+                stderr.strip() or f"soffice exited with code {process.returncode}"
+            )
+        return stderr
+
+
+class _ListenerInstance(_Instance):
+    """A long-lived soffice process driven through the UNO bridge."""
+
+    def __init__(self, soffice, startup_timeout):
+        super().__init__(soffice, startup_timeout)
+        self.process = None
+        self.desktop = None
+
+    @property
+    def alive(self):
+        return self.process is not None and self.process.poll() is None
+
+    def start(self):
+        """Start soffice listening on a private pipe and connect to it."""
+        connection = f"pipe,name=soffice-pool-{uuid.uuid4().hex};urp"
+        self.process = subprocess.Popen(
+            self.command(f"--accept={connection};StarOffice.ComponentContext"),
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+
+        local_context = uno.getComponentContext()
+        resolver = local_context.ServiceManager.createInstanceWithContext(
+            "com.sun.star.bridge.UnoUrlResolver", local_context
+        )
+        deadline = time.monotonic() + self.startup_timeout
+        while True:
+            try:
+                context = resolver.resolve(f"uno:{connection};StarOffice.ComponentContext")
+                break
+            except NoConnectException:
+                if not self.alive:
+                    raise SofficeError(
+                        f"soffice exited during startup (code {self.process.returncode})"
+                    ) from None
+                if time.monotonic() > deadline:
+                    self.kill()
+                    raise TimeoutError(
+                        f"soffice did not start within {self.startup_timeout}s"
+                    ) from None
+                time.sleep(0.2)
+        self.desktop = context.ServiceManager.createInstanceWithContext(
+            "com.sun.star.frame.Desktop", context
+        )
+
+    def convert(self, input_path, output_path, convert_to, timeout):
+        extension, _, filter_name = convert_to.partition(":")
+        filter_name, _, filter_options = filter_name.partition(":")
+
+        def job():
+            document = self._load(input_path)
+            try:
+                properties = {
+                    "FilterName": filter_name or _default_filter(document, extension)
+                }
+                if filter_options:
+                    properties["FilterOptions"] = filter_options
+                document.storeToURL(output_path.as_uri(), _properties(**properties))
+            finally:
+                document.close(True)
+
+        self._call(job, timeout)
+
+    def recalc(self, path, timeout):
+        def job():
+            document = self._load(path)
+            try:
+                document.calculateAll()
+                document.store()
+            finally:
+                document.close(True)
+
+        self._call(job, timeout)
+
+    def _load(self, path):
+        document = self.desktop.loadComponentFromURL(
+            path.as_uri(), "_blank", 0, _properties(Hidden=True)
+        )
+        if document is None:
+            raise SofficeError(f"Could not load {path}")
+        return document
+
+    def _call(self, job, timeout):
+        """Run job() against this instance, killing soffice if it takes too long.
+
+        Killing the process makes the pending UNO call fail. An instance that
+        crashed or was killed is restarted before this returns.
+        """
+        if not self.alive:
+            self.restart()
+
+        timed_out = threading.Event()
+
+        def expire():
+            timed_out.set()
+            self.kill()
+
+        watchdog = threading.Timer(timeout, expire)
+        watchdog.start()
+        try:
+            return job()
+        except SofficeError:
+            raise
+        except Exception as e:
+            if timed_out.is_set():
+                raise TimeoutError(f"soffice did not finish within {timeout}s") from None
+            if not self.alive:
+                raise SofficeError("soffice crashed while running the job") from e
+            raise SofficeError(getattr(e, "Message", "") or str(e)) from e
+        finally:
+            watchdog.cancel()
+            if not self.alive:
+                try:
+                    self.restart()
+                except (OSError, SofficeError):
+                    pass  # Retried when the next job starts
+
+    def restart(self):
+        self.kill()
+        self.desktop = None
+        (self.profile / ".lock").unlink(missing_ok=True)
+        self.start()
+
+    def kill(self):
+        if self.process is not None and self.process.poll() is None:
+            _kill_process_group(self.process)
+
+    def close(self):
+        if self.alive and self.desktop is not None:
+            try:
+                self.desktop.terminate()
+            except Exception:
+                pass  # The bridge is disposed while soffice shuts down
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                pass
+        self.kill()
+        self.process = None
+        self.desktop = None
+        super().close()
+
+
+def _kill_process_group(process):
+    """Kill a process started with start_new_session=True and its children."""
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+    process.wait()
+
+
+def _default_filter(document, extension):
+    """Return the export filter soffice would pick for an extension-only target."""
+    for (target, service), filter_name in DEFAULT_FILTERS.items():
+        if target == extension and document.supportsService(service):
+            return filter_name
+    raise SofficeError(f"No default export filter for {extension!r}; name one")
+
+
+def _properties(**values):
+    """Return a tuple of UNO PropertyValue structs."""
+    properties = []
+    for name, value in values.items():
+        prop = PropertyValue()
+        prop.Name = name
+        prop.Value = value
+        properties.append(prop)
+    return tuple(properties)
@@ -1,29 +1,310 @@
 #!/usr/bin/env python3
-"""Unpack and format XML contents of Office files (.docx, .pptx, .xlsx)"""
+"""Unpack and format XML contents of Office files (.docx, .pptx, .xlsx)
 
+Example usage:
+    python unpack.py <office_file> <output_dir> [--jobs N] [--engine stream]
+    python unpack.py <office_file> <output_dir> --parts word/document.xml
+
+Library usage:
+    from unpack import unpack_document
+    unpack_document("report.docx", "unpacked", parts=["word/document.xml"])
+"""
+
+import argparse
+import concurrent.futures
+import io
 import random
-import sys
 import defusedxml.minidom
+import lxml.etree
 import zipfile
 from pathlib import Path
 
-# Get command line arguments
-assert len(sys.argv) == 3, "Usage: python unpack.py <office_file> <output_dir>"
-input_file, output_dir = sys.argv[1], sys.argv[2]
+from xml_stream import (
+    XML_NAMESPACE,
+    reject_entity_declarations,
+    qualified_name,
+    start_tag,
+    misc_node,
+    escape_text,
+)
+
+# Available XML pretty-printing engines (see prettify_xml_content)
+ENGINES = ("minidom", "stream")
+
+INDENT = "  "
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Unpack an Office file")
+    parser.add_argument("office_file", help="Office file (.docx/.pptx/.xlsx)")
+    parser.add_argument("output_dir", help="Directory to unpack into")
+    parser.add_argument(
+        "--parts",
+        nargs="+",
+        metavar="PART",
+        help="Only unpack these parts (e.g. word/document.xml) and their .rels files",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of worker processes for pretty-printing (default: 1)",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=ENGINES,
+        default="minidom",
+        help="XML pretty-printing engine; 'stream' uses far less memory on large parts",
+    )
+    args = parser.parse_args()
+
+    try:
+        unpack_document(
+            args.office_file,
+            args.output_dir,
+            parts=args.parts,
+            jobs=args.jobs,
+            engine=args.engine,
+        )
+    except ValueError as e:
+        parser.exit(1, f"Error: {e}\n")
+
+    # For .docx files, suggest an RSID for tracked changes
+    if args.office_file.endswith(".docx"):
+        suggested_rsid = "".join(random.choices("0123456789ABCDEF", k=8))
+        print(f"Suggested RSID for edit session: {suggested_rsid}")
+
+
+def unpack_document(input_file, output_dir, parts=None, jobs=1, engine="minidom"):
+    """Extract an Office file and pretty-print its XML and .rels parts.
+
+    Binary parts (media, fonts, embeddings) are copied out of the archive
+    unchanged. XML parts are pretty-printed as they are extracted, in
+    parallel worker processes when jobs > 1.
+
+    Args:
+        input_file: Path to Office file (.docx/.pptx/.xlsx)
+        output_dir: Directory to unpack into (created if needed)
+        parts: Optional part names to unpack (e.g. ["word/document.xml"]).
+            The .rels file of each selected part is included automatically.
+            Unpacks every part when None (default).
+        jobs: Number of worker processes for pretty-printing (default: 1)
+        engine: XML pretty-printing engine, "minidom" or "stream" (default: "minidom")
+
+    Returns:
+        list[Path]: Paths of the unpacked files
+
+    Raises:
+        ValueError: If a selected part is missing or a member path is unsafe
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine {engine!r}, expected one of {ENGINES}")
+    output_path = Path(output_dir)
+    output_path.mkdir(parents=True, exist_ok=True)
+
+    with zipfile.ZipFile(input_file) as zf:
+        members = [info for info in zf.infolist() if not info.is_dir()]
+        if parts is not None:
+            members = _select_members(members, parts, input_file)
+
+        xml_members = []
+        for info in members:
+            _member_path(output_path, info.filename)  # Reject unsafe paths early
+            if info.filename.endswith((".xml", ".rels")):
+                xml_members.append(info)
+            else:
+                zf.extract(info, output_path)
+
+        if jobs <= 1 or len(xml_members) < 2:
+            for info in xml_members:
+                _write_pretty_member(zf, info.filename, output_path, engine)
+        else:
+            # Largest parts first, so no worker is left with a big part at the end
+            xml_members.sort(key=lambda info: info.file_size, reverse=True)
+            with concurrent.futures.ProcessPoolExecutor(
+                max_workers=min(jobs, len(xml_members)),
+                initializer=_init_unpack_worker,
+                initargs=(str(input_file),),
+            ) as executor:
+                futures = [
+                    executor.submit(
+                        _unpack_worker, info.filename, str(output_path), engine
+                    )
+                    for info in xml_members
+                ]
+                for future in futures:
+                    future.result()
+
+    return [_member_path(output_path, info.filename) for info in members]
+
+
+def _select_members(members, parts, input_file):
+    """Return the members for the selected parts and their relationship files."""
+    by_name = {info.filename: info for info in members}
+    wanted = []
+    for name in parts:
+        name = name.lstrip("/")
+        if name not in by_name:
+            raise ValueError(f"Part not found in {input_file}: {name}")
+        wanted.append(name)
+        folder, _, file_name = name.rpartition("/")
+        rels_name = f"{folder}/_rels/{file_name}.rels".lstrip("/")
+        if rels_name in by_name:
+            wanted.append(rels_name)
+    return [by_name[name] for name in dict.fromkeys(wanted)]
+
+
+def _member_path(output_path, name):
+    """Return the output path for a zip member, refusing paths outside output_path."""
+    target = (output_path / name).resolve()
+    if not target.is_relative_to(output_path.resolve()):
+        raise ValueError(f"Unsafe path in archive: {name}")
+    return target
+
+
+def _write_pretty_member(zf, name, output_path, engine):
+    """Read one XML member from the archive and write it pretty-printed."""
+    target = _member_path(output_path, name)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    target.write_bytes(prettify_xml_content(zf.read(name), engine))
 
-# Extract and format
-output_path = Path(output_dir)
-output_path.mkdir(parents=True, exist_ok=True)
-zipfile.ZipFile(input_file).extractall(output_path)
 
-# Pretty print all XML files
-xml_files = list(output_path.rglob("*.xml")) + list(output_path.rglob("*.rels"))
-for xml_file in xml_files:
-    content = xml_file.read_text(encoding="utf-8")
+# Archive opened once by each worker process of a parallel unpack
+_worker_zip = None
+
+
+def _init_unpack_worker(input_file):
+    """Open the archive for this worker process."""
+    global _worker_zip
+    _worker_zip = zipfile.ZipFile(input_file)
+
+
+def _unpack_worker(name, output_dir, engine):
+    """Pretty-print one XML member inside a worker process."""
+    assert _worker_zip is not None
+    _write_pretty_member(_worker_zip, name, Path(output_dir), engine)
+
+
+def prettify_xml_content(content, engine="minidom"):
+    """Pretty-print XML content with two-space indentation as ASCII.
+
+    Non-ASCII characters are written as numeric character references. The
+    "stream" engine writes elements as they are parsed instead of building a
+    DOM, so its memory use does not grow with the size of the part.
+
+    Args:
+        content: XML document as bytes
+        engine: "minidom" or "stream" (default: "minidom")
+
+    Returns:
+        bytes: Indented ASCII encoded XML
+    """
+    if engine == "stream":
+        return _prettify_xml_stream(content)
+
     dom = defusedxml.minidom.parseString(content)
-    xml_file.write_bytes(dom.toprettyxml(indent="  ", encoding="ascii"))
+    return dom.toprettyxml(indent=INDENT, encoding="ascii")
+
+
+def _prettify_xml_stream(content):
+    """Pretty-print XML from lxml iterparse events without building a full tree.
+
+    Whitespace-only text between elements is replaced by indentation, while
+    text in leaf elements (such as <w:t> </w:t>) is written unchanged. Each
+    element is cleared once written, so only the ancestor chain stays in memory.
+    """
+    buffer = io.BytesIO()
+    out = io.TextIOWrapper(
+        buffer, encoding="ascii", errors="xmlcharrefreplace", newline=""
+    )
+    out.write('<?xml version="1.0" encoding="ascii"?>\n')
+
+    pending = None  # (node, "text" | "tail") whose text is not written yet
+    open_tag = False  # Start tag written without its closing ">"
+    has_children = []  # Per open element: whether a child node was written
+    new_namespaces = []  # start-ns declarations for the next element
+    scopes = [{XML_NAMESPACE: "xml"}]  # Namespace URI -> prefix for attributes
+
+    def begin_child(text):
+        """Write what goes between the previous node and a new child node."""
+        nonlocal open_tag
+        if has_children:
+            has_children[-1] = True
+        if open_tag:
+            out.write(">")
+            open_tag = False
+        if text and text.strip():
+            out.write(escape_text(text))  # Mixed content is written as-is
+        elif has_children:
+            out.write("\n" + INDENT * len(has_children))
+
+    events = lxml.etree.iterparse(
+        io.BytesIO(content),
+        events=("start-ns", "start", "end", "comment", "pi"),
+        resolve_entities=False,
+        no_network=True,
+    )
+    for event, node in events:
+        if event == "start-ns":
+            new_namespaces.append(node)
+            continue
+
+        # Text that precedes this event
+        text = None
+        if pending is not None:
+            owner, attr = pending
+            if attr == "text" or owner.getparent() is not None:
+                text = getattr(owner, attr)
+            pending = None
+
+        if event == "start":
+            if node.getparent() is None:
+                reject_entity_declarations(node)
+            begin_child(text)
+            scope = scopes[-1]
+            if new_namespaces:
+                scope = dict(scope)
+                scope.update((uri, prefix) for prefix, uri in new_namespaces if prefix)
+            scopes.append(scope)
+            out.write(start_tag(node, new_namespaces, scope))
+            new_namespaces = []
+            has_children.append(False)
+            open_tag = True
+            pending = (node, "text")
+
+        elif event == "end":
+            name = qualified_name(node)
+            if not has_children.pop():
+                out.write(f">{escape_text(text)}</{name}>" if text else "/>")
+            elif text and text.strip():
+                out.write(f"{escape_text(text)}</{name}>")
+            else:
+                out.write("\n" + INDENT * len(has_children) + f"</{name}>")
+            open_tag = False
+            scopes.pop()
+            pending = (node, "tail")
+
+            # Drop the written subtree and any written siblings before it
+            node.clear(keep_tail=True)
+            parent = node.getparent()
+            if parent is not None:
+                while node.getprevious() is not None:
+                    del parent[0]
+            else:
+                out.write("\n")
+
+        else:  # comment or processing instruction
+            begin_child(text)
+            out.write(misc_node(node))
+            pending = (node, "tail")
+            if node.getparent() is None:
+                out.write("\n")
+
+    out.flush()
+    out.detach()
+    return buffer.getvalue()
+
 
-# For .docx files, suggest an RSID for tracked changes
-if input_file.endswith(".docx"):
-    suggested_rsid = "".join(random.choices("0123456789ABCDEF", k=8))
-    print(f"Suggested RSID for edit session: {suggested_rsid}")
+if __name__ == "__main__":
+    main()
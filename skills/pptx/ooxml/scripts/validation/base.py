@@ -2,11 +2,58 @@
 Base validator with common validation logic for document files.
 """
 
+import concurrent.futures
+import copy
+import io
 import re
+import zipfile
 from pathlib import Path
 
 import lxml.etree
 
+# Compiled XSD schemas shared by all validators in this process, keyed by schema path
+_COMPILED_SCHEMAS = {}
+
+
+def _load_schema(schema_path):
+    """Return the compiled XMLSchema for schema_path, compiling it at most once.
+
+    Compiling the ISO/ECMA schema set (with all of its imports) dominates the cost
+    of validating a single part, so the compiled schema is kept for the lifetime
+    of the process and reused for every part that maps to the same XSD file.
+
+    Args:
+        schema_path: Path to the XSD file
+
+    Returns:
+        lxml.etree.XMLSchema: Compiled schema
+    """
+    key = str(Path(schema_path).resolve())
+    schema = _COMPILED_SCHEMAS.get(key)
+    if schema is None:
+        with open(key, "rb") as xsd_file:
+            parser = lxml.etree.XMLParser()
+            xsd_doc = lxml.etree.parse(xsd_file, parser=parser, base_url=key)
+        schema = lxml.etree.XMLSchema(xsd_doc)
+        _COMPILED_SCHEMAS[key] = schema
+    return schema
+
+
+# Validator owned by each worker process of a parallel XSD run
+_worker_validator = None
+
+
+def _init_xsd_worker(validator_class, unpacked_dir, original_file):
+    """Create the per-process validator (with its own schema and tree caches)."""
+    global _worker_validator
+    _worker_validator = validator_class(unpacked_dir, original_file)
+
+
+def _validate_file_against_xsd_worker(xml_file):
+    """Validate one part inside a worker process."""
+    assert _worker_validator is not None
+    return _worker_validator.validate_file_against_xsd(xml_file, verbose=False)
+
 
 class BaseSchemaValidator:
     """Base validator with common validation logic for document files."""
@@ -103,10 +150,18 @@ class BaseSchemaValidator:
         "http://www.w3.org/XML/1998/namespace",
     }
 
-    def __init__(self, unpacked_dir, original_file, verbose=False):
+    def __init__(self, unpacked_dir, original_file, verbose=False, jobs=1):
         self.unpacked_dir = Path(unpacked_dir).resolve()
         self.original_file = Path(original_file)
         self.verbose = verbose
+        self.jobs = max(1, jobs)  # Worker processes for XSD validation
+
+        # Baseline snapshot of the original file, loaded on first use
+        self._original_parts = None
+        self._original_errors = {}
+
+        # Parsed trees shared by all validation passes, keyed by file path
+        self._parsed_trees = {}
 
         # Set schemas directory
         self.schemas_dir = Path(__file__).parent.parent.parent / "schemas"
@@ -124,6 +179,22 @@ class BaseSchemaValidator:
         """Run all validation checks and return True if all pass."""
         raise NotImplementedError("Subclasses must implement the validate method")
 
+    def _parse_xml(self, xml_file):
+        """Parse an XML file once and return the cached lxml ElementTree.
+
+        The returned tree is shared by every validation pass and must not be
+        modified; passes that need to mutate it should work on a copy.deepcopy().
+
+        Raises:
+            lxml.etree.XMLSyntaxError: If the file is not well-formed
+        """
+        key = Path(xml_file)
+        tree = self._parsed_trees.get(key)
+        if tree is None:
+            tree = lxml.etree.parse(str(key))
+            self._parsed_trees[key] = tree
+        return tree
+
     def validate_xml(self):
         """Validate that all XML files are well-formed."""
         errors = []
@@ -131,7 +202,7 @@ class BaseSchemaValidator:
         for xml_file in self.xml_files:
             try:
                 # Try to parse the XML file
-                lxml.etree.parse(str(xml_file))
+                self._parse_xml(xml_file)
             except lxml.etree.XMLSyntaxError as e:
                 errors.append(
                     f"  {xml_file.relative_to(self.unpacked_dir)}: "
@@ -159,7 +230,7 @@ class BaseSchemaValidator:
 
         for xml_file in self.xml_files:
             try:
-                root = lxml.etree.parse(str(xml_file)).getroot()
+                root = self._parse_xml(xml_file).getroot()
                 declared = set(root.nsmap.keys()) - {None}  # Exclude default namespace
 
                 for attr_val in [
@@ -190,7 +261,8 @@ class BaseSchemaValidator:
 
         for xml_file in self.xml_files:
             try:
-                root = lxml.etree.parse(str(xml_file)).getroot()
+                # Work on a copy, since the cached tree is shared with other passes
+                root = copy.deepcopy(self._parse_xml(xml_file).getroot())
                 file_ids = {}  # Track IDs that must be unique within this file
 
                 # Remove all mc:AlternateContent elements from the tree
@@ -310,7 +382,7 @@ class BaseSchemaValidator:
         for rels_file in rels_files:
             try:
                 # Parse relationships file
-                rels_root = lxml.etree.parse(str(rels_file)).getroot()
+                rels_root = self._parse_xml(rels_file).getroot()
 
                 # Get the directory where this .rels file is located
                 rels_dir = rels_file.parent
@@ -390,8 +462,6 @@ class BaseSchemaValidator:
         Validate that all r:id attributes in XML files reference existing IDs
         in their corresponding .rels files, and optionally validate relationship types.
         """
-        import lxml.etree
-
         errors = []
 
         # Process each XML file that might contain r:id references
@@ -411,7 +481,7 @@ class BaseSchemaValidator:
 
             try:
                 # Parse the .rels file to get valid relationship IDs and their types
-                rels_root = lxml.etree.parse(str(rels_file)).getroot()
+                rels_root = self._parse_xml(rels_file).getroot()
                 rid_to_type = {}
 
                 for rel in rels_root.findall(
@@ -434,7 +504,7 @@ class BaseSchemaValidator:
                         rid_to_type[rid] = type_name
 
                 # Parse the XML file to find all r:id references
-                xml_root = lxml.etree.parse(str(xml_file)).getroot()
+                xml_root = self._parse_xml(xml_file).getroot()
 
                 # Find all elements with r:id attributes
                 for elem in xml_root.iter():
@@ -531,7 +601,7 @@ class BaseSchemaValidator:
 
         try:
             # Parse and get all declared parts and extensions
-            root = lxml.etree.parse(str(content_types_file)).getroot()
+            root = self._parse_xml(content_types_file).getroot()
             declared_parts = set()
             declared_extensions = set()
 
@@ -593,7 +663,7 @@ class BaseSchemaValidator:
                     continue
 
                 try:
-                    root_tag = lxml.etree.parse(str(xml_file)).getroot().tag
+                    root_tag = self._parse_xml(xml_file).getroot().tag
                     root_name = root_tag.split("}")[-1] if "}" in root_tag else root_tag
 
                     if root_name in declarable_roots and path_str not in declared_parts:
@@ -692,11 +762,11 @@ class BaseSchemaValidator:
         valid_count = 0
         skipped_count = 0
 
+        results = self._validate_files_against_xsd()
+
         for xml_file in self.xml_files:
             relative_path = str(xml_file.relative_to(self.unpacked_dir))
-            is_valid, new_file_errors = self.validate_file_against_xsd(
-                xml_file, verbose=False
-            )
+            is_valid, new_file_errors = results[xml_file]
 
             if is_valid is None:
                 skipped_count += 1
@@ -738,6 +808,43 @@ class BaseSchemaValidator:
                 print("\nPASSED - No new XSD validation errors introduced")
             return True
 
+    def _validate_files_against_xsd(self):
+        """Run validate_file_against_xsd for every part, in parallel when jobs > 1.
+
+        Returns:
+            dict: Mapping of xml_file to its (is_valid, new_errors_set) result
+        """
+        results = {}
+        to_validate = []
+        for xml_file in self.xml_files:
+            if self._get_schema_path(xml_file):
+                to_validate.append(xml_file)
+            else:
+                results[xml_file] = (None, set())  # Skipped, no schema
+
+        if self.jobs == 1 or len(to_validate) < 2:
+            for xml_file in to_validate:
+                results[xml_file] = self.validate_file_against_xsd(
+                    xml_file, verbose=False
+                )
+            return results
+
+        # Submit the largest parts first so they don't end up last on one worker
+        to_validate.sort(key=lambda f: f.stat().st_size, reverse=True)
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=min(self.jobs, len(to_validate)),
+            initializer=_init_xsd_worker,
+            initargs=(type(self), self.unpacked_dir, self.original_file),
+        ) as executor:
+            futures = {
+                xml_file: executor.submit(_validate_file_against_xsd_worker, xml_file)
+                for xml_file in to_validate
+            }
+            for xml_file, future in futures.items():
+                results[xml_file] = future.result()
+
+        return results
+
     def _get_schema_path(self, xml_file):
         """Determine the appropriate schema path for an XML file."""
         # Check exact filename match
@@ -830,23 +937,25 @@ class BaseSchemaValidator:
             return None, None  # Skip file
 
         try:
-            # Load schema
-            with open(schema_path, "rb") as xsd_file:
-                parser = lxml.etree.XMLParser()
-                xsd_doc = lxml.etree.parse(
-                    xsd_file, parser=parser, base_url=str(schema_path)
-                )
-                schema = lxml.etree.XMLSchema(xsd_doc)
+            xml_doc = self._parse_xml(xml_file)
+        except Exception as e:
+            return False, {str(e)}
+
+        return self._validate_xml_doc_xsd(
+            xml_doc, schema_path, xml_file.relative_to(base_path)
+        )
 
-            # Load and preprocess XML
-            with open(xml_file, "r") as f:
-                xml_doc = lxml.etree.parse(f)
+    def _validate_xml_doc_xsd(self, xml_doc, schema_path, relative_path):
+        """Validate a parsed XML document against XSD schema. Returns (is_valid, errors_set)."""
+        try:
+            # Load schema (compiled once per process)
+            schema = _load_schema(schema_path)
 
+            # Preprocess XML
             xml_doc, _ = self._remove_template_tags_from_text_nodes(xml_doc)
             xml_doc = self._preprocess_for_mc_ignorable(xml_doc)
 
             # Clean ignorable namespaces if needed
-            relative_path = xml_file.relative_to(base_path)
             if (
                 relative_path.parts
                 and relative_path.parts[0] in self.MAIN_CONTENT_FOLDERS
@@ -866,42 +975,66 @@ class BaseSchemaValidator:
         except Exception as e:
             return False, {str(e)}
 
+    def _get_original_parts(self):
+        """Read the XML parts of the original file into memory.
+
+        The original may be an Office file or an unpacked directory. It is read
+        once per validator; later calls reuse the snapshot.
+
+        Returns:
+            dict: Mapping of zip member name (e.g. "word/document.xml") to bytes
+        """
+        if self._original_parts is None and self.original_file.is_dir():
+            self._original_parts = {
+                path.relative_to(self.original_file).as_posix(): path.read_bytes()
+                for pattern in ("*.xml", "*.rels")
+                for path in self.original_file.rglob(pattern)
+            }
+        elif self._original_parts is None:
+            with zipfile.ZipFile(self.original_file, "r") as zip_ref:
+                self._original_parts = {
+                    name: zip_ref.read(name)
+                    for name in zip_ref.namelist()
+                    if name.endswith((".xml", ".rels"))
+                }
+        return self._original_parts
+
     def _get_original_file_errors(self, xml_file):
         """Get XSD validation errors from a single file in the original document.
 
+        Results are memoized per part, so each original part is validated at most once.
+
         Args:
             xml_file: Path to the XML file in unpacked_dir to check
 
         Returns:
             set: Set of error messages from the original file
         """
-        import tempfile
-        import zipfile
-
         # Resolve both paths to handle symlinks (e.g., /var vs /private/var on macOS)
         xml_file = Path(xml_file).resolve()
         unpacked_dir = self.unpacked_dir.resolve()
         relative_path = xml_file.relative_to(unpacked_dir)
+        part_name = relative_path.as_posix()
 
-        with tempfile.TemporaryDirectory() as temp_dir:
-            temp_path = Path(temp_dir)
-
-            # Extract original file
-            with zipfile.ZipFile(self.original_file, "r") as zip_ref:
-                zip_ref.extractall(temp_path)
-
-            # Find corresponding file in original
-            original_xml_file = temp_path / relative_path
+        if part_name in self._original_errors:
+            return self._original_errors[part_name]
 
-            if not original_xml_file.exists():
-                # File didn't exist in original, so no original errors
-                return set()
+        original_data = self._get_original_parts().get(part_name)
+        schema_path = self._get_schema_path(xml_file)
+        if original_data is None or not schema_path:
+            # File didn't exist in original, so no original errors
+            errors = set()
+        else:
+            try:
+                original_doc = lxml.etree.parse(io.BytesIO(original_data))
+                _, errors = self._validate_xml_doc_xsd(
+                    original_doc, schema_path, relative_path
+                )
+            except Exception as e:
+                errors = {str(e)}
 
-            # Validate the specific file in original
-            is_valid, errors = self._validate_single_file_xsd(
-                original_xml_file, temp_path
-            )
-            return errors if errors else set()
+        self._original_errors[part_name] = errors
+        return errors
 
     def _remove_template_tags_from_text_nodes(self, xml_doc):
         """Remove template tags from XML text nodes and collect warnings.
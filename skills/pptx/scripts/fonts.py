@@ -0,0 +1,445 @@
+"""
+Find, load and measure fonts for text layout estimates.
+
+This module provides functionality to:
+- Index the font files of the system font directories and the bundled
+  canvas-design fonts by normalized family name and style
+- Persist the index to a cache file so later runs skip the directory scan
+- Keep loaded PIL fonts in an LRU cache keyed by (path, size)
+- Measure and word-wrap text from cached character advances
+
+Classes:
+    FontRegistry: Index of the available font files by family and style
+    TextMeasurer: Text width and word wrapping for one font
+
+Main Functions:
+    get_font_registry: Return the font registry shared by this process
+    load_font: Load a font at a size, falling back to PIL's default font
+    get_text_measurer: Return the shared TextMeasurer of a font
+"""
+
+import functools
+import json
+import os
+import platform
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+from PIL import Image, ImageDraw, ImageFont
+
+# Fonts bundled with the canvas-design skill, searched after the system fonts
+CANVAS_FONTS_DIR = (
+    Path(__file__).resolve().parents[2] / "canvas-design" / "canvas-fonts"
+)
+
+# Number of loaded (path, size) fonts kept by load_font
+FONT_CACHE_SIZE = 128
+
+# Drawing context used only to measure text, like a 1x1 RGB image would
+_MEASURE_DRAW = ImageDraw.Draw(Image.new("RGB", (1, 1)))
+
+# Stored in the cache file; bump when the index layout changes
+_CACHE_VERSION = 1
+
+# Style names that mean the same thing in font file names
+_STYLE_ALIASES = {
+    "book": "regular",
+    "normal": "regular",
+    "roman": "regular",
+    "oblique": "italic",
+    "boldoblique": "bolditalic",
+}
+
+
+def default_font_dirs() -> Tuple[List[str], List[str]]:
+    """Return the font directories and file extensions for this platform.
+
+    Returns:
+        Tuple of (font directories in search order, font file extensions)
+    """
+    if platform.system() == "Darwin":  # macOS
+        font_dirs = [
+            "/System/Library/Fonts/",
+            "/Library/Fonts/",
+            "~/Library/Fonts/",
+        ]
+        extensions = [".ttf", ".otf", ".ttc", ".dfont"]
+    else:  # Linux
+        font_dirs = [
+            "/usr/share/fonts/truetype/",
+            "/usr/local/share/fonts/",
+            "~/.fonts/",
+        ]
+        extensions = [".ttf", ".otf"]
+    return font_dirs + [str(CANVAS_FONTS_DIR)], extensions
+
+
+def default_cache_path() -> Path:
+    """Return the path of the persisted font index."""
+    cache_home = os.environ.get("XDG_CACHE_HOME") or "~/.cache"
+    return Path(cache_home).expanduser() / "pptx-skill" / "font-index.json"
+
+
+def normalize_font_name(name: str) -> str:
+    """Normalize a font or file name for lookups (e.g., 'Crimson Pro' -> 'crimsonpro')."""
+    return name.lower().replace(" ", "").replace("-", "").replace("_", "")
+
+
+class FontRegistry:
+    """Index of the available font files by normalized family name and style.
+
+    The font directories are scanned (recursively) once. The resulting index is
+    saved to a cache file and reused as long as none of the scanned directories
+    changed, so later runs only stat the directories.
+
+    Font files are indexed by their normalized file name and by family and style,
+    taken from the usual 'Family-Style' naming (e.g., 'Lora-BoldItalic.ttf').
+    """
+
+    def __init__(
+        self,
+        font_dirs: Optional[List[str]] = None,
+        extensions: Optional[List[str]] = None,
+        cache_path: Optional[Path] = None,
+    ):
+        """Load the font index from the cache file, or scan the font directories.
+
+        Args:
+            font_dirs: Font directories in search order (default: platform dirs
+                       followed by the canvas-design fonts)
+            extensions: Font file extensions to index
+            cache_path: Cache file for the index, or None for the default location
+        """
+        default_dirs, default_extensions = default_font_dirs()
+        self.font_dirs = [
+            str(Path(font_dir).expanduser()) for font_dir in font_dirs or default_dirs
+        ]
+        self.extensions = [ext.lower() for ext in extensions or default_extensions]
+        self.cache_path = Path(cache_path) if cache_path else default_cache_path()
+
+        fonts = self._load_cache()
+        if fonts is None:
+            fonts, dir_mtimes = self._scan()
+            self._save_cache(fonts, dir_mtimes)
+        # (path, normalized file name, family, style) in search order
+        self.fonts: List[Tuple[str, str, str, str]] = fonts
+
+        self._found: Dict[Tuple[str, bool, bool], Optional[str]] = {}  # find results
+        self._by_file: Dict[str, str] = {}  # normalized file name -> path
+        self._by_family: Dict[str, Dict[str, str]] = {}  # family -> style -> path
+        for path, file_key, family, style in self.fonts:
+            self._by_file.setdefault(file_key, path)
+            self._by_family.setdefault(family, {}).setdefault(style, path)
+
+    def find(
+        self, font_name: str, bold: bool = False, italic: bool = False
+    ) -> Optional[str]:
+        """Get the font file path for a font name and style.
+
+        The family index is tried first, then file names equal to the font name,
+        then file names containing it.
+
+        Args:
+            font_name: Name of the font (e.g., 'Arial', 'Crimson Pro')
+            bold: Prefer a bold variant
+            italic: Prefer an italic variant
+
+        Returns:
+            Path to the font file, or None if not found
+        """
+        lookup = (font_name, bold, italic)
+        if lookup not in self._found:
+            self._found[lookup] = self._find(
+                normalize_font_name(font_name), bold, italic
+            )
+        return self._found[lookup]
+
+    def _find(self, key: str, bold: bool, italic: bool) -> Optional[str]:
+        """Look up a normalized font name, see find."""
+        if not key:
+            return None
+
+        styles = self._by_family.get(key)
+        if styles:
+            for style in _preferred_styles(bold, italic):
+                if style in styles:
+                    return styles[style]
+            return styles[min(styles)]
+
+        if key in self._by_file:
+            return self._by_file[key]
+
+        for path, file_key, _, _ in self.fonts:
+            if key in file_key:
+                return path
+        return None
+
+    def _scan(self) -> Tuple[List[Tuple[str, str, str, str]], Dict[str, int]]:
+        """Walk the font directories.
+
+        Returns:
+            Tuple of (indexed fonts, mtime of every scanned directory)
+        """
+        fonts = []
+        dir_mtimes = {}
+        for font_dir in self.font_dirs:
+            for dir_path, dir_names, file_names in os.walk(font_dir):
+                dir_names.sort()
+                try:
+                    dir_mtimes[dir_path] = os.stat(dir_path).st_mtime_ns
+                except OSError:
+                    continue
+                for file_name in sorted(file_names):
+                    stem, ext = os.path.splitext(file_name)
+                    if ext.lower() not in self.extensions:
+                        continue
+                    family, style = _split_family_style(stem)
+                    fonts.append(
+                        (
+                            os.path.join(dir_path, file_name),
+                            normalize_font_name(stem),
+                            family,
+                            style,
+                        )
+                    )
+        return fonts, dir_mtimes
+
+    def _load_cache(self) -> Optional[List[Tuple[str, str, str, str]]]:
+        """Return the cached index, or None if it is missing or out of date."""
+        try:
+            with open(self.cache_path, encoding="utf-8") as f:
+                cache = json.load(f)
+            if (
+                cache.get("version") != _CACHE_VERSION
+                or cache.get("font_dirs") != self.font_dirs
+                or cache.get("extensions") != self.extensions
+            ):
+                return None
+            # Adding or removing fonts changes the mtime of their directory;
+            # font directories missing at scan time have no entry
+            scanned = cache["dir_mtimes"]
+            for font_dir in self.font_dirs:
+                if font_dir not in scanned and os.path.isdir(font_dir):
+                    return None
+            for dir_path, mtime in scanned.items():
+                if os.stat(dir_path).st_mtime_ns != mtime:
+                    return None
+            return [tuple(font) for font in cache["fonts"]]
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def _save_cache(
+        self, fonts: List[Tuple[str, str, str, str]], dir_mtimes: Dict[str, int]
+    ) -> None:
+        """Write the index to the cache file; failures only cost a rescan later."""
+        cache = {
+            "version": _CACHE_VERSION,
+            "font_dirs": self.font_dirs,
+            "extensions": self.extensions,
+            "dir_mtimes": dir_mtimes,
+            "fonts": fonts,
+        }
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=self.cache_path.parent, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(cache, f)
+                os.replace(temp_path, self.cache_path)
+            except BaseException:
+                os.unlink(temp_path)
+                raise
+        except OSError:
+            pass
+
+
+def _split_family_style(stem: str) -> Tuple[str, str]:
+    """Split a font file name into normalized family and style.
+
+    'Lora-BoldItalic' -> ('lora', 'bolditalic'); names without a style suffix,
+    like 'DejaVuSans', are the regular style of their family.
+    """
+    family, sep, style = stem.rpartition("-")
+    if not sep or not family:
+        return normalize_font_name(stem), "regular"
+    style = normalize_font_name(style)
+    return normalize_font_name(family), _STYLE_ALIASES.get(style, style)
+
+
+def _preferred_styles(bold: bool, italic: bool) -> List[str]:
+    """Return the styles to try, best match first."""
+    if bold and italic:
+        return ["bolditalic", "bold", "italic", "regular"]
+    if bold:
+        return ["bold", "regular"]
+    if italic:
+        return ["italic", "regular"]
+    return ["regular"]
+
+
+@functools.lru_cache(maxsize=1)
+def get_font_registry() -> FontRegistry:
+    """Return the font registry shared by this process, creating it on first use."""
+    return FontRegistry()
+
+
+@functools.lru_cache(maxsize=FONT_CACHE_SIZE)
+def load_font(
+    font_path: Optional[str], size: int
+) -> Union[ImageFont.FreeTypeFont, ImageFont.ImageFont]:
+    """Load a font file at a size, or PIL's default font if it cannot be loaded.
+
+    Loaded fonts are kept in an LRU cache keyed by (path, size), so repeated
+    paragraphs in the same font do not reload the font file.
+
+    Args:
+        font_path: Path to the font file, or None
+        size: Font size
+
+    Returns:
+        The loaded font
+    """
+    if font_path:
+        try:
+            return ImageFont.truetype(font_path, size=size)
+        except Exception:
+            pass
+    return ImageFont.load_default()
+
+
+class TextMeasurer:
+    """Text width and greedy word wrapping for one font.
+
+    With PIL's basic layout, the width of a text is the sum of its character
+    advances plus a kerning adjustment for each adjacent pair, all multiples of
+    1/64 px. Both are cached per font, so the width of any slice of a line
+    comes from prefix sums and is identical to ImageDraw.textlength. Fonts
+    using raqm layout (where shaping can span more than two characters) are
+    measured with textlength directly.
+    """
+
+    def __init__(self, font: Union[ImageFont.FreeTypeFont, ImageFont.ImageFont]):
+        """Initialize for a loaded font.
+
+        Args:
+            font: The PIL font to measure with
+        """
+        self.font = font
+        self.additive = (
+            getattr(font, "layout_engine", ImageFont.Layout.BASIC)
+            == ImageFont.Layout.BASIC
+        )
+        self._advances: Dict[str, float] = {}  # character -> advance
+        self._kerning: Dict[str, float] = {}  # character pair -> adjustment
+
+    def textlength(self, text: str) -> float:
+        """Get the width of text in pixels, as measured by ImageDraw.textlength."""
+        return _MEASURE_DRAW.textlength(text, font=self.font)
+
+    def wrap(self, line: str, max_width: float) -> List[str]:
+        """Wrap a single line of text at spaces to fit within max_width.
+
+        Words are added to the current line while it fits; a word that does not
+        fit starts a new line, even if it is wider than max_width on its own.
+
+        Args:
+            line: Text without line breaks
+            max_width: Available width in pixels
+
+        Returns:
+            List of wrapped lines ([""] for an empty line)
+        """
+        if not line:
+            return [""]
+        if not self.additive:
+            return self._wrap_measured(line, max_width)
+
+        widths, kerning = self._prefix_widths(line)
+        if widths[-1] <= max_width:
+            return [line]
+
+        # The current line is line[start:end]; joining consecutive words with
+        # single spaces gives back the slice of the original line
+        wrapped = []
+        start = end = position = 0
+        for word in line.split(" "):
+            word_start, word_end = position, position + len(word)
+            position = word_end + 1
+
+            test_start = start if end > start else word_start
+            test_width = (
+                widths[word_end] - widths[test_start] - kerning[test_start]
+                if word_end > test_start
+                else 0
+            )
+            if test_width <= max_width:
+                start, end = test_start, word_end
+            else:
+                if end > start:
+                    wrapped.append(line[start:end])
+                start, end = word_start, word_end
+
+        if end > start:
+            wrapped.append(line[start:end])
+
+        return wrapped
+
+    def _prefix_widths(self, line: str) -> Tuple[List[float], List[float]]:
+        """Return the widths of line[:i] and the kerning before each character.
+
+        The width of line[a:b] is widths[b] - widths[a] - kerning[a].
+        """
+        advances = self._advances
+        pairs = self._kerning
+        widths = [0.0]
+        kerning = [0.0]
+        total = 0.0
+        previous = ""
+        for char in line:
+            advance = advances.get(char)
+            if advance is None:
+                advance = advances[char] = self.textlength(char)
+            if previous:
+                pair = previous + char
+                kern = pairs.get(pair)
+                if kern is None:
+                    kern = pairs[pair] = (
+                        self.textlength(pair) - advances[previous] - advance
+                    )
+                kerning.append(kern)
+                total += kern
+            previous = char
+            total += advance
+            widths.append(total)
+        kerning.append(0.0)
+        return widths, kerning
+
+    def _wrap_measured(self, line: str, max_width: float) -> List[str]:
+        """Wrap like wrap, measuring every candidate line with textlength."""
+        if self.textlength(line) <= max_width:
+            return [line]
+
+        wrapped = []
+        current_line = ""
+        for word in line.split(" "):
+            test_line = current_line + (" " if current_line else "") + word
+            if self.textlength(test_line) <= max_width:
+                current_line = test_line
+            else:
+                if current_line:
+                    wrapped.append(current_line)
+                current_line = word
+
+        if current_line:
+            wrapped.append(current_line)
+
+        return wrapped
+
+
+@functools.lru_cache(maxsize=FONT_CACHE_SIZE)
+def get_text_measurer(
+    font: Union[ImageFont.FreeTypeFont, ImageFont.ImageFont],
+) -> TextMeasurer:
+    """Return the TextMeasurer of a font, keeping its width caches across calls."""
+    return TextMeasurer(font)
@@ -0,0 +1,90 @@
+"""
+Rectangle geometry shared by the layout checks.
+
+Finds the pairs of rectangles whose extents intersect without comparing every
+pair: rectangles are swept in order of their left edge, and each one is only
+tested against the rectangles that start before its right edge. The vertical
+interval tests of each sweep step are vectorized with NumPy when it is
+installed.
+
+Main Functions:
+    intersecting_pairs: Index pairs of rectangles whose extents intersect
+"""
+
+from bisect import bisect_right
+from typing import List, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+Box = Sequence[float]  # (x0, y0, x1, y1)
+
+
+def intersecting_pairs(boxes: Sequence[Box]) -> List[Tuple[int, int]]:
+    """Return the index pairs of boxes whose closed extents intersect.
+
+    Boxes are (x0, y0, x1, y1); each edge pair may be given in either order.
+    Boxes that only touch count as intersecting, so the result includes every
+    pair with a positive overlap. Callers apply their own test (strict, or with
+    a tolerance) to the returned pairs.
+
+    Args:
+        boxes: Rectangles as (x0, y0, x1, y1)
+
+    Returns:
+        Sorted list of (i, j) index pairs with i < j
+    """
+    if len(boxes) < 2:
+        return []
+    if np is not None:
+        pairs = _sweep_numpy(boxes)
+    else:
+        pairs = _sweep_python(boxes)
+    pairs.sort()
+    return pairs
+
+
+def _sweep_numpy(boxes: Sequence[Box]) -> List[Tuple[int, int]]:
+    """Find intersecting pairs, testing each sweep step's candidates with NumPy."""
+    coords = np.asarray(boxes, dtype=float).reshape(len(boxes), 4)
+    left = np.minimum(coords[:, 0], coords[:, 2])
+    right = np.maximum(coords[:, 0], coords[:, 2])
+    top = np.minimum(coords[:, 1], coords[:, 3])
+    bottom = np.maximum(coords[:, 1], coords[:, 3])
+
+    order = np.argsort(left, kind="stable")
+    left, right, top, bottom = left[order], right[order], top[order], bottom[order]
+    # Boxes after position p that start no later than box p ends
+    ends = np.searchsorted(left, right, side="right")
+
+    pairs = []
+    for p in range(len(order) - 1):
+        end = ends[p]
+        if end <= p + 1:
+            continue
+        hits = np.flatnonzero(
+            (top[p + 1 : end] <= bottom[p]) & (bottom[p + 1 : end] >= top[p])
+        )
+        i = int(order[p])
+        for j in order[hits + p + 1].tolist():
+            pairs.append((i, j) if i < j else (j, i))
+    return pairs
+
+
+def _sweep_python(boxes: Sequence[Box]) -> List[Tuple[int, int]]:
+    """Find intersecting pairs without NumPy."""
+    extents = sorted(
+        (min(x0, x1), max(x0, x1), min(y0, y1), max(y0, y1), index)
+        for index, (x0, y0, x1, y1) in enumerate(boxes)
+    )
+    lefts = [extent[0] for extent in extents]
+
+    pairs = []
+    for p, (_, right, top, bottom, i) in enumerate(extents):
+        for q in range(p + 1, bisect_right(lefts, right)):
+            _, _, other_top, other_bottom, j = extents[q]
+            if other_top <= bottom and other_bottom >= top:
+                pairs.append((i, j) if i < j else (j, i))
+    return pairs
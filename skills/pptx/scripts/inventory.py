@@ -9,6 +9,8 @@ This module provides functionality to:
 - Sort shapes by visual position on slides
 - Filter out slide numbers and non-content placeholders
 - Export to JSON with clean, structured data
+- Extract slides in parallel worker processes
+- Read slide XML directly with lxml instead of python-pptx (--backend lxml)
 
 Classes:
     ParagraphData: Represents a text paragraph with formatting
@@ -16,24 +18,28 @@ Classes:
 
 Main Functions:
     extract_text_inventory: Extract all text from a presentation
+    get_inventory_as_dict: Extract all text as JSON-serializable data
     save_inventory: Save extracted data to JSON
 
 Usage:
-    python inventory.py input.pptx output.json
+    python inventory.py input.pptx output.json [--jobs N] [--backend lxml]
 """
 
 import argparse
+import concurrent.futures
 import json
-import platform
 import sys
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple, Union
 
-from PIL import Image, ImageDraw, ImageFont
+from fonts import get_font_registry, get_text_measurer, load_font
+from geometry import intersecting_pairs
 from pptx import Presentation
 from pptx.enum.text import PP_ALIGN
 from pptx.shapes.base import BaseShape
+from slide_reader import XmlPresentation
 
 # Type aliases for cleaner signatures
 JsonValue = Union[str, int, float, bool, None]
@@ -60,6 +66,12 @@ Examples:
   python inventory.py presentation.pptx inventory.json --issues-only
     Extracts only text shapes that have overflow or overlap issues
 
+  python inventory.py presentation.pptx inventory.json --jobs 4
+    Extracts slides in 4 worker processes (same output)
+
+  python inventory.py presentation.pptx inventory.json --backend lxml
+    Reads the slide XML directly with lxml, much faster on large decks (same output)
+
 The output JSON includes:
   - All text content organized by slide and shape
   - Correct absolute positions for shapes in groups
@@ -76,6 +88,19 @@ The output JSON includes:
         action="store_true",
         help="Include only text shapes that have overflow or overlap issues",
     )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of worker processes for slide extraction (default: 1)",
+    )
+    parser.add_argument(
+        "--backend",
+        choices=list(PRESENTATION_CLASSES),
+        default="pptx",
+        help="Presentation reader: python-pptx (default) or read-only lxml",
+    )
 
     args = parser.parse_args()
 
@@ -94,11 +119,16 @@ The output JSON includes:
             print(
                 "Filtering to include only text shapes with issues (overflow/overlap)"
             )
-        inventory = extract_text_inventory(input_path, issues_only=args.issues_only)
+        inventory = get_inventory_as_dict(
+            input_path,
+            issues_only=args.issues_only,
+            jobs=args.jobs,
+            backend=args.backend,
+        )
 
         output_path = Path(args.output)
         output_path.parent.mkdir(parents=True, exist_ok=True)
-        save_inventory(inventory, output_path)
+        save_inventory_dict(inventory, output_path)
 
         print(f"Output saved to: {args.output}")
 
@@ -277,70 +307,20 @@ class ShapeData:
         return int(inches * dpi)
 
     @staticmethod
-    def get_font_path(font_name: str) -> Optional[str]:
+    def get_font_path(
+        font_name: str, bold: bool = False, italic: bool = False
+    ) -> Optional[str]:
         """Get the font file path for a given font name.
 
         Args:
             font_name: Name of the font (e.g., 'Arial', 'Calibri')
+            bold: Prefer a bold variant of the font
+            italic: Prefer an italic variant of the font
 
         Returns:
             Path to the font file, or None if not found
         """
-        system = platform.system()
-
-        # Common font file variations to try
-        font_variations = [
-            font_name,
-            font_name.lower(),
-            font_name.replace(" ", ""),
-            font_name.replace(" ", "-"),
-        ]
-
-        # Define font directories and extensions by platform
-        if system == "Darwin":  # macOS
-            font_dirs = [
-                "/System/Library/Fonts/",
-                "/Library/Fonts/",
-                "~/Library/Fonts/",
-            ]
-            extensions = [".ttf", ".otf", ".ttc", ".dfont"]
-        else:  # Linux
-            font_dirs = [
-                "/usr/share/fonts/truetype/",
-                "/usr/local/share/fonts/",
-                "~/.fonts/",
-            ]
-            extensions = [".ttf", ".otf"]
-
-        # Try to find the font file
-        from pathlib import Path
-
-        for font_dir in font_dirs:
-            font_dir_path = Path(font_dir).expanduser()
-            if not font_dir_path.exists():
-                continue
-
-            # First try exact matches
-            for variant in font_variations:
-                for ext in extensions:
-                    font_path = font_dir_path / f"{variant}{ext}"
-                    if font_path.exists():
-                        return str(font_path)
-
-            # Then try fuzzy matching - find files containing the font name
-            try:
-                for file_path in font_dir_path.iterdir():
-                    if file_path.is_file():
-                        file_name_lower = file_path.name.lower()
-                        font_name_lower = font_name.lower().replace(" ", "")
-                        if font_name_lower in file_name_lower and any(
-                            file_name_lower.endswith(ext) for ext in extensions
-                        ):
-                            return str(file_path)
-            except (OSError, PermissionError):
-                continue
-
-        return None
+        return get_font_registry().find(font_name, bold=bold, italic=italic)
 
     @staticmethod
     def get_slide_dimensions(slide: Any) -> tuple[Optional[int], Optional[int]]:
@@ -495,12 +475,9 @@ class ShapeData:
                 style_name = "titleStyle"
 
             # Find font size in theme styles
-            for child in slide_master.element.iter():
-                tag = child.tag.split("}")[-1] if "}" in child.tag else child.tag
-                if tag == style_name:
-                    for elem in child.iter():
-                        if "sz" in elem.attrib:
-                            return int(elem.attrib["sz"]) // 100
+            font_size = _master_style_font_size(slide_master.element, style_name)
+            if font_size is not None:
+                return font_size
         except Exception:
             pass
 
@@ -531,33 +508,9 @@ class ShapeData:
             self.inches_to_pixels(usable_height),
         )
 
-    def _wrap_text_line(self, line: str, max_width_px: int, draw, font) -> List[str]:
+    def _wrap_text_line(self, line: str, max_width_px: int, font) -> List[str]:
         """Wrap a single line of text to fit within max_width_px."""
-        if not line:
-            return [""]
-
-        # Use textlength for efficient width calculation
-        if draw.textlength(line, font=font) <= max_width_px:
-            return [line]
-
-        # Need to wrap - split into words
-        wrapped = []
-        words = line.split(" ")
-        current_line = ""
-
-        for word in words:
-            test_line = current_line + (" " if current_line else "") + word
-            if draw.textlength(test_line, font=font) <= max_width_px:
-                current_line = test_line
-            else:
-                if current_line:
-                    wrapped.append(current_line)
-                current_line = word
-
-        if current_line:
-            wrapped.append(current_line)
-
-        return wrapped
+        return get_text_measurer(font).wrap(line, max_width_px)
 
     def _estimate_frame_overflow(self) -> None:
         """Estimate if text overflows the shape bounds using PIL text measurement."""
@@ -573,10 +526,6 @@ class ShapeData:
         if usable_width_px <= 0 or usable_height_px <= 0:
             return
 
-        # Set up PIL for text measurement
-        dummy_img = Image.new("RGB", (1, 1))
-        draw = ImageDraw.Draw(dummy_img)
-
         # Get default font size from placeholder or use conservative estimate
         default_font_size = self._get_default_font_size()
 
@@ -593,20 +542,15 @@ class ShapeData:
             font_name = para_data.font_name or "Arial"
             font_size = int(para_data.font_size or default_font_size)
 
-            font = None
-            font_path = self.get_font_path(font_name)
-            if font_path:
-                try:
-                    font = ImageFont.truetype(font_path, size=font_size)
-                except Exception:
-                    font = ImageFont.load_default()
-            else:
-                font = ImageFont.load_default()
+            font_path = self.get_font_path(
+                font_name, bold=bool(para_data.bold), italic=bool(para_data.italic)
+            )
+            font = load_font(font_path, font_size)
 
             # Wrap all lines in this paragraph
             all_wrapped_lines = []
             for line in paragraph.text.split("\n"):
-                wrapped = self._wrap_text_line(line, usable_width_px, draw, font)
+                wrapped = self._wrap_text_line(line, usable_width_px, font)
                 all_wrapped_lines.extend(wrapped)
 
             if all_wrapped_lines:
@@ -739,6 +683,22 @@ class ShapeData:
         return result
 
 
+@lru_cache(maxsize=64)
+def _master_style_font_size(master_element: Any, style_name: str) -> Optional[int]:
+    """Return the first font size in a text style of a slide master, in points.
+
+    Every text shape of a slide looks up the same master style, so the search
+    through the master XML is cached per master element and style.
+    """
+    for child in master_element.iter():
+        tag = child.tag.split("}")[-1] if "}" in child.tag else child.tag
+        if tag == style_name:
+            for elem in child.iter():
+                if "sz" in elem.attrib:
+                    return int(elem.attrib["sz"]) // 100
+    return None
+
+
 def is_valid_shape(shape: BaseShape) -> bool:
     """Check if a shape contains meaningful text content."""
     # Must have a text frame with content
@@ -888,31 +848,106 @@ def detect_overlaps(shapes: List[ShapeData]) -> None:
     Args:
         shapes: List of ShapeData objects with shape_id attributes set
     """
-    n = len(shapes)
+    for i, shape in enumerate(shapes):
+        # Ensure shape IDs are set
+        assert shape.shape_id, f"Shape at index {i} has no shape_id"
+
+    # Only compare pairs whose extents intersect, found with a sweep over the slide
+    boxes = [
+        (shape.left, shape.top, shape.left + shape.width, shape.top + shape.height)
+        for shape in shapes
+    ]
+    for i, j in intersecting_pairs(boxes):
+        shape1 = shapes[i]
+        shape2 = shapes[j]
+
+        rect1 = (shape1.left, shape1.top, shape1.width, shape1.height)
+        rect2 = (shape2.left, shape2.top, shape2.width, shape2.height)
+
+        overlaps, overlap_area = calculate_overlap(rect1, rect2)
+
+        if overlaps:
+            # Add shape IDs with overlap area in square inches
+            shape1.overlapping_shapes[shape2.shape_id] = overlap_area
+            shape2.overlapping_shapes[shape1.shape_id] = overlap_area
+
+
+def extract_slide_inventory(
+    slide: Any, issues_only: bool = False
+) -> Dict[str, ShapeData]:
+    """Extract text content from one slide.
+
+    Args:
+        slide: The PowerPoint slide object
+        issues_only: If True, only include shapes that have overflow or overlap issues
+
+    Returns a dictionary {shape-N: ShapeData}, empty if the slide has no text.
+    Shapes are sorted by visual position (top-to-bottom, left-to-right).
+    """
+    # Collect all valid shapes from this slide with absolute positions
+    shapes_with_positions = []
+    for shape in slide.shapes:  # type: ignore
+        shapes_with_positions.extend(collect_shapes_with_absolute_positions(shape))
+
+    if not shapes_with_positions:
+        return {}
+
+    # Convert to ShapeData with absolute positions and slide reference
+    shape_data_list = [
+        ShapeData(
+            swp.shape,
+            swp.absolute_left,
+            swp.absolute_top,
+            slide,
+        )
+        for swp in shapes_with_positions
+    ]
+
+    # Sort by visual position and assign stable IDs in one step
+    sorted_shapes = sort_shapes_by_position(shape_data_list)
+    for idx, shape_data in enumerate(sorted_shapes):
+        shape_data.shape_id = f"shape-{idx}"
 
-    # Compare each pair of shapes
-    for i in range(n):
-        for j in range(i + 1, n):
-            shape1 = shapes[i]
-            shape2 = shapes[j]
+    # Detect overlaps using the stable shape IDs
+    if len(sorted_shapes) > 1:
+        detect_overlaps(sorted_shapes)
 
-            # Ensure shape IDs are set
-            assert shape1.shape_id, f"Shape at index {i} has no shape_id"
-            assert shape2.shape_id, f"Shape at index {j} has no shape_id"
+    # Filter for issues only if requested (after overlap detection)
+    if issues_only:
+        sorted_shapes = [sd for sd in sorted_shapes if sd.has_any_issues]
 
-            rect1 = (shape1.left, shape1.top, shape1.width, shape1.height)
-            rect2 = (shape2.left, shape2.top, shape2.width, shape2.height)
+    # Create slide inventory using the stable shape IDs
+    return {shape_data.shape_id: shape_data for shape_data in sorted_shapes}
 
-            overlaps, overlap_area = calculate_overlap(rect1, rect2)
 
-            if overlaps:
-                # Add shape IDs with overlap area in square inches
-                shape1.overlapping_shapes[shape2.shape_id] = overlap_area
-                shape2.overlapping_shapes[shape1.shape_id] = overlap_area
+# Presentation class used to read the file for each backend
+PRESENTATION_CLASSES = {"pptx": Presentation, "lxml": XmlPresentation}
+
+
+def open_presentation(pptx_path: Path, backend: str = "pptx") -> Any:
+    """Open a presentation for inventory extraction.
+
+    Args:
+        pptx_path: Path to the PowerPoint file
+        backend: "pptx" (default) loads a python-pptx Presentation; "lxml"
+                 reads the slide XML lazily and read-only with XmlPresentation,
+                 which is much faster on large decks and gives the same inventory
+
+    Returns:
+        Presentation object with a slides sequence
+    """
+    if backend not in PRESENTATION_CLASSES:
+        raise ValueError(
+            f"Unknown backend {backend!r}, expected one of {list(PRESENTATION_CLASSES)}"
+        )
+    return PRESENTATION_CLASSES[backend](str(pptx_path))
 
 
 def extract_text_inventory(
-    pptx_path: Path, prs: Optional[Any] = None, issues_only: bool = False
+    pptx_path: Path,
+    prs: Optional[Any] = None,
+    issues_only: bool = False,
+    backend: str = "pptx",
 ) -> InventoryData:
     """Extract text content from all slides in a PowerPoint presentation.
 
@@ -920,6 +955,7 @@ def extract_text_inventory(
         pptx_path: Path to the PowerPoint file
         prs: Optional Presentation object to use. If not provided, will load from pptx_path.
         issues_only: If True, only include shapes that have overflow or overlap issues
+        backend: Reader used to load pptx_path when prs is not given, see open_presentation
 
     Returns a nested dictionary: {slide-N: {shape-N: ShapeData}}
     Shapes are sorted by visual position (top-to-bottom, left-to-right).
@@ -927,54 +963,98 @@ def extract_text_inventory(
     converted to dictionaries for JSON serialization using to_dict().
     """
     if prs is None:
-        prs = Presentation(str(pptx_path))
+        prs = open_presentation(pptx_path, backend)
     inventory: InventoryData = {}
 
     for slide_idx, slide in enumerate(prs.slides):
-        # Collect all valid shapes from this slide with absolute positions
-        shapes_with_positions = []
-        for shape in slide.shapes:  # type: ignore
-            shapes_with_positions.extend(collect_shapes_with_absolute_positions(shape))
-
-        if not shapes_with_positions:
-            continue
-
-        # Convert to ShapeData with absolute positions and slide reference
-        shape_data_list = [
-            ShapeData(
-                swp.shape,
-                swp.absolute_left,
-                swp.absolute_top,
-                slide,
+        slide_inventory = extract_slide_inventory(slide, issues_only=issues_only)
+        if slide_inventory:
+            inventory[f"slide-{slide_idx}"] = slide_inventory
+
+    return inventory
+
+
+# Presentation loaded by each worker process of a parallel extraction
+_worker_presentation = None
+
+
+def _init_inventory_worker(pptx_path: Path, backend: str) -> None:
+    """Load the presentation once per worker process."""
+    global _worker_presentation
+    _worker_presentation = open_presentation(pptx_path, backend)
+
+
+def _extract_slides_worker(
+    slide_indices: List[int], issues_only: bool
+) -> List[Tuple[int, Dict[str, ShapeDict]]]:
+    """Extract and serialize the inventories of some slides inside a worker process."""
+    assert _worker_presentation is not None
+    slides = _worker_presentation.slides
+    results = []
+    for slide_idx in slide_indices:
+        slide_inventory = extract_slide_inventory(
+            slides[slide_idx], issues_only=issues_only
+        )
+        if slide_inventory:
+            results.append(
+                (
+                    slide_idx,
+                    {
+                        shape_key: shape_data.to_dict()
+                        for shape_key, shape_data in slide_inventory.items()
+                    },
+                )
             )
-            for swp in shapes_with_positions
-        ]
+    return results
 
-        # Sort by visual position and assign stable IDs in one step
-        sorted_shapes = sort_shapes_by_position(shape_data_list)
-        for idx, shape_data in enumerate(sorted_shapes):
-            shape_data.shape_id = f"shape-{idx}"
 
-        # Detect overlaps using the stable shape IDs
-        if len(sorted_shapes) > 1:
-            detect_overlaps(sorted_shapes)
+def _extract_inventory_dict_parallel(
+    pptx_path: Path, issues_only: bool, jobs: int, backend: str
+) -> InventoryDict:
+    """Extract the inventory with slides spread over worker processes.
+
+    ShapeData objects keep references to python-pptx shapes, so workers return
+    serialized shapes. Each worker loads the presentation once and processes
+    interleaved batches of slides, which balances text-heavy runs of slides;
+    the results are merged back in slide order.
+    """
+    slide_count = len(open_presentation(pptx_path, backend).slides)
+    if slide_count == 0:
+        return {}
+
+    batch_count = min(slide_count, jobs * 4)
+    batches = [list(range(i, slide_count, batch_count)) for i in range(batch_count)]
+
+    results = []
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=min(jobs, batch_count),
+        initializer=_init_inventory_worker,
+        initargs=(pptx_path, backend),
+    ) as executor:
+        futures = [
+            executor.submit(_extract_slides_worker, batch, issues_only)
+            for batch in batches
+        ]
+        for future in futures:
+            results.extend(future.result())
 
-        # Filter for issues only if requested (after overlap detection)
-        if issues_only:
-            sorted_shapes = [sd for sd in sorted_shapes if sd.has_any_issues]
+    results.sort(key=lambda result: result[0])
+    return {f"slide-{slide_idx}": shapes for slide_idx, shapes in results}
 
-        if not sorted_shapes:
-            continue
 
-        # Create slide inventory using the stable shape IDs
-        inventory[f"slide-{slide_idx}"] = {
-            shape_data.shape_id: shape_data for shape_data in sorted_shapes
+def inventory_to_dict(inventory: InventoryData) -> InventoryDict:
+    """Convert ShapeData objects to dictionaries for JSON serialization."""
+    dict_inventory: InventoryDict = {}
+    for slide_key, shapes in inventory.items():
+        dict_inventory[slide_key] = {
+            shape_key: shape_data.to_dict() for shape_key, shape_data in shapes.items()
         }
-
-    return inventory
+    return dict_inventory
 
 
-def get_inventory_as_dict(pptx_path: Path, issues_only: bool = False) -> InventoryDict:
+def get_inventory_as_dict(
+    pptx_path: Path, issues_only: bool = False, jobs: int = 1, backend: str = "pptx"
+) -> InventoryDict:
     """Extract text inventory and return as JSON-serializable dictionaries.
 
     This is a convenience wrapper around extract_text_inventory that returns
@@ -984,20 +1064,19 @@ def get_inventory_as_dict(pptx_path: Path, issues_only: bool = False) -> Invento
     Args:
         pptx_path: Path to the PowerPoint file
         issues_only: If True, only include shapes that have overflow or overlap issues
+        jobs: Number of worker processes; slides are extracted in parallel when > 1
+        backend: "pptx" (python-pptx) or "lxml" (read-only XML reader), see open_presentation
 
     Returns:
         Nested dictionary with all data serialized for JSON
     """
-    inventory = extract_text_inventory(pptx_path, issues_only=issues_only)
-
-    # Convert ShapeData objects to dictionaries
-    dict_inventory: InventoryDict = {}
-    for slide_key, shapes in inventory.items():
-        dict_inventory[slide_key] = {
-            shape_key: shape_data.to_dict() for shape_key, shape_data in shapes.items()
-        }
+    if jobs > 1:
+        return _extract_inventory_dict_parallel(pptx_path, issues_only, jobs, backend)
 
-    return dict_inventory
+    inventory = extract_text_inventory(
+        pptx_path, issues_only=issues_only, backend=backend
+    )
+    return inventory_to_dict(inventory)
 
 
 def save_inventory(inventory: InventoryData, output_path: Path) -> None:
@@ -1005,13 +1084,11 @@ def save_inventory(inventory: InventoryData, output_path: Path) -> None:
 
     Converts ShapeData objects to dictionaries for JSON serialization.
     """
-    # Convert ShapeData objects to dictionaries
-    json_inventory: InventoryDict = {}
-    for slide_key, shapes in inventory.items():
-        json_inventory[slide_key] = {
-            shape_key: shape_data.to_dict() for shape_key, shape_data in shapes.items()
-        }
+    save_inventory_dict(inventory_to_dict(inventory), output_path)
+
 
+def save_inventory_dict(json_inventory: InventoryDict, output_path: Path) -> None:
+    """Save an already serialized inventory to a JSON file."""
     with open(output_path, "w", encoding="utf-8") as f:
         json.dump(json_inventory, f, indent=2, ensure_ascii=False)
 
@@ -0,0 +1,520 @@
+"""
+Read-only access to the slides of a PowerPoint file with lxml.
+
+The classes here expose the part of the python-pptx object model that
+inventory.py reads (slides, shapes, placeholders, text frames, paragraphs,
+runs and fonts), built directly on the slide XML in the .pptx zip:
+
+- Parts are read from the zip only when they are first needed: opening a
+  presentation reads presentation.xml, each slide is parsed when its shapes
+  are first accessed, and images, charts and media are never read
+- Slide layouts and masters are parsed once per presentation and index their
+  placeholders, so placeholder positions and sizes are inherited from the
+  layout (by idx) and master (by type) with dictionary lookups
+- Nothing is written back to the XML. python-pptx adds elements when some
+  properties are read (e.g. font.color adds a solidFill); these classes
+  return the values python-pptx would report instead
+
+Values use the same types as python-pptx (Length, RGBColor and its
+enumerations), so inventory.py produces the same output from either.
+
+Classes:
+    XmlPresentation: Presentation whose slides are read from the zip on demand
+"""
+
+import posixpath
+import zipfile
+from functools import cached_property
+from pathlib import Path
+from typing import Collection, Dict, List, Optional, Tuple, Union
+
+from lxml import etree
+from pptx.dml.color import RGBColor
+from pptx.enum.dml import MSO_THEME_COLOR
+from pptx.enum.shapes import PP_PLACEHOLDER
+from pptx.enum.text import MSO_UNDERLINE, PP_ALIGN
+from pptx.util import Centipoints, Length
+
+_A = "{http://schemas.openxmlformats.org/drawingml/2006/main}"
+_P = "{http://schemas.openxmlformats.org/presentationml/2006/main}"
+_R = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_PKG_REL = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+# Same settings as python-pptx, so text nodes are kept or dropped alike
+_PARSER = etree.XMLParser(remove_blank_text=True, resolve_entities=False)
+
+# Children of p:spTree and p:grpSp that python-pptx treats as shapes
+_SHAPE_TAGS = {
+    f"{_P}sp",
+    f"{_P}grpSp",
+    f"{_P}graphicFrame",
+    f"{_P}cxnSp",
+    f"{_P}pic",
+    f"{_P}contentPart",
+}
+
+# Path of the a:xfrm element holding position and size, by shape tag
+_XFRM_PATHS = {
+    f"{_P}grpSp": f"{_P}grpSpPr/{_A}xfrm",
+    f"{_P}graphicFrame": f"{_P}xfrm",
+}
+_DEFAULT_XFRM_PATH = f"{_P}spPr/{_A}xfrm"
+
+# Placeholder types of a slide master that layout placeholders inherit from
+_MASTER_PLACEHOLDER_TYPES = {
+    PP_PLACEHOLDER.BODY: PP_PLACEHOLDER.BODY,
+    PP_PLACEHOLDER.CHART: PP_PLACEHOLDER.BODY,
+    PP_PLACEHOLDER.BITMAP: PP_PLACEHOLDER.BODY,
+    PP_PLACEHOLDER.CENTER_TITLE: PP_PLACEHOLDER.TITLE,
+    PP_PLACEHOLDER.ORG_CHART: PP_PLACEHOLDER.BODY,
+    PP_PLACEHOLDER.DATE: PP_PLACEHOLDER.DATE,
+    PP_PLACEHOLDER.FOOTER: PP_PLACEHOLDER.FOOTER,
+    PP_PLACEHOLDER.MEDIA_CLIP: PP_PLACEHOLDER.BODY,
+    PP_PLACEHOLDER.OBJECT: PP_PLACEHOLDER.BODY,
+    PP_PLACEHOLDER.PICTURE: PP_PLACEHOLDER.BODY,
+    PP_PLACEHOLDER.SLIDE_NUMBER: PP_PLACEHOLDER.SLIDE_NUMBER,
+    PP_PLACEHOLDER.SUBTITLE: PP_PLACEHOLDER.BODY,
+    PP_PLACEHOLDER.TABLE: PP_PLACEHOLDER.BODY,
+    PP_PLACEHOLDER.TITLE: PP_PLACEHOLDER.TITLE,
+}
+
+
+def _xsd_boolean(value: Optional[str]) -> Optional[bool]:
+    """Convert an optional xsd:boolean attribute value."""
+    if value is None:
+        return None
+    return value in ("1", "true")
+
+
+def _spacing_points(spacing: Optional[etree._Element]) -> Optional[Length]:
+    """Return the a:spcPts value of an a:spcBef, a:spcAft or a:lnSpc element."""
+    if spacing is None:
+        return None
+    spcPts = spacing.find(f"{_A}spcPts")
+    if spcPts is None:
+        return None
+    return Centipoints(int(spcPts.get("val")))
+
+
+class XmlPlaceholderFormat:
+    """Placeholder type and index of a p:ph element."""
+
+    def __init__(self, ph: etree._Element):
+        self.type = PP_PLACEHOLDER.from_xml(ph.get("type", "obj"))
+        self.idx = int(ph.get("idx", "0"))
+
+
+class XmlColor:
+    """Color of a font, as read through python-pptx's ColorFormat."""
+
+    def __init__(self, color: Optional[etree._Element]):
+        self._color = color
+
+    @property
+    def rgb(self) -> RGBColor:
+        """RGB value; raises AttributeError unless the color is an a:srgbClr."""
+        if self._color is None or self._color.tag != f"{_A}srgbClr":
+            raise AttributeError("no .rgb property on this color type")
+        return RGBColor.from_string(self._color.get("val"))
+
+    @property
+    def theme_color(self) -> MSO_THEME_COLOR:
+        """Theme color; raises AttributeError when no color is set."""
+        if self._color is None:
+            raise AttributeError("no .theme_color property on color type None")
+        if self._color.tag != f"{_A}schemeClr":
+            return MSO_THEME_COLOR.NOT_THEME_COLOR
+        return MSO_THEME_COLOR.from_xml(self._color.get("val"))
+
+
+class XmlFont:
+    """Character properties of an a:rPr element, which may be absent.
+
+    The XML is never modified, so properties are computed once.
+    """
+
+    def __init__(self, rPr: Optional[etree._Element]):
+        self._rPr = rPr
+
+    def _get(self, name: str) -> Optional[str]:
+        return None if self._rPr is None else self._rPr.get(name)
+
+    @cached_property
+    def name(self) -> Optional[str]:
+        latin = None if self._rPr is None else self._rPr.find(f"{_A}latin")
+        return None if latin is None else latin.get("typeface")
+
+    @cached_property
+    def size(self) -> Optional[Length]:
+        sz = self._get("sz")
+        return None if sz is None else Centipoints(int(sz))
+
+    @cached_property
+    def bold(self) -> Optional[bool]:
+        return _xsd_boolean(self._get("b"))
+
+    @cached_property
+    def italic(self) -> Optional[bool]:
+        return _xsd_boolean(self._get("i"))
+
+    @cached_property
+    def underline(self) -> Union[bool, MSO_UNDERLINE, None]:
+        u = self._get("u")
+        if u is None:
+            return None
+        underline = MSO_UNDERLINE.from_xml(u)
+        if underline == MSO_UNDERLINE.NONE:
+            return False
+        if underline == MSO_UNDERLINE.SINGLE_LINE:
+            return True
+        return underline
+
+    @cached_property
+    def color(self) -> XmlColor:
+        # python-pptx replaces any other fill with an empty a:solidFill here
+        solid = None if self._rPr is None else self._rPr.find(f"{_A}solidFill")
+        return XmlColor(None if solid is None else solid.find("*"))
+
+
+class XmlRun:
+    """Text run (a:r) of a paragraph."""
+
+    def __init__(self, r: etree._Element):
+        self.font = XmlFont(r.find(f"{_A}rPr"))
+
+
+class XmlParagraph:
+    """Paragraph (a:p) of a text frame; properties are computed once."""
+
+    def __init__(self, p: etree._Element):
+        self._element = p
+        # ParagraphData reads bullet properties from python-pptx's _p.pPr
+        self._p = self
+        self.pPr = p.find(f"{_A}pPr")
+
+        parts = []
+        for child in p:
+            if child.tag == f"{_A}r":
+                parts.append(child.find(f"{_A}t").text or "")
+            elif child.tag == f"{_A}br":
+                parts.append("\v")
+            elif child.tag == f"{_A}fld":
+                t = child.find(f"{_A}t")
+                parts.append("" if t is None else t.text or "")
+        self.text: str = "".join(parts)
+
+    @cached_property
+    def runs(self) -> Tuple[XmlRun, ...]:
+        return tuple(XmlRun(r) for r in self._element.iterfind(f"{_A}r"))
+
+    @cached_property
+    def level(self) -> int:
+        return 0 if self.pPr is None else int(self.pPr.get("lvl", "0"))
+
+    @cached_property
+    def alignment(self) -> Optional[PP_ALIGN]:
+        algn = None if self.pPr is None else self.pPr.get("algn")
+        return None if algn is None else PP_ALIGN.from_xml(algn)
+
+    @cached_property
+    def space_before(self) -> Optional[Length]:
+        return (
+            None if self.pPr is None else _spacing_points(self.pPr.find(f"{_A}spcBef"))
+        )
+
+    @cached_property
+    def space_after(self) -> Optional[Length]:
+        return (
+            None if self.pPr is None else _spacing_points(self.pPr.find(f"{_A}spcAft"))
+        )
+
+    @cached_property
+    def line_spacing(self) -> Union[float, Length, None]:
+        lnSpc = None if self.pPr is None else self.pPr.find(f"{_A}lnSpc")
+        if lnSpc is None:
+            return None
+        points = _spacing_points(lnSpc)
+        if points is not None:
+            return points
+        val = lnSpc.find(f"{_A}spcPct").get("val")
+        if val.endswith("%"):
+            return float(val[:-1]) / 100.0
+        return int(val) / 100000.0
+
+
+class XmlTextFrame:
+    """Text frame of a shape, from its p:txBody element."""
+
+    def __init__(self, txBody: etree._Element):
+        bodyPr = txBody.find(f"{_A}bodyPr")
+        get = bodyPr.get if bodyPr is not None else {}.get
+        self.margin_left = int(get("lIns", 91440))
+        self.margin_top = int(get("tIns", 45720))
+        self.margin_right = int(get("rIns", 91440))
+        self.margin_bottom = int(get("bIns", 45720))
+        self.paragraphs: Tuple[XmlParagraph, ...] = tuple(
+            XmlParagraph(p) for p in txBody.iterfind(f"{_A}p")
+        )
+
+    @property
+    def text(self) -> str:
+        return "\n".join(paragraph.text for paragraph in self.paragraphs)
+
+
+class XmlBaseShape:
+    """Shape of a slide, layout or master.
+
+    Placeholders on slides, and p:sp placeholders on layouts, report the
+    position and size of the placeholder they inherit from when their own
+    p:spPr does not set them, as in python-pptx.
+    """
+
+    def __init__(self, element: etree._Element, part, inherit_tags: Collection[str]):
+        self.element = element
+        self.part = part
+        nvPr = element.find(f"*/{_P}nvPr")
+        ph = None if nvPr is None else nvPr.find(f"{_P}ph")
+        self.is_placeholder: bool = ph is not None
+        self.placeholder_format = XmlPlaceholderFormat(ph) if ph is not None else None
+        self._inherits = ph is not None and element.tag in inherit_tags
+
+    @cached_property
+    def _xfrm(self) -> Dict[str, Optional[int]]:
+        """Position and size set on the shape itself, None where unset."""
+        values = dict.fromkeys(("left", "top", "width", "height"))
+        xfrm = self.element.find(_XFRM_PATHS.get(self.element.tag, _DEFAULT_XFRM_PATH))
+        if xfrm is not None:
+            off = xfrm.find(f"{_A}off")
+            if off is not None:
+                values["left"] = int(off.get("x"))
+                values["top"] = int(off.get("y"))
+            ext = xfrm.find(f"{_A}ext")
+            if ext is not None:
+                values["width"] = int(ext.get("cx"))
+                values["height"] = int(ext.get("cy"))
+        return values
+
+    def _effective_value(self, name: str) -> Optional[int]:
+        value = self._xfrm[name]
+        if value is None and self._inherits:
+            base = self.part.base_placeholder(self)
+            if base is not None:
+                value = getattr(base, name)
+        return value
+
+    @property
+    def left(self) -> Optional[int]:
+        return self._effective_value("left")
+
+    @property
+    def top(self) -> Optional[int]:
+        return self._effective_value("top")
+
+    @property
+    def width(self) -> Optional[int]:
+        return self._effective_value("width")
+
+    @property
+    def height(self) -> Optional[int]:
+        return self._effective_value("height")
+
+
+class XmlShape(XmlBaseShape):
+    """Autoshape or text box (p:sp), the only shapes with a text frame."""
+
+    @cached_property
+    def text_frame(self) -> Optional[XmlTextFrame]:
+        txBody = self.element.find(f"{_P}txBody")
+        return None if txBody is None else XmlTextFrame(txBody)
+
+
+class XmlGroupShape(XmlBaseShape):
+    """Group shape (p:grpSp); its shapes never inherit placeholder geometry."""
+
+    @cached_property
+    def shapes(self) -> List[XmlBaseShape]:
+        return _shapes(self.element, self.part, inherit_tags=())
+
+
+def _shapes(
+    tree: etree._Element, part, inherit_tags: Collection[str]
+) -> List[XmlBaseShape]:
+    """Create the shapes for the children of a p:spTree or p:grpSp element.
+
+    Placeholders whose tag is in inherit_tags inherit position and size from
+    the placeholder that part.base_placeholder() returns for them.
+    """
+    shapes = []
+    for element in tree:
+        if element.tag not in _SHAPE_TAGS:
+            continue
+        shape_class = _SHAPE_CLASSES.get(element.tag, XmlBaseShape)
+        shapes.append(shape_class(element, part, inherit_tags))
+    return shapes
+
+
+_SHAPE_CLASSES = {f"{_P}sp": XmlShape, f"{_P}grpSp": XmlGroupShape}
+
+
+class XmlSlideMaster:
+    """Slide master, parsed once per presentation."""
+
+    def __init__(self, element: etree._Element):
+        self.element = element
+        self.placeholders = [
+            shape
+            for shape in _shapes(element.find(f"{_P}cSld/{_P}spTree"), self, ())
+            if shape.is_placeholder
+        ]
+        self._by_type: Dict[PP_PLACEHOLDER, XmlBaseShape] = {}
+        for placeholder in reversed(self.placeholders):
+            self._by_type[placeholder.placeholder_format.type] = placeholder
+
+    def base_placeholder(self, shape: XmlBaseShape) -> None:
+        return None
+
+    def get(self, ph_type: PP_PLACEHOLDER) -> Optional[XmlBaseShape]:
+        """Return the first placeholder of a type, or None."""
+        return self._by_type.get(ph_type)
+
+
+class XmlSlideLayout:
+    """Slide layout, parsed once per presentation."""
+
+    def __init__(self, element: etree._Element, slide_master: XmlSlideMaster):
+        self.element = element
+        self.slide_master = slide_master
+        tree = element.find(f"{_P}cSld/{_P}spTree")
+        self.placeholders = [
+            shape
+            for shape in _shapes(tree, self, inherit_tags=(f"{_P}sp",))
+            if shape.is_placeholder
+        ]
+        self._by_idx: Dict[int, XmlBaseShape] = {}
+        for placeholder in reversed(self.placeholders):
+            self._by_idx[placeholder.placeholder_format.idx] = placeholder
+
+    def base_placeholder(self, shape: XmlBaseShape) -> Optional[XmlBaseShape]:
+        """Return the master placeholder a layout placeholder inherits from."""
+        ph_type = _MASTER_PLACEHOLDER_TYPES.get(shape.placeholder_format.type)
+        return None if ph_type is None else self.slide_master.get(ph_type)
+
+    def get(self, idx: int) -> Optional[XmlBaseShape]:
+        """Return the first placeholder with an idx, or None."""
+        return self._by_idx.get(idx)
+
+
+class XmlSlide:
+    """Slide whose XML is parsed when its shapes are first accessed."""
+
+    def __init__(self, presentation: "XmlPresentation", partname: str):
+        self._presentation = presentation
+        self._partname = partname
+
+    # ShapeData reaches the presentation through slide.part.package and the
+    # layout through shape.part, like python-pptx's slide part
+    @property
+    def part(self) -> "XmlSlide":
+        return self
+
+    @property
+    def package(self) -> "XmlPresentation":
+        return self._presentation
+
+    @cached_property
+    def slide_layout(self) -> XmlSlideLayout:
+        return self._presentation._slide_layout(
+            self._presentation._related_part(self._partname, "slideLayout")
+        )
+
+    @cached_property
+    def shapes(self) -> List[XmlBaseShape]:
+        element = self._presentation._parse(self._partname)
+        return _shapes(
+            element.find(f"{_P}cSld/{_P}spTree"), self, inherit_tags=_SHAPE_TAGS
+        )
+
+    def base_placeholder(self, shape: XmlBaseShape) -> Optional[XmlBaseShape]:
+        """Return the layout placeholder a slide placeholder inherits from."""
+        return self.slide_layout.get(shape.placeholder_format.idx)
+
+
+class XmlPresentation:
+    """Presentation whose parts are read from the .pptx zip on demand.
+
+    Provides slides, slide_width and slide_height like python-pptx's
+    Presentation. The zip stays open while the presentation is in use.
+    """
+
+    def __init__(self, pptx_path: Union[str, Path]):
+        self._zip = zipfile.ZipFile(pptx_path)
+        self._slide_layouts: Dict[str, XmlSlideLayout] = {}
+        self._slide_masters: Dict[str, XmlSlideMaster] = {}
+
+        partname = self._related_part("", "officeDocument")
+        element = self._parse(partname)
+        sldSz = element.find(f"{_P}sldSz")
+        self.slide_width: Optional[int] = None
+        self.slide_height: Optional[int] = None
+        if sldSz is not None:
+            self.slide_width = int(sldSz.get("cx"))
+            self.slide_height = int(sldSz.get("cy"))
+
+        rels = self._relationships(partname)
+        sldIdLst = element.find(f"{_P}sldIdLst")
+        self.slides: List[XmlSlide] = [
+            XmlSlide(self, rels[sldId.get(f"{_R}id")][1])
+            for sldId in (sldIdLst if sldIdLst is not None else ())
+        ]
+
+    # Stand in for python-pptx's package.presentation_part.presentation
+    @property
+    def presentation_part(self) -> "XmlPresentation":
+        return self
+
+    @property
+    def presentation(self) -> "XmlPresentation":
+        return self
+
+    def _parse(self, partname: str) -> etree._Element:
+        return etree.fromstring(self._zip.read(partname), _PARSER)
+
+    def _relationships(self, partname: str) -> Dict[str, Tuple[str, str]]:
+        """Return {rId: (relationship type, target part name)} of a part."""
+        directory, name = posixpath.split(partname)
+        rels_name = posixpath.join(directory, "_rels", f"{name}.rels")
+        try:
+            root = etree.fromstring(self._zip.read(rels_name), _PARSER)
+        except KeyError:
+            return {}
+
+        rels = {}
+        for rel in root.iter(f"{_PKG_REL}Relationship"):
+            if rel.get("TargetMode") == "External":
+                continue
+            target = rel.get("Target")
+            if target.startswith("/"):
+                target = target[1:]
+            else:
+                target = posixpath.normpath(posixpath.join(directory, target))
+            rels[rel.get("Id")] = (rel.get("Type"), target)
+        return rels
+
+    def _related_part(self, partname: str, rel_type: str) -> str:
+        """Return the first part a part relates to with a relationship type."""
+        for reltype, target in self._relationships(partname).values():
+            if reltype.endswith(f"/{rel_type}"):
+                return target
+        raise KeyError(f"No {rel_type} relationship in {partname or 'package'}")
+
+    def _slide_layout(self, partname: str) -> XmlSlideLayout:
+        if partname not in self._slide_layouts:
+            master_name = self._related_part(partname, "slideMaster")
+            if master_name not in self._slide_masters:
+                self._slide_masters[master_name] = XmlSlideMaster(
+                    self._parse(master_name)
+                )
+            self._slide_layouts[partname] = XmlSlideLayout(
+                self._parse(partname), self._slide_masters[master_name]
+            )
+        return self._slide_layouts[partname]
@@ -0,0 +1,1213 @@
+#!/usr/bin/env python3
+"""
+Formula Evaluator
+Evaluates common Excel formulas in-process and writes the results back as cached values
+
+Covers numbers, text, booleans and errors, the arithmetic, text (&) and comparison
+operators, cell, range, cross-sheet and defined-name references, and the functions
+in FUNCTIONS. Range arguments are read as NumPy column slices. A workbook using
+anything else (another function, array formulas, circular references, ...) raises
+UnsupportedFormula before the file is touched, and recalc.py then recalculates it
+with LibreOffice instead.
+
+Library usage:
+    from evaluator import UnsupportedFormula, evaluate_workbook
+    try:
+        evaluate_workbook('model.xlsx')
+    except UnsupportedFormula:
+        ...  # Recalculate with LibreOffice
+"""
+
+import bisect
+import math
+import os
+import re
+import shutil
+import tempfile
+import zipfile
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+from xml.etree import ElementTree
+
+import numpy as np
+
+from formula_graph import MAX_COLUMN, MAX_ROW, _read_defined_names
+from recalc import SPREADSHEET_NS, column_index, column_letter, worksheet_parts
+
+SHARED_STRINGS_PART = 'xl/sharedStrings.xml'
+
+# Flags for the absolute ($) parts of a reference
+_FIXED_ROW1, _FIXED_COLUMN1, _FIXED_ROW2, _FIXED_COLUMN2 = 1, 2, 4, 8
+_FIXED_ALL = 15
+
+# Ranges over at most this many formula cells are not split into blocks
+_BLOCK_CELLS = 16
+
+# Cell kinds kept per column next to the numeric values
+_EMPTY, _NUMBER, _TEXT, _BOOL, _ERROR = range(5)
+
+_TOKEN_RE = re.compile(
+    r'\s*(?:'
+    r'(?P<string>"(?:[^"]|"")*")'
+    r'|(?P<error>#(?:NULL!|DIV/0!|VALUE!|REF!|NAME\?|NUM!|N/A))'
+    r"|(?P<sheet>(?:'(?:[^']|'')+'|[^\W\d][\w.]*)!)?"
+    r'(?:(?P<area>(?P<cf1>\$?)(?P<c1>[A-Za-z]{1,3})(?P<rf1>\$?)(?P<r1>\d+)'
+    r'(?::(?P<cf2>\$?)(?P<c2>[A-Za-z]{1,3})(?P<rf2>\$?)(?P<r2>\d+))?)(?![\w(.!])'
+    r'|(?P<columns>(?P<ccf1>\$?)(?P<cc1>[A-Za-z]{1,3}):(?P<ccf2>\$?)(?P<cc2>[A-Za-z]{1,3}))(?![\w(.!])'
+    r'|(?P<rows>(?P<rrf1>\$?)(?P<rr1>\d+):(?P<rrf2>\$?)(?P<rr2>\d+))(?![\w(.!])'
+    r'|(?P<name>[A-Za-z_\\][\w.]*)(?P<call>\()?)'
+    r'|(?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)'
+    r'|(?P<operator><=|>=|<>|[-+*/^&=<>%(),])'
+    r')'
+)
+_NUMBER_TEXT_RE = re.compile(r'\s*([-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)\s*(%?)\s*$')
+
+# Operator precedence, lowest first
+_PRECEDENCE = {
+    '=': 1, '<>': 1, '<': 1, '>': 1, '<=': 1, '>=': 1,
+    '&': 2,
+    '+': 3, '-': 3,
+    '*': 4, '/': 4,
+    '^': 5,
+}
+
+# Relative parts of references, rewritten as offsets to find copies of the same formula
+_TEMPLATE_RE = re.compile(
+    r'"(?:[^"]|"")*"|\'(?:[^\']|\'\')+\''
+    r'|(?<![\w.$])(?P<cf>\$?)(?P<c>[A-Za-z]{1,3})(?P<rf>\$?)(?P<r>\d+)(?![\w(.!])'
+    r'|(?<![\w.$])(?P<ccf1>\$?)(?P<cc1>[A-Za-z]{1,3}):(?P<ccf2>\$?)(?P<cc2>[A-Za-z]{1,3})(?![\w(.!])'
+    r'|(?<![\w.$])(?P<rrf1>\$?)(?P<rr1>\d+):(?P<rrf2>\$?)(?P<rr2>\d+)(?![\w(.!])'
+)
+
+# Formula cells; <f> is always the first child of <c>
+_CELL_XML_RE = re.compile(rb'<c\b([^>]*)>(<f\b[^>]*?(?:/>|>[^<]*</f>))(.*?)</c>', re.S)
+_REF_ATTRIBUTE_RE = re.compile(rb'\sr="([A-Z]+[0-9]+)"')
+_TYPE_ATTRIBUTE_RE = re.compile(rb'\st="[^"]*"')
+
+
+class UnsupportedFormula(Exception):
+    """The workbook uses something the evaluator does not implement; recalculate it with LibreOffice"""
+
+
+class ExcelError:
+    """An Excel error value, such as #DIV/0!"""
+
+    __slots__ = ('code',)
+
+    def __init__(self, code):
+        self.code = code
+
+    def __repr__(self):
+        return f'ExcelError({self.code!r})'
+
+
+ERRORS = {
+    code: ExcelError(code)
+    for code in ('#NULL!', '#DIV/0!', '#VALUE!', '#REF!', '#NAME?', '#NUM!', '#N/A')
+}
+DIV0, NA, NAME, NUM, REF, VALUE = (
+    ERRORS[code] for code in ('#DIV/0!', '#N/A', '#NAME?', '#NUM!', '#REF!', '#VALUE!')
+)
+
+
+def evaluate_workbook(filename):
+    """
+    Evaluate every formula of a workbook and store the results as cached values
+
+    The file is only rewritten once every formula has been evaluated. Only the
+    cached values (<v> and the t attribute) of formula cells change; formulas,
+    styles and all other parts are kept as they are.
+
+    Args:
+        filename: Path to .xlsx/.xlsm file
+
+    Returns:
+        Number of formulas evaluated
+
+    Raises:
+        UnsupportedFormula: If a formula uses anything the evaluator does not
+            support; the file is left unchanged
+    """
+    evaluator = _Evaluator.from_workbook(filename)
+    results = evaluator.evaluate()
+    if results:
+        _write_cached_values(filename, evaluator.parts, results)
+    return len(results)
+
+
+class _Evaluator:
+    """Cell values, parsed formulas and per-column NumPy arrays of one workbook"""
+
+    def __init__(self, sheets, defined_names, shared_strings):
+        self.sheets = list(sheets)
+        self.parts = []
+        self.values = {}  # (sheet, row, column) -> float, str, bool or ExcelError
+        self.formulas = {}  # (sheet, row, column) -> parsed formula
+        self.extents = [(0, 0)] * len(self.sheets)  # sheet -> (last row, last column)
+        self.columns = [{} for _ in self.sheets]  # sheet -> column -> (numbers, kinds)
+        self._sheet_indexes = {name.lower(): index for index, name in enumerate(self.sheets)}
+        self._defined_names = defined_names
+        self._shared_strings = shared_strings
+        self._names = {}
+        self._expanding = set()
+        self._exact_indexes = {}
+        self._templates = {}
+
+    @classmethod
+    def from_workbook(cls, filename):
+        """Read the cell values and parse the formulas of an .xlsx/.xlsm file"""
+        with zipfile.ZipFile(filename) as zf:
+            parts = worksheet_parts(zf)
+            shared_strings = []
+            if SHARED_STRINGS_PART in zf.NameToInfo:
+                with zf.open(SHARED_STRINGS_PART) as stream:
+                    shared_strings = _read_shared_strings(stream)
+            evaluator = cls([name for name, _ in parts], _read_defined_names(zf), shared_strings)
+            evaluator.parts = [part for _, part in parts]
+            for sheet, part in enumerate(evaluator.parts):
+                if part in zf.NameToInfo:
+                    with zf.open(part) as stream:
+                        evaluator._read_sheet(sheet, stream)
+        return evaluator
+
+    def evaluate(self):
+        """Evaluate all formulas in dependency order; returns {(sheet, row, column): value}"""
+        results = {}
+        for key in self._evaluation_order():
+            sheet, row, column = key
+            value = self._scalar(self.formulas[key], key)
+            if value is None:
+                value = 0.0
+            self._store(sheet, row, column, value)
+            results[key] = value
+        return results
+
+    def _read_sheet(self, sheet, stream):
+        cell_tag = f'{SPREADSHEET_NS}c'
+        formula_tag = f'{SPREADSHEET_NS}f'
+        inline_tag = f'{SPREADSHEET_NS}is'
+        row_tag = f'{SPREADSHEET_NS}row'
+        text_tag = f'{SPREADSHEET_NS}t'
+        value_tag = f'{SPREADSHEET_NS}v'
+
+        last_row = last_column = 0
+        shared = {}  # si -> (row, column, parsed master formula)
+        shared_children = []
+        cells = []
+        row_number = 0
+        # Whole rows are handled at their end event; start events would double the work
+        for _, row in ElementTree.iterparse(stream):
+            if row.tag != row_tag:
+                continue
+            row_number = int(row.get('r') or row_number + 1)
+            column = 0
+            for elem in row:
+                if elem.tag != cell_tag:
+                    continue
+                ref = elem.get('r')
+                column = column_index(ref) if ref else column + 1
+                last_column = max(last_column, column)
+                key = (sheet, row_number, column)
+                formula = elem.find(formula_tag)
+                if formula is not None:
+                    kind = formula.get('t')
+                    if kind == 'shared':
+                        if formula.text:
+                            node = self.formulas[key] = self._parse_at(formula.text, key)
+                            shared[formula.get('si')] = (row_number, column, node)
+                        else:
+                            self.formulas[key] = None
+                            shared_children.append((key, formula.get('si')))
+                    elif kind in ('array', 'dataTable'):
+                        raise UnsupportedFormula(
+                            f'{kind} formula at {self._location(key)}'
+                        )
+                    else:
+                        self.formulas[key] = self._parse_at(formula.text or '', key)
+                    continue
+                kind = elem.get('t', 'n')
+                text = elem.findtext(value_tag)
+                if kind == 'inlineStr':
+                    inline = elem.find(inline_tag)
+                    value = '' if inline is None else ''.join(
+                        t.text or '' for t in inline.iter(text_tag)
+                    )
+                elif text is None:
+                    continue
+                elif kind == 'n':
+                    value = float(text)
+                elif kind == 's':
+                    value = self._shared_strings[int(text)]
+                elif kind == 'str':
+                    value = text
+                elif kind == 'b':
+                    value = text.strip() == '1'
+                elif kind == 'e':
+                    value = ERRORS.get(text, VALUE)
+                else:
+                    raise UnsupportedFormula(
+                        f'cell type {kind!r} at {self._location(key)}'
+                    )
+                self.values[key] = value
+                cells.append((row_number, column, value))
+            if len(row):
+                last_row = max(last_row, row_number)
+            # Drop the finished row's cells so memory stays flat
+            row.clear()
+
+        for key, si in shared_children:
+            if si not in shared:
+                raise UnsupportedFormula(f'shared formula without master at {self._location(key)}')
+            row, column, master = shared[si]
+            self.formulas[key] = _shift(master, key[1] - row, key[2] - column)
+
+        self.extents[sheet] = (last_row, last_column)
+        for row, column, value in cells:
+            self._set_column_value(sheet, row, column, value)
+
+    def _evaluation_order(self):
+        """
+        Return the formula cells so that each comes after the formula cells it reads
+
+        Ranges are split into aligned blocks of rows per column, (sheet, column,
+        level, index) covering 2**level rows, which are visited once however
+        many formulas read them, so long columns of running totals or lookups
+        into large tables stay linear.
+        """
+        formula_rows = {}  # (sheet, column) -> sorted rows holding formulas
+        for sheet, row, column in sorted(self.formulas):
+            formula_rows.setdefault((sheet, column), []).append(row)
+
+        def column_precedents(sheet, column, first_row, last_row):
+            rows = formula_rows.get((sheet, column))
+            if not rows:
+                return
+            start = bisect.bisect_left(rows, first_row)
+            stop = bisect.bisect_right(rows, last_row)
+            if stop - start <= _BLOCK_CELLS:
+                for row in rows[start:stop]:
+                    yield (sheet, row, column)
+                return
+            low, high = rows[start], rows[stop - 1]
+            while low <= high:
+                level = (low & -low).bit_length() - 1
+                while low + (1 << level) - 1 > high:
+                    level -= 1
+                if level:
+                    yield (sheet, column, level, low >> level)
+                elif (sheet, low, column) in self.formulas:
+                    yield (sheet, low, column)
+                low += 1 << level
+
+        def precedents(key):
+            if len(key) == 4:
+                sheet, column, level, index = key
+                first_row = index << level
+                middle = first_row + (1 << (level - 1))
+                yield from column_precedents(sheet, column, first_row, middle - 1)
+                yield from column_precedents(sheet, column, middle, middle + (1 << (level - 1)) - 1)
+                return
+            for sheet, first_row, first_column, last_row, last_column in _references(
+                self.formulas[key], key[0]
+            ):
+                if first_row == last_row and first_column == last_column:
+                    cell = (sheet, first_row, first_column)
+                    if cell in self.formulas:
+                        yield cell
+                    continue
+                for column in range(first_column, min(last_column, self.extents[sheet][1]) + 1):
+                    yield from column_precedents(sheet, column, first_row, last_row)
+
+        order = []
+        state = {}  # key -> False while its precedents are visited, True when done
+        for start in self.formulas:
+            if start in state:
+                continue
+            state[start] = False
+            stack = [(start, precedents(start))]
+            while stack:
+                key, pending = stack[-1]
+                for precedent in pending:
+                    done = state.get(precedent)
+                    if done is None:
+                        state[precedent] = False
+                        stack.append((precedent, precedents(precedent)))
+                        break
+                    if not done:
+                        cell = next(key for key, _ in reversed(stack) if len(key) == 3)
+                        raise UnsupportedFormula(f'circular reference at {self._location(cell)}')
+                else:
+                    stack.pop()
+                    state[key] = True
+                    if len(key) == 3:
+                        order.append(key)
+        return order
+
+    # Parsing
+
+    def _parse(self, text, sheet, absolute=False):
+        """Parse formula text into a tree of tuples; absolute treats every reference as $-fixed"""
+        tokens = []
+        position = 0
+        end = len(text.rstrip())
+        while position < end:
+            match = _TOKEN_RE.match(text, position)
+            if match is None or match.end() == position:
+                raise UnsupportedFormula(f'cannot parse formula ={text}')
+            tokens.append(match)
+            position = match.end()
+        parser = _Parser(self, tokens, text, sheet, absolute)
+        node = parser.expression(0)
+        if parser.index != len(tokens):
+            raise UnsupportedFormula(f'cannot parse formula ={text}')
+        return node
+
+    def _parse_at(self, text, cell):
+        """
+        Parse the formula of a cell, reusing the tree of an earlier formula that
+        differs only in its relative references (such as a column of copied formulas)
+        """
+        sheet, row, column = cell
+
+        def template(match):
+            if match.group('r'):
+                column_part = match.group('c').upper() if match.group('cf') else (
+                    f"C[{_column_number(match.group('c')) - column}]"
+                )
+                row_part = match.group('r') if match.group('rf') else f"R[{int(match.group('r')) - row}]"
+                return f'{column_part}{row_part}'
+            if match.group('cc1'):
+                return ':'.join(
+                    letters.upper() if fixed else f'C[{_column_number(letters) - column}]'
+                    for fixed, letters in (match.group('ccf1', 'cc1'), match.group('ccf2', 'cc2'))
+                )
+            if match.group('rr1'):
+                return ':'.join(
+                    number if fixed else f'R[{int(number) - row}]'
+                    for fixed, number in (match.group('rrf1', 'rr1'), match.group('rrf2', 'rr2'))
+                )
+            return match.group(0)
+
+        key = (sheet, _TEMPLATE_RE.sub(template, text))
+        cached = self._templates.get(key)
+        if cached is not None:
+            node, origin_row, origin_column = cached
+            return _shift(node, row - origin_row, column - origin_column)
+        node = self._parse(text, sheet)
+        self._templates[key] = (node, row, column)
+        return node
+
+    def _sheet_index(self, prefix):
+        """Return the sheet index for a 'Sheet Name'! prefix, or None if there is no such sheet"""
+        name = prefix[:-1]
+        if name.startswith("'"):
+            name = name[1:-1].replace("''", "'")
+        return self._sheet_indexes.get(name.lower())
+
+    def _defined_name(self, name, sheet):
+        """Return the parsed formula of a defined name, or a #NAME? constant"""
+        upper = name.upper()
+        for scope in (sheet, None):
+            key = (upper, scope)
+            if key in self._names:
+                return self._names[key]
+            text = self._defined_names.get(key)
+            if text is None:
+                continue
+            if key in self._expanding:
+                raise UnsupportedFormula(f'circular defined name {name}')
+            self._expanding.add(key)
+            try:
+                node = self._parse(text, sheet, absolute=True)
+            finally:
+                self._expanding.discard(key)
+            self._names[key] = node
+            return node
+        return ('const', NAME)
+
+    # Evaluation
+
+    def _scalar(self, node, cell):
+        """Evaluate a node to a single value; ranges use implicit intersection with the formula cell"""
+        kind = node[0]
+        if kind == 'const':
+            return node[1]
+        if kind == 'cell':
+            _, sheet, row, column, _ = node
+            return self.values.get((cell[0] if sheet is None else sheet, row, column))
+        if kind == 'op':
+            return _operate(node[1], self._scalar(node[2], cell), self._scalar(node[3], cell))
+        if kind == 'call':
+            return FUNCTIONS[node[1]](self, node[2], cell)
+        if kind == 'neg':
+            number = _to_number(self._scalar(node[1], cell))
+            return number if isinstance(number, ExcelError) else -number
+        if kind == 'percent':
+            number = _to_number(self._scalar(node[1], cell))
+            return number if isinstance(number, ExcelError) else number / 100
+        if kind == 'area':
+            sheet, first_row, first_column, last_row, last_column = self._area(node, cell)
+            _, row, column = cell
+            if first_column == last_column and first_row <= row <= last_row:
+                return self.values.get((sheet, row, first_column))
+            if first_row == last_row and first_column <= column <= last_column:
+                return self.values.get((sheet, first_row, column))
+            return VALUE
+        if kind == 'missing':
+            return None
+        raise UnsupportedFormula(f'cannot evaluate {kind}')
+
+    def _area(self, node, cell):
+        """Return (sheet, first row, first column, last row, last column) of a reference node, else None"""
+        kind = node[0]
+        if kind == 'area':
+            _, sheet, first_row, first_column, last_row, last_column, _ = node
+        elif kind == 'cell':
+            _, sheet, first_row, first_column, _ = node
+            last_row, last_column = first_row, first_column
+        else:
+            return None
+        return (cell[0] if sheet is None else sheet, first_row, first_column, last_row, last_column)
+
+    def _clip(self, area):
+        """Clip an area to the used range of its sheet"""
+        sheet, first_row, first_column, last_row, last_column = area
+        sheet_rows, sheet_columns = self.extents[sheet]
+        return sheet, first_row, first_column, min(last_row, sheet_rows), min(last_column, sheet_columns)
+
+    def _range_numbers(self, area, errors=True):
+        """
+        Return (numbers, error) for an area: a NumPy array of its numeric cells,
+        or the first error value it holds (row by row) when errors is True
+        """
+        sheet, first_row, first_column, last_row, last_column = self._clip(area)
+        chunks = []
+        first_error = None
+        if first_row <= last_row:
+            columns = self.columns[sheet]
+            if last_column - first_column < len(columns):
+                candidates = ((c, columns.get(c)) for c in range(first_column, last_column + 1))
+            else:
+                candidates = columns.items()
+            for column, arrays in candidates:
+                if arrays is None or not first_column <= column <= last_column:
+                    continue
+                numbers, kinds = arrays
+                kinds = kinds[first_row:last_row + 1]
+                chunks.append(numbers[first_row:last_row + 1][kinds == _NUMBER])
+                if errors:
+                    hits = np.flatnonzero(kinds == _ERROR)
+                    if hits.size:
+                        at = (first_row + int(hits[0]), column)
+                        if first_error is None or at < first_error:
+                            first_error = at
+        if first_error is not None:
+            return None, self.values[(sheet, *first_error)]
+        if not chunks:
+            return np.empty(0), None
+        return (chunks[0] if len(chunks) == 1 else np.concatenate(chunks)), None
+
+    def _aggregate(self, args, cell):
+        """Return the numbers of SUM-like arguments as one array, or the first error"""
+        chunks = []
+        for arg in args:
+            area = self._area(arg, cell)
+            if area is not None:
+                numbers, error = self._range_numbers(area)
+                if error is not None:
+                    return None, error
+                chunks.append(numbers)
+                continue
+            number = _to_number(self._scalar(arg, cell))
+            if isinstance(number, ExcelError):
+                return None, number
+            chunks.append(np.array([number]))
+        if not chunks:
+            return np.empty(0), None
+        return np.concatenate(chunks), None
+
+    def _line(self, area):
+        """Return the values of a single-row or single-column area, clipped to the used range"""
+        sheet, first_row, first_column, last_row, last_column = self._clip(area)
+        get = self.values.get
+        if first_column == last_column:
+            return [get((sheet, row, first_column)) for row in range(first_row, last_row + 1)]
+        return [get((sheet, first_row, column)) for column in range(first_column, last_column + 1)]
+
+    def _find(self, lookup, area, match_type):
+        """
+        Return the 0-based position of lookup in a single-row or single-column area, or None
+
+        match_type 0 finds an equal value (text case-insensitively, with * ? ~
+        wildcards), 1 the largest value <= lookup in ascending data and -1 the
+        smallest value >= lookup in descending data.
+        """
+        if lookup is None:
+            return None
+        if match_type == 0:
+            if isinstance(lookup, str) and any(char in lookup for char in '*?~'):
+                pattern = _wildcard_pattern(lookup)
+                for position, value in enumerate(self._line(area)):
+                    if isinstance(value, str) and pattern.fullmatch(value):
+                        return position
+                return None
+            area = self._clip(area)
+            index = self._exact_indexes.get(area)
+            if index is None:
+                index = {}
+                for position, value in enumerate(self._line(area)):
+                    if value is not None and not isinstance(value, ExcelError):
+                        index.setdefault(_lookup_key(value), position)
+                self._exact_indexes[area] = index
+            return index.get(_lookup_key(lookup))
+
+        rank = _rank(lookup)
+        found = None
+        for position, value in enumerate(self._line(area)):
+            if value is None or isinstance(value, ExcelError) or _rank(value) != rank:
+                continue
+            order = _compare(value, lookup)
+            if order * match_type > 0:
+                break
+            found = position
+        return found
+
+    def _store(self, sheet, row, column, value):
+        self.values[(sheet, row, column)] = value
+        self._set_column_value(sheet, row, column, value)
+
+    def _set_column_value(self, sheet, row, column, value):
+        arrays = self.columns[sheet].get(column)
+        if arrays is None:
+            size = self.extents[sheet][0] + 1
+            arrays = self.columns[sheet][column] = (np.zeros(size), np.zeros(size, dtype=np.int8))
+        numbers, kinds = arrays
+        if type(value) is float:
+            numbers[row] = value
+            kinds[row] = _NUMBER
+        else:
+            numbers[row] = 0.0
+            kinds[row] = (
+                _BOOL if isinstance(value, bool)
+                else _ERROR if isinstance(value, ExcelError)
+                else _TEXT if isinstance(value, str)
+                else _EMPTY
+            )
+
+    def _location(self, key):
+        sheet, row, column = key
+        name = self.sheets[sheet]
+        if not re.fullmatch(r'[^\W\d]\w*', name):
+            name = "'" + name.replace("'", "''") + "'"
+        return f'{name}!{column_letter(column)}{row}'
+
+
+class _Parser:
+    """Precedence-climbing parser over the tokens of one formula"""
+
+    def __init__(self, evaluator, tokens, text, sheet, absolute):
+        self.evaluator = evaluator
+        self.tokens = tokens
+        self.text = text
+        self.sheet = sheet
+        self.absolute = absolute
+        self.index = 0
+
+    def expression(self, min_precedence):
+        node = self.unary()
+        while self.index < len(self.tokens):
+            op = self.tokens[self.index].group('operator')
+            precedence = _PRECEDENCE.get(op)
+            if precedence is None or precedence < min_precedence:
+                break
+            self.index += 1
+            node = ('op', op, node, self.expression(precedence + 1))
+        return node
+
+    def unary(self):
+        op = self._peek_operator()
+        if op in ('-', '+'):
+            self.index += 1
+            operand = self.unary()
+            return ('neg', operand) if op == '-' else operand
+        node = self.primary()
+        while self._peek_operator() == '%':
+            self.index += 1
+            node = ('percent', node)
+        return node
+
+    def primary(self):
+        if self.index >= len(self.tokens):
+            self._fail()
+        token = self.tokens[self.index]
+        self.index += 1
+        kind = token.lastgroup
+        if kind == 'number':
+            return ('const', float(token.group('number')))
+        if kind == 'string':
+            return ('const', token.group('string')[1:-1].replace('""', '"'))
+        if kind == 'error':
+            return ('const', ERRORS[token.group('error')])
+        if kind == 'operator':
+            if token.group('operator') != '(':
+                self._fail()
+            node = self.expression(0)
+            self._expect(')')
+            return node
+        return self.reference(token)
+
+    def reference(self, token):
+        evaluator = self.evaluator
+        prefix = token.group('sheet')
+        sheet = None
+        if prefix:
+            sheet = evaluator._sheet_index(prefix)
+            if sheet is None:
+                return ('const', REF)
+        if token.group('area'):
+            row1, column1 = int(token.group('r1')), _column_number(token.group('c1'))
+            fixed = self._fixed(token.group('rf1'), token.group('cf1'), '', '')
+            if token.group('c2') is None:
+                return ('cell', sheet, row1, column1, fixed)
+            row2, column2 = int(token.group('r2')), _column_number(token.group('c2'))
+            fixed |= self._fixed('', '', token.group('rf2'), token.group('cf2'))
+            return _area_node(sheet, row1, column1, row2, column2, fixed)
+        if token.group('columns'):
+            fixed = _FIXED_ROW1 | _FIXED_ROW2 | self._fixed(
+                '', token.group('ccf1'), '', token.group('ccf2')
+            )
+            return _area_node(
+                sheet, 1, _column_number(token.group('cc1')),
+                MAX_ROW, _column_number(token.group('cc2')), fixed,
+            )
+        if token.group('rows'):
+            fixed = _FIXED_COLUMN1 | _FIXED_COLUMN2 | self._fixed(
+                token.group('rrf1'), '', token.group('rrf2'), ''
+            )
+            return _area_node(
+                sheet, int(token.group('rr1')), 1, int(token.group('rr2')), MAX_COLUMN, fixed
+            )
+
+        name = token.group('name')
+        if token.group('call'):
+            function = name.upper()
+            if function not in FUNCTIONS:
+                raise UnsupportedFormula(f'unsupported function {name}')
+            return ('call', function, self.arguments())
+        if prefix:
+            raise UnsupportedFormula(f'sheet-scoped name {prefix}{name}')
+        if name.upper() in ('TRUE', 'FALSE'):
+            return ('const', name.upper() == 'TRUE')
+        return evaluator._defined_name(name, self.sheet)
+
+    def arguments(self):
+        args = []
+        if self._peek_operator() == ')':
+            self.index += 1
+            return args
+        while True:
+            if self._peek_operator() in (',', ')'):
+                args.append(('missing',))
+            else:
+                args.append(self.expression(0))
+            op = self._peek_operator()
+            self.index += 1
+            if op == ')':
+                return args
+            if op != ',':
+                self._fail()
+
+    def _fixed(self, row1, column1, row2, column2):
+        if self.absolute:
+            return _FIXED_ALL
+        return (
+            (_FIXED_ROW1 if row1 else 0) | (_FIXED_COLUMN1 if column1 else 0)
+            | (_FIXED_ROW2 if row2 else 0) | (_FIXED_COLUMN2 if column2 else 0)
+        )
+
+    def _peek_operator(self):
+        if self.index < len(self.tokens):
+            return self.tokens[self.index].group('operator')
+        return None
+
+    def _expect(self, op):
+        if self._peek_operator() != op:
+            self._fail()
+        self.index += 1
+
+    def _fail(self):
+        raise UnsupportedFormula(f'cannot parse formula ={self.text}')
+
+
+def _area_node(sheet, row1, column1, row2, column2, fixed):
+    """Build an area node with its corners in top-left, bottom-right order"""
+    if row1 > row2:
+        row1, row2 = row2, row1
+        fixed = (fixed & ~(_FIXED_ROW1 | _FIXED_ROW2)) | (
+            (_FIXED_ROW2 if fixed & _FIXED_ROW1 else 0) | (_FIXED_ROW1 if fixed & _FIXED_ROW2 else 0)
+        )
+    if column1 > column2:
+        column1, column2 = column2, column1
+        fixed = (fixed & ~(_FIXED_COLUMN1 | _FIXED_COLUMN2)) | (
+            (_FIXED_COLUMN2 if fixed & _FIXED_COLUMN1 else 0)
+            | (_FIXED_COLUMN1 if fixed & _FIXED_COLUMN2 else 0)
+        )
+    return ('area', sheet, row1, column1, row2, column2, fixed)
+
+
+def _shift(node, rows, columns):
+    """Return a formula tree with its relative references moved, as for a shared formula"""
+    kind = node[0]
+    if kind == 'cell':
+        _, sheet, row, column, fixed = node
+        if not fixed & _FIXED_ROW1:
+            row += rows
+        if not fixed & _FIXED_COLUMN1:
+            column += columns
+        if not (1 <= row <= MAX_ROW and 1 <= column <= MAX_COLUMN):
+            return ('const', REF)
+        return (kind, sheet, row, column, fixed)
+    if kind == 'area':
+        _, sheet, row1, column1, row2, column2, fixed = node
+        if not fixed & _FIXED_ROW1:
+            row1 += rows
+        if not fixed & _FIXED_COLUMN1:
+            column1 += columns
+        if not fixed & _FIXED_ROW2:
+            row2 += rows
+        if not fixed & _FIXED_COLUMN2:
+            column2 += columns
+        if not (1 <= min(row1, row2) and max(row1, row2) <= MAX_ROW
+                and 1 <= min(column1, column2) and max(column1, column2) <= MAX_COLUMN):
+            return ('const', REF)
+        return _area_node(sheet, row1, column1, row2, column2, fixed)
+    if kind == 'op':
+        return (kind, node[1], _shift(node[2], rows, columns), _shift(node[3], rows, columns))
+    if kind == 'call':
+        return (kind, node[1], [_shift(arg, rows, columns) for arg in node[2]])
+    if kind in ('neg', 'percent'):
+        return (kind, _shift(node[1], rows, columns))
+    return node
+
+
+def _references(node, sheet):
+    """Yield (sheet, first row, first column, last row, last column) for each reference in a tree"""
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        kind = node[0]
+        if kind == 'cell':
+            _, ref_sheet, row, column, _ = node
+            yield (sheet if ref_sheet is None else ref_sheet, row, column, row, column)
+        elif kind == 'area':
+            _, ref_sheet, row1, column1, row2, column2, _ = node
+            yield (sheet if ref_sheet is None else ref_sheet, row1, column1, row2, column2)
+        elif kind == 'op':
+            stack.extend((node[2], node[3]))
+        elif kind == 'call':
+            stack.extend(node[2])
+        elif kind in ('neg', 'percent'):
+            stack.append(node[1])
+
+
+# Values and operators
+
+def _to_number(value):
+    """Convert a value for arithmetic: blank is 0, TRUE is 1, numeric text is parsed"""
+    if type(value) is float or isinstance(value, ExcelError):
+        return value
+    if value is None:
+        return 0.0
+    if isinstance(value, bool):
+        return float(value)
+    match = _NUMBER_TEXT_RE.match(value)
+    if match is None:
+        return VALUE
+    number = float(match.group(1))
+    return number / 100 if match.group(2) else number
+
+
+def _to_text(value):
+    if isinstance(value, str):
+        return value
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 'TRUE' if value else 'FALSE'
+    if value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    text = format(value, '.15g')
+    if 'e' in text:
+        mantissa, exponent = text.split('e')
+        text = f'{mantissa}E{exponent[0]}{exponent[1:].lstrip("0").zfill(2)}'
+    return text
+
+
+def _to_bool(value):
+    """Convert an IF condition to a bool, or return an error"""
+    if isinstance(value, (bool, ExcelError)):
+        return value
+    if value is None:
+        return False
+    if type(value) is float:
+        return value != 0
+    upper = value.upper()
+    if upper in ('TRUE', 'FALSE'):
+        return upper == 'TRUE'
+    return VALUE
+
+
+def _rank(value):
+    """Excel orders numbers before text before booleans"""
+    if isinstance(value, bool):
+        return 2
+    if isinstance(value, str):
+        return 1
+    return 0
+
+
+def _compare(left, right):
+    """Compare two non-error values as Excel does; returns -1, 0 or 1"""
+    if left is None:
+        left = '' if isinstance(right, str) else False if isinstance(right, bool) else 0.0
+    if right is None:
+        right = '' if isinstance(left, str) else False if isinstance(left, bool) else 0.0
+    left_rank, right_rank = _rank(left), _rank(right)
+    if left_rank != right_rank:
+        return -1 if left_rank < right_rank else 1
+    if left_rank == 1:
+        left, right = left.lower(), right.lower()
+    return (left > right) - (left < right)
+
+
+def _operate(op, left, right):
+    if isinstance(left, ExcelError):
+        return left
+    if isinstance(right, ExcelError):
+        return right
+    if op == '&':
+        return _to_text(left) + _to_text(right)
+    if op in ('=', '<>', '<', '>', '<=', '>='):
+        order = _compare(left, right)
+        if op == '=':
+            return order == 0
+        if op == '<>':
+            return order != 0
+        if op == '<':
+            return order < 0
+        if op == '>':
+            return order > 0
+        if op == '<=':
+            return order <= 0
+        return order >= 0
+
+    left, right = _to_number(left), _to_number(right)
+    if isinstance(left, ExcelError):
+        return left
+    if isinstance(right, ExcelError):
+        return right
+    if op == '+':
+        result = left + right
+    elif op == '-':
+        result = left - right
+    elif op == '*':
+        result = left * right
+    elif op == '/':
+        if right == 0:
+            return DIV0
+        result = left / right
+    else:
+        if left == 0 and right <= 0:
+            return NUM if right == 0 else DIV0
+        if left < 0 and not right.is_integer():
+            return NUM
+        try:
+            result = math.pow(left, right)
+        except OverflowError:
+            return NUM
+    return result if math.isfinite(result) else NUM
+
+
+def _lookup_key(value):
+    """Key for exact lookups: text matches case-insensitively, and TRUE does not match 1"""
+    if isinstance(value, str):
+        return value.lower()
+    if isinstance(value, bool):
+        return ('bool', value)
+    return value
+
+
+def _wildcard_pattern(text):
+    parts = []
+    position = 0
+    while position < len(text):
+        char = text[position]
+        if char == '~' and position + 1 < len(text) and text[position + 1] in '*?~':
+            parts.append(re.escape(text[position + 1]))
+            position += 2
+            continue
+        parts.append('.*' if char == '*' else '.' if char == '?' else re.escape(char))
+        position += 1
+    return re.compile(''.join(parts), re.IGNORECASE | re.DOTALL)
+
+
+# Functions, called with the evaluator, the unevaluated argument nodes and the formula cell
+
+def _arity(name, args, least, most):
+    if not least <= len(args) <= most:
+        raise UnsupportedFormula(f'{name} with {len(args)} arguments')
+
+
+def _sum(evaluator, args, cell):
+    numbers, error = evaluator._aggregate(args, cell)
+    return error if error is not None else float(numbers.sum())
+
+
+def _average(evaluator, args, cell):
+    numbers, error = evaluator._aggregate(args, cell)
+    if error is not None:
+        return error
+    return float(numbers.mean()) if numbers.size else DIV0
+
+
+def _min(evaluator, args, cell):
+    numbers, error = evaluator._aggregate(args, cell)
+    if error is not None:
+        return error
+    return float(numbers.min()) if numbers.size else 0.0
+
+
+def _max(evaluator, args, cell):
+    numbers, error = evaluator._aggregate(args, cell)
+    if error is not None:
+        return error
+    return float(numbers.max()) if numbers.size else 0.0
+
+
+def _count(evaluator, args, cell):
+    count = 0
+    for arg in args:
+        area = evaluator._area(arg, cell)
+        if area is not None:
+            count += evaluator._range_numbers(area, errors=False)[0].size
+        elif not isinstance(_to_number(evaluator._scalar(arg, cell)), ExcelError):
+            count += 1
+    return float(count)
+
+
+def _if(evaluator, args, cell):
+    _arity('IF', args, 1, 3)
+    condition = _to_bool(evaluator._scalar(args[0], cell))
+    if isinstance(condition, ExcelError):
+        return condition
+    branch = 1 if condition else 2
+    if branch >= len(args):
+        return condition
+    if args[branch][0] == 'missing':
+        return 0.0
+    return evaluator._scalar(args[branch], cell)
+
+
+def _vlookup(evaluator, args, cell):
+    _arity('VLOOKUP', args, 3, 4)
+    lookup = evaluator._scalar(args[0], cell)
+    if isinstance(lookup, ExcelError):
+        return lookup
+    table = evaluator._area(args[1], cell)
+    if table is None:
+        raise UnsupportedFormula('VLOOKUP without a range')
+    index = _to_number(evaluator._scalar(args[2], cell))
+    if isinstance(index, ExcelError):
+        return index
+    approximate = True
+    if len(args) == 4:
+        approximate = _to_bool(evaluator._scalar(args[3], cell))
+        if isinstance(approximate, ExcelError):
+            return approximate
+    index = int(index)
+    sheet, first_row, first_column, last_row, last_column = table
+    if index < 1:
+        return VALUE
+    if index > last_column - first_column + 1:
+        return REF
+    position = evaluator._find(
+        lookup, (sheet, first_row, first_column, last_row, first_column), 1 if approximate else 0
+    )
+    if position is None:
+        return NA
+    value = evaluator.values.get((sheet, first_row + position, first_column + index - 1))
+    return 0.0 if value is None else value
+
+
+def _index(evaluator, args, cell):
+    _arity('INDEX', args, 2, 3)
+    area = evaluator._area(args[0], cell)
+    if area is None:
+        raise UnsupportedFormula('INDEX without a range')
+    numbers = []
+    for arg in args[1:]:
+        number = _to_number(evaluator._scalar(arg, cell))
+        if isinstance(number, ExcelError):
+            return number
+        numbers.append(int(number))
+    sheet, first_row, first_column, last_row, last_column = area
+    height, width = last_row - first_row + 1, last_column - first_column + 1
+    if len(numbers) == 1:
+        if height == 1:
+            numbers = [1, numbers[0]]
+        elif width == 1:
+            numbers.append(1)
+        else:
+            numbers.append(0)
+    row, column = numbers
+    if row < 0 or column < 0:
+        return VALUE
+    if row > height or column > width:
+        return REF
+    if row == 0 or column == 0:
+        if height * width != 1:
+            raise UnsupportedFormula('INDEX of a whole row or column')
+        row = column = 1
+    value = evaluator.values.get((sheet, first_row + row - 1, first_column + column - 1))
+    return 0.0 if value is None else value
+
+
+def _match(evaluator, args, cell):
+    _arity('MATCH', args, 2, 3)
+    lookup = evaluator._scalar(args[0], cell)
+    if isinstance(lookup, ExcelError):
+        return lookup
+    area = evaluator._area(args[1], cell)
+    if area is None:
+        raise UnsupportedFormula('MATCH without a range')
+    match_type = 1.0
+    if len(args) == 3:
+        match_type = _to_number(evaluator._scalar(args[2], cell))
+        if isinstance(match_type, ExcelError):
+            return match_type
+    _, first_row, first_column, last_row, last_column = area
+    if first_row != last_row and first_column != last_column:
+        return NA
+    position = evaluator._find(lookup, area, (match_type > 0) - (match_type < 0))
+    return NA if position is None else float(position + 1)
+
+
+def _round(evaluator, args, cell):
+    _arity('ROUND', args, 2, 2)
+    number, digits = (_to_number(evaluator._scalar(arg, cell)) for arg in args)
+    for value in (number, digits):
+        if isinstance(value, ExcelError):
+            return value
+    digits = int(digits)
+    if digits > 15:
+        return number
+    try:
+        # Via the shortest repr, so 2.675 rounds to 2.68 as in Excel
+        rounded = Decimal(repr(number)).quantize(Decimal(1).scaleb(-digits), rounding=ROUND_HALF_UP)
+    except InvalidOperation:
+        return number
+    return float(rounded) + 0.0
+
+
+def _abs(evaluator, args, cell):
+    _arity('ABS', args, 1, 1)
+    number = _to_number(evaluator._scalar(args[0], cell))
+    return number if isinstance(number, ExcelError) else abs(number)
+
+
+FUNCTIONS = {
+    'SUM': _sum,
+    'AVERAGE': _average,
+    'MIN': _min,
+    'MAX': _max,
+    'COUNT': _count,
+    'IF': _if,
+    'VLOOKUP': _vlookup,
+    'INDEX': _index,
+    'MATCH': _match,
+    'ROUND': _round,
+    'ABS': _abs,
+}
+
+
+# Reading and writing the package
+
+def _read_shared_strings(stream):
+    item_tag = f'{SPREADSHEET_NS}si'
+    run_tag = f'{SPREADSHEET_NS}r'
+    text_tag = f'{SPREADSHEET_NS}t'
+    strings = []
+    for _, elem in ElementTree.iterparse(stream):
+        if elem.tag == item_tag:
+            text = elem.findtext(text_tag)
+            if text is None:
+                # Rich text; phonetic runs (<rPh>) are not part of the value
+                text = ''.join(run.findtext(text_tag) or '' for run in elem.iterfind(run_tag))
+            strings.append(text)
+            elem.clear()
+    return strings
+
+
+def _column_number(letters):
+    return column_index(letters.upper())
+
+
+def _cached_value(value):
+    """Return the t attribute (or None) and <v> text for a formula result"""
+    if isinstance(value, bool):
+        return b'b', b'1' if value else b'0'
+    if isinstance(value, ExcelError):
+        return b'e', value.code.encode()
+    if isinstance(value, str):
+        text = value.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+        return b'str', text.encode('utf-8')
+    if value.is_integer() and abs(value) < 1e16:
+        return None, str(int(value)).encode()
+    return None, repr(value).encode()
+
+
+def _set_cached_values(content, values):
+    """Replace the cached values of the formula cells in a worksheet part; values are keyed by 'A1' refs"""
+    written = 0
+
+    def replace(match):
+        nonlocal written
+        attributes = match.group(1)
+        ref = _REF_ATTRIBUTE_RE.search(attributes)
+        value = None if ref is None else values.get(ref.group(1).decode())
+        if value is None:
+            return match.group(0)
+        written += 1
+        type_name, text = _cached_value(value)
+        attributes = _TYPE_ATTRIBUTE_RE.sub(b'', attributes)
+        if type_name:
+            attributes += b' t="' + type_name + b'"'
+        return b'<c' + attributes + b'>' + match.group(2) + b'<v>' + text + b'</v></c>'
+
+    content = _CELL_XML_RE.sub(replace, content)
+    if written != len(values):
+        # E.g. prefixed element names or cells without r attributes
+        raise UnsupportedFormula('cannot locate every formula cell in the sheet XML')
+    return content
+
+
+def _write_cached_values(filename, parts, results):
+    """Rewrite the worksheet parts holding results into a copy of the file, then replace it"""
+    by_part = {}
+    for (sheet, row, column), value in results.items():
+        by_part.setdefault(parts[sheet], {})[f'{column_letter(column)}{row}'] = value
+
+    directory = os.path.dirname(os.path.abspath(filename))
+    handle, temp_path = tempfile.mkstemp(suffix='.xlsx', dir=directory)
+    os.close(handle)
+    try:
+        with zipfile.ZipFile(filename) as source, zipfile.ZipFile(temp_path, 'w') as target:
+            for info in source.infolist():
+                content = source.read(info)
+                if info.filename in by_part:
+                    content = _set_cached_values(content, by_part[info.filename])
+                target.writestr(info, content)
+        shutil.copymode(filename, temp_path)
+        os.replace(temp_path, filename)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
@@ -0,0 +1,630 @@
+#!/usr/bin/env python3
+"""
+Formula Dependency Graph
+Parses the formulas of an Excel file into a dependency graph of cells and ranges
+
+Usage:
+    python formula_graph.py <excel_file>
+        Reports every error cell with the root-cause cells the error comes from
+    python formula_graph.py <excel_file> --affected Sheet1!B2 "My Sheet!C1:C10"
+        Reports the formula cells affected by editing those cells, and whether
+        a recalculation is needed at all
+
+Library usage:
+    from formula_graph import FormulaGraph
+    graph = FormulaGraph.from_workbook('model.xlsx')
+    graph.root_causes('Summary!B7')     # ['Inputs!C3']
+    graph.affected_by(['Inputs!C3'])    # ['Model!D3', ..., 'Summary!B7']
+"""
+
+import argparse
+import bisect
+import json
+import re
+import zipfile
+from collections import defaultdict
+from xml.etree import ElementTree
+
+from recalc import SPREADSHEET_NS, column_index, column_letter, worksheet_parts
+
+MAX_ROW = 1048576
+MAX_COLUMN = 16384
+
+# Functions whose references are computed at run time, so they may depend on any cell
+DYNAMIC_FUNCTIONS = {'INDIRECT', 'OFFSET'}
+
+# Ranges wider than this are checked cell by cell instead of being indexed per column
+WIDE_RANGE_COLUMNS = 64
+
+# Flags for the absolute ($) parts of a reference
+_FIXED_ROW1, _FIXED_COLUMN1, _FIXED_ROW2, _FIXED_COLUMN2 = 1, 2, 4, 8
+_FIXED_ALL = 15
+
+_TOKEN_RE = re.compile(
+    r'(?P<string>"(?:[^"]|"")*")'
+    r'|(?<![\w.$])'
+    r"(?P<sheet>(?:'(?:[^']|'')+'|\[[^\]]*\][^\s!'\"(),;:]*|[^\W\d][\w.]*(?::[^\W\d][\w.]*)?)!)?"
+    r'(?:(?P<area>(?P<cf1>\$?)(?P<c1>[A-Za-z]{1,3})(?P<rf1>\$?)(?P<r1>\d+)'
+    r'(?::(?P<cf2>\$?)(?P<c2>[A-Za-z]{1,3})(?P<rf2>\$?)(?P<r2>\d+))?)(?![\w(.!])'
+    r'|(?P<columns>\$?[A-Za-z]{1,3}:\$?[A-Za-z]{1,3})(?![\w(.!])'
+    r'|(?P<rows>\$?\d+:\$?\d+)(?![\w(.!])'
+    r'|(?P<name>[A-Za-z_\\][\w.]*)(?P<call>\()?)'
+)
+_CELL_RE = re.compile(r'(\$?)([A-Za-z]{1,3})(\$?)(\d+)')
+
+
+class FormulaGraph:
+    """
+    Dependency graph between the formula cells of a workbook and the cells they read
+
+    Cells are stored as integer keys and ranges are kept whole (never expanded
+    into cells), so the graph stays compact for workbooks with hundreds of
+    thousands of formulas. Dependents of ranges are found through per-column
+    interval indexes built on first use.
+    """
+
+    def __init__(self, sheets, defined_names=None):
+        """
+        Args:
+            sheets: Sheet names in workbook order
+            defined_names: Optional dict mapping (NAME, sheet index or None) to
+                the formula text of a defined name
+        """
+        self.sheets = list(sheets)
+        self.formula_count = 0
+        self.errors = {}  # cell key -> cached error value
+        self.dynamic = set()  # formula cells that may read any cell (INDIRECT, OFFSET)
+        self._sheet_indexes = {name.lower(): index for index, name in enumerate(self.sheets)}
+        self._defined_names = defined_names or {}
+        self._name_cache = {}
+        self._sheet_prefixes = {}
+        self._formulas = {}  # formula cell key -> (precedent cell keys, precedent range ids)
+        self._cell_dependents = defaultdict(list)
+        self._ranges = []  # range id -> (sheet, first row, first column, last row, last column)
+        self._range_ids = {}
+        self._range_dependents = []
+        self._column_ranges = None
+        self._wide_ranges = None
+        self._error_rows = None
+        self._error_columns = None
+
+    @classmethod
+    def from_workbook(cls, filename):
+        """Build the graph of an .xlsx/.xlsm file, reading each sheet's XML in one streaming pass"""
+        with zipfile.ZipFile(filename) as zf:
+            parts = worksheet_parts(zf)
+            graph = cls([name for name, _ in parts], _read_defined_names(zf))
+            for sheet, (_, part) in enumerate(parts):
+                if part in zf.NameToInfo:
+                    with zf.open(part) as stream:
+                        graph._read_sheet(sheet, stream)
+        return graph
+
+    def is_formula(self, ref):
+        """Return True if the cell holds a formula"""
+        return any(key in self._formulas for key in self._parse_location(ref))
+
+    def precedents(self, ref):
+        """Return the cells and ranges a formula cell reads directly"""
+        precedents = []
+        for key in self._parse_location(ref):
+            cells, ranges = self._formulas.get(key, ((), ()))
+            precedents.extend(self._location(cell) for cell in cells)
+            precedents.extend(self._range_location(range_id) for range_id in ranges)
+        return precedents
+
+    def affected_by(self, refs):
+        """
+        Return the formula cells whose value may change when the given cells change
+
+        Args:
+            refs: Edited cells or ranges, e.g. ['Sheet1!B2', 'Sheet1!C1:C10']
+
+        Returns:
+            Affected formula cell locations in sheet, row, column order. Formulas
+            using INDIRECT or OFFSET are always included, since they may read
+            any cell.
+        """
+        edited = [key for ref in refs for key in self._parse_location(ref)]
+        if not edited:
+            return []
+        return [self._location(key) for key in sorted(self._dependents_closure(edited))]
+
+    def root_causes(self, ref):
+        """
+        Return the error cells an error originates from
+
+        These are the error cells upstream of ref (including ref itself) whose
+        own precedents hold no error. Returns an empty list if ref is not an
+        error cell.
+        """
+        roots = set()
+        memo = {}
+        for key in self._parse_location(ref):
+            if key in self.errors:
+                roots |= self._root_causes(key, memo)
+        return [self._location(key) for key in sorted(roots)]
+
+    def error_report(self):
+        """Return {location: {'error': value, 'root_causes': [...]}} for every error cell"""
+        memo = {}
+        report = {}
+        for key in sorted(self.errors):
+            report[self._location(key)] = {
+                'error': self.errors[key],
+                'root_causes': [self._location(root) for root in sorted(self._root_causes(key, memo))]
+            }
+        return report
+
+    # Building
+
+    def _read_sheet(self, sheet, stream):
+        cell_tag = f'{SPREADSHEET_NS}c'
+        formula_tag = f'{SPREADSHEET_NS}f'
+        row_tag = f'{SPREADSHEET_NS}row'
+        sheet_data_tag = f'{SPREADSHEET_NS}sheetData'
+        value_tag = f'{SPREADSHEET_NS}v'
+
+        shared = {}  # shared formula index -> (row, column, references, dynamic)
+        sheet_data = None
+        row_number = 0
+        column = 0
+        for event, elem in ElementTree.iterparse(stream, events=('start', 'end')):
+            tag = elem.tag
+            if event == 'start':
+                if tag == row_tag:
+                    row_number = int(elem.get('r') or row_number + 1)
+                    column = 0
+                elif tag == sheet_data_tag:
+                    sheet_data = elem
+                continue
+            if tag == row_tag and sheet_data is not None:
+                sheet_data.remove(elem)
+                continue
+            if tag != cell_tag:
+                continue
+
+            ref = elem.get('r')
+            column = _column_number(ref.rstrip('0123456789')) if ref else column + 1
+            key = _key(sheet, row_number, column)
+            if elem.get('t') == 'e':
+                self.errors[key] = elem.findtext(value_tag) or '#VALUE!'
+            formula = elem.find(formula_tag)
+            if formula is None:
+                continue
+            self.formula_count += 1
+
+            kind = formula.get('t')
+            if kind == 'shared':
+                index = formula.get('si')
+                if formula.text:
+                    shared[index] = (row_number, column, *self._parse(formula.text, sheet))
+                if index not in shared:
+                    continue
+                master_row, master_column, references, dynamic = shared[index]
+                references = _shift_all(references, row_number - master_row, column - master_column)
+            elif kind == 'dataTable':
+                references, dynamic = [], True
+            else:
+                references, dynamic = self._parse(formula.text or '', sheet)
+
+            cells = [key]
+            if kind == 'array' and formula.get('ref'):
+                # The other cells of an array formula take their values from it
+                cells = _area_keys(sheet, formula.get('ref'))
+            for cell in cells:
+                self._add_formula(cell, sheet, references, dynamic)
+
+    def _add_formula(self, key, sheet, references, dynamic):
+        cells = []
+        ranges = []
+        for sheets, row1, column1, row2, column2, _ in references:
+            if row1 > row2:
+                row1, row2 = row2, row1
+            if column1 > column2:
+                column1, column2 = column2, column1
+            for target in (sheet,) if sheets is None else sheets:
+                if row1 == row2 and column1 == column2:
+                    precedent = _key(target, row1, column1)
+                    cells.append(precedent)
+                    self._cell_dependents[precedent].append(key)
+                else:
+                    area = (target, row1, column1, row2, column2)
+                    range_id = self._range_ids.get(area)
+                    if range_id is None:
+                        range_id = self._range_ids[area] = len(self._ranges)
+                        self._ranges.append(area)
+                        self._range_dependents.append([])
+                    ranges.append(range_id)
+                    self._range_dependents[range_id].append(key)
+        self._formulas[key] = (tuple(cells), tuple(ranges))
+        if dynamic:
+            self.dynamic.add(key)
+
+    def _parse(self, text, sheet, depth=0):
+        """
+        Parse formula text into reference templates
+
+        Returns:
+            (references, dynamic) where each reference is a tuple
+            (sheets, row1, column1, row2, column2, fixed): sheets is a tuple of
+            sheet indexes or None for the formula's own sheet, and fixed holds
+            the _FIXED_* flags of its absolute parts
+        """
+        references = []
+        dynamic = False
+        for match in _TOKEN_RE.finditer(text):
+            if match['string']:
+                continue
+            prefix = match['sheet']
+            sheets = None if prefix is None else self._parse_sheets(prefix)
+            if sheets == ():
+                continue  # External workbook or unknown sheet
+            if match['name']:
+                name = match['name'].upper()
+                if match['call']:
+                    dynamic = dynamic or name.rpartition('.')[2] in DYNAMIC_FUNCTIONS
+                elif name not in ('TRUE', 'FALSE') and depth < 10:
+                    name_references, name_dynamic = self._name_references(name, sheet, sheets, depth)
+                    references.extend(name_references)
+                    dynamic = dynamic or name_dynamic
+                continue
+            if match['area']:
+                column_fixed1, letters1, row_fixed1, row1, column_fixed2, letters2, row_fixed2, row2 = match.group(
+                    'cf1', 'c1', 'rf1', 'r1', 'cf2', 'c2', 'rf2', 'r2')
+                if letters2 is None:
+                    column_fixed2, letters2, row_fixed2, row2 = column_fixed1, letters1, row_fixed1, row1
+                reference = (int(row1), _column_number(letters1), int(row2), _column_number(letters2),
+                             _fixed_flags(row_fixed1, column_fixed1, row_fixed2, column_fixed2))
+            elif match['columns']:
+                first, last = match['columns'].split(':')
+                fixed = _FIXED_ROW1 | _FIXED_ROW2
+                fixed |= (_FIXED_COLUMN1 if first[0] == '$' else 0) | (_FIXED_COLUMN2 if last[0] == '$' else 0)
+                reference = (1, _column_number(first.lstrip('$')), MAX_ROW, _column_number(last.lstrip('$')), fixed)
+            else:
+                first, last = match['rows'].split(':')
+                fixed = _FIXED_COLUMN1 | _FIXED_COLUMN2
+                fixed |= (_FIXED_ROW1 if first[0] == '$' else 0) | (_FIXED_ROW2 if last[0] == '$' else 0)
+                reference = (int(first.lstrip('$')), 1, int(last.lstrip('$')), MAX_COLUMN, fixed)
+            references.append((sheets, *reference))
+        return references, dynamic
+
+    def _parse_sheets(self, prefix):
+        """Return the sheet indexes for a 'Sheet!' prefix, or () for other workbooks and unknown sheets"""
+        sheets = self._sheet_prefixes.get(prefix)
+        if sheets is None:
+            sheets = self._sheet_prefixes[prefix] = self._resolve_sheets(prefix[:-1])
+        return sheets
+
+    def _resolve_sheets(self, name):
+        if name.startswith("'"):
+            name = name[1:-1].replace("''", "'")
+        if name.startswith('['):
+            return ()
+        first, _, last = name.partition(':')
+        start = self._sheet_indexes.get(first.lower())
+        end = self._sheet_indexes.get((last or first).lower())
+        if start is None or end is None:
+            return ()
+        return tuple(range(min(start, end), max(start, end) + 1))
+
+    def _name_references(self, name, sheet, sheets, depth):
+        """Resolve a defined name to absolute reference templates"""
+        scope = sheets[0] if sheets else sheet
+        key = (name, scope)
+        if key not in self._name_cache:
+            text = self._defined_names.get(key)
+            if text is None:
+                text = self._defined_names.get((name, None))
+            if text is None:
+                result = ([], False)  # Not a defined name, e.g. a LET variable
+            else:
+                self._name_cache[key] = ([], False)  # Guards against self-referencing names
+                references, dynamic = self._parse(text, scope, depth + 1)
+                result = ([(s if s is not None else (scope,), r1, c1, r2, c2, _FIXED_ALL)
+                           for s, r1, c1, r2, c2, _ in references], dynamic)
+            self._name_cache[key] = result
+        return self._name_cache[key]
+
+    # Queries
+
+    def _dependents_closure(self, edited):
+        """Return every formula cell reachable from the edited cells through precedents"""
+        if self._column_ranges is None:
+            self._build_range_index()
+        affected = set()
+        fired = set()
+        trees = {}
+        pending = list(edited)
+        for key in self.dynamic:
+            affected.add(key)
+            pending.append(key)
+
+        def add(dependents):
+            for dependent in dependents:
+                if dependent not in affected:
+                    affected.add(dependent)
+                    pending.append(dependent)
+
+        while pending:
+            key = pending.pop()
+            add(self._cell_dependents.get(key, ()))
+            sheet, row, column = _unkey(key)
+
+            index = self._column_ranges.get((sheet, column))
+            if index is not None:
+                tree = trees.get((sheet, column))
+                if tree is None:
+                    tree = trees[(sheet, column)] = index.tree.copy()
+                for range_id in index.take_containing(tree, row):
+                    if range_id not in fired:
+                        fired.add(range_id)
+                        add(self._range_dependents[range_id])
+
+            for range_id in self._wide_ranges.get(sheet, ()):
+                if range_id not in fired:
+                    _, row1, column1, row2, column2 = self._ranges[range_id]
+                    if row1 <= row <= row2 and column1 <= column <= column2:
+                        fired.add(range_id)
+                        add(self._range_dependents[range_id])
+        return affected
+
+    def _build_range_index(self):
+        entries = defaultdict(list)
+        self._wide_ranges = defaultdict(list)
+        for range_id, (sheet, row1, column1, row2, column2) in enumerate(self._ranges):
+            if column2 - column1 >= WIDE_RANGE_COLUMNS:
+                self._wide_ranges[sheet].append(range_id)
+            else:
+                for column in range(column1, column2 + 1):
+                    entries[(sheet, column)].append((row1, row2, range_id))
+        self._column_ranges = {key: _ColumnRanges(ranges) for key, ranges in entries.items()}
+
+    def _error_upstream(self, node):
+        """
+        Return the nodes an error at node can come from
+
+        Nodes are cell keys, or ~range_id for ranges. A formula cell's upstream
+        is the error cells and the ranges it reads; a range's upstream is the
+        error cells inside it. Giving ranges their own node means the errors
+        inside a range are collected once, however many formulas read it.
+        """
+        if node >= 0:
+            cells, ranges = self._formulas.get(node, ((), ()))
+            upstream = [cell for cell in cells if cell in self.errors]
+            upstream.extend(~range_id for range_id in ranges)
+            return upstream
+
+        if self._error_rows is None:
+            self._build_error_index()
+        sheet, row1, column1, row2, column2 = self._ranges[~node]
+        upstream = []
+        columns = self._error_columns.get(sheet, [])
+        for column in columns[bisect.bisect_left(columns, column1):bisect.bisect_right(columns, column2)]:
+            rows = self._error_rows[(sheet, column)]
+            for row in rows[bisect.bisect_left(rows, row1):bisect.bisect_right(rows, row2)]:
+                upstream.append(_key(sheet, row, column))
+        return upstream
+
+    def _build_error_index(self):
+        rows = defaultdict(list)
+        for key in self.errors:
+            sheet, row, column = _unkey(key)
+            rows[(sheet, column)].append(row)
+        columns = defaultdict(list)
+        for (sheet, column), column_rows in rows.items():
+            column_rows.sort()
+            columns[sheet].append(column)
+        for sheet_columns in columns.values():
+            sheet_columns.sort()
+        self._error_rows = rows
+        self._error_columns = columns
+
+    def _root_causes(self, key, memo):
+        """Return the root error cells of an error cell, memoizing every node visited"""
+        if key in memo:
+            return memo[key]
+        stack = [(key, self._error_upstream(key), 0)]
+        active = {key}
+        while stack:
+            node, upstream, position = stack[-1]
+            if position < len(upstream):
+                stack[-1] = (node, upstream, position + 1)
+                previous = upstream[position]
+                if previous not in memo and previous not in active:
+                    active.add(previous)
+                    stack.append((previous, self._error_upstream(previous), 0))
+                continue
+            stack.pop()
+            active.discard(node)
+            # Nodes still being visited are part of a cycle and add nothing
+            roots = [memo[p] for p in upstream if memo.get(p)]
+            if len(roots) == 1:
+                memo[node] = roots[0]
+            elif roots:
+                memo[node] = frozenset().union(*roots)
+            elif node >= 0:
+                memo[node] = frozenset((node,))  # No error upstream: the error starts here
+            else:
+                memo[node] = frozenset()  # A range without errors
+        return memo[key]
+
+    # Locations
+
+    def _parse_location(self, ref):
+        """Return the cell keys of a 'Sheet!A1' or 'Sheet!A1:B2' location"""
+        sheet_name, _, area = ref.rpartition('!')
+        if sheet_name.startswith("'") and sheet_name.endswith("'"):
+            sheet_name = sheet_name[1:-1].replace("''", "'")
+        sheet = self._sheet_indexes.get(sheet_name.lower()) if sheet_name else 0
+        if sheet is None:
+            raise ValueError(f'Unknown sheet in {ref!r}')
+        if not re.fullmatch(r'\$?[A-Za-z]{1,3}\$?\d+(:\$?[A-Za-z]{1,3}\$?\d+)?', area):
+            raise ValueError(f'Not a cell or range reference: {ref!r}')
+        return _area_keys(sheet, area)
+
+    def _location(self, key):
+        sheet, row, column = _unkey(key)
+        return f'{self.sheets[sheet]}!{column_letter(column)}{row}'
+
+    def _range_location(self, range_id):
+        sheet, row1, column1, row2, column2 = self._ranges[range_id]
+        return f'{self.sheets[sheet]}!{column_letter(column1)}{row1}:{column_letter(column2)}{row2}'
+
+
+class _ColumnRanges:
+    """
+    The ranges covering one column, sorted by first row
+
+    A segment tree holds the largest last row per node, so all ranges that
+    contain a row are found without scanning ranges that end above it.
+    """
+
+    def __init__(self, entries):
+        entries.sort()
+        self.first_rows = [first for first, _, _ in entries]
+        self.range_ids = [range_id for _, _, range_id in entries]
+        self.size = 1
+        while self.size < len(entries):
+            self.size *= 2
+        self.tree = [0] * (2 * self.size)
+        self.tree[self.size:self.size + len(entries)] = [last for _, last, _ in entries]
+        for node in range(self.size - 1, 0, -1):
+            self.tree[node] = max(self.tree[2 * node], self.tree[2 * node + 1])
+
+    def take_containing(self, tree, row):
+        """
+        Return the ids of ranges in tree that contain row, removing them from tree
+
+        tree is a copy of self.tree owned by one query, so each range is
+        returned at most once per query.
+        """
+        limit = bisect.bisect_right(self.first_rows, row)
+        found = []
+        stack = [(1, 0, self.size)]
+        while stack:
+            node, low, high = stack.pop()
+            if low >= limit or tree[node] < row:
+                continue
+            if high - low == 1:
+                found.append(self.range_ids[low])
+                tree[node] = 0
+                while node > 1:
+                    node //= 2
+                    tree[node] = max(tree[2 * node], tree[2 * node + 1])
+                continue
+            middle = (low + high) // 2
+            stack.append((2 * node, low, middle))
+            stack.append((2 * node + 1, middle, high))
+        return found
+
+
+def _key(sheet, row, column):
+    return (sheet << 35) | (row << 14) | column
+
+
+def _unkey(key):
+    return key >> 35, (key >> 14) & 0x1FFFFF, key & 0x3FFF
+
+
+def _area_keys(sheet, area):
+    """Return the keys of every cell in an 'A1' or 'A1:B2' area of a sheet"""
+    row1, column1, row2, column2, _ = _parse_area(area)
+    return [
+        _key(sheet, row, column)
+        for row in range(min(row1, row2), max(row1, row2) + 1)
+        for column in range(min(column1, column2), max(column1, column2) + 1)
+    ]
+
+
+def _parse_area(area):
+    """Return (row1, column1, row2, column2, fixed) for 'A1' or '$A$1:B2'"""
+    first, _, last = area.partition(':')
+    column_fixed1, letters1, row_fixed1, row1 = _CELL_RE.fullmatch(first).groups()
+    column_fixed2, letters2, row_fixed2, row2 = _CELL_RE.fullmatch(last or first).groups()
+    return (int(row1), _column_number(letters1), int(row2), _column_number(letters2),
+            _fixed_flags(row_fixed1, column_fixed1, row_fixed2, column_fixed2))
+
+
+def _fixed_flags(row_fixed1, column_fixed1, row_fixed2, column_fixed2):
+    """Return the _FIXED_* flags for the '$' markers of a reference"""
+    return ((_FIXED_ROW1 if row_fixed1 else 0) | (_FIXED_COLUMN1 if column_fixed1 else 0)
+            | (_FIXED_ROW2 if row_fixed2 else 0) | (_FIXED_COLUMN2 if column_fixed2 else 0))
+
+
+_column_numbers = {}
+
+
+def _column_number(letters):
+    """Return the 1-based column number of column letters, memoized"""
+    number = _column_numbers.get(letters)
+    if number is None:
+        number = _column_numbers[letters] = column_index(letters.upper())
+    return number
+
+
+def _shift_all(references, rows, columns):
+    """Shift the relative parts of references as when copying a formula, dropping any pushed off the sheet"""
+    if not rows and not columns:
+        return references
+    shifted = []
+    for sheets, row1, column1, row2, column2, fixed in references:
+        if not fixed & _FIXED_ROW1:
+            row1 += rows
+        if not fixed & _FIXED_COLUMN1:
+            column1 += columns
+        if not fixed & _FIXED_ROW2:
+            row2 += rows
+        if not fixed & _FIXED_COLUMN2:
+            column2 += columns
+        if (1 <= min(row1, row2) and max(row1, row2) <= MAX_ROW
+                and 1 <= min(column1, column2) and max(column1, column2) <= MAX_COLUMN):
+            shifted.append((sheets, row1, column1, row2, column2, fixed))
+    return shifted
+
+
+def _read_defined_names(zf):
+    """Return {(NAME, local sheet index or None): formula text} from workbook.xml"""
+    workbook = ElementTree.fromstring(zf.read('xl/workbook.xml'))
+    names = {}
+    for defined_name in workbook.iter(f'{SPREADSHEET_NS}definedName'):
+        local_sheet = defined_name.get('localSheetId')
+        scope = int(local_sheet) if local_sheet is not None else None
+        names[(defined_name.get('name', '').upper(), scope)] = defined_name.text or ''
+    return names
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Report error root causes, or the cells affected by an edit, '
+                    'from the formula dependency graph of an Excel file'
+    )
+    parser.add_argument('excel_file', help='Excel file (.xlsx/.xlsm)')
+    parser.add_argument('--affected', nargs='+', metavar='REF',
+                        help="Edited cells or ranges, e.g. Sheet1!B2 'Sheet 2'!C1:C10")
+    args = parser.parse_args()
+
+    try:
+        graph = FormulaGraph.from_workbook(args.excel_file)
+        if args.affected:
+            affected = graph.affected_by(args.affected)
+            result = {
+                'edited': args.affected,
+                'needs_recalc': bool(affected) or any(graph.is_formula(ref) for ref in args.affected),
+                'total_affected': len(affected),
+                'affected': affected
+            }
+        else:
+            result = {
+                'total_formulas': graph.formula_count,
+                'total_errors': len(graph.errors),
+                'errors': graph.error_report()
+            }
+    except (OSError, KeyError, ValueError, zipfile.BadZipFile, ElementTree.ParseError) as e:
+        result = {'error': str(e)}
+
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,16 +1,34 @@
 #!/usr/bin/env python3
 """
 Excel Formula Recalculation Script
-Recalculates all formulas in an Excel file using LibreOffice
+Recalculates all formulas in an Excel file, in-process when evaluator.py supports
+every formula and with LibreOffice otherwise
 """
 
+import argparse
+import concurrent.futures
 import json
 import sys
 import subprocess
+import threading
 import os
 import platform
+import posixpath
+import time
+import zipfile
 from pathlib import Path
-from openpyxl import load_workbook
+from xml.etree import ElementTree
+from soffice import RECALC_MACRO, RECALC_MACRO_URL, SofficePool
+
+# Workbook extensions picked up when a directory is given to --batch
+WORKBOOK_EXTENSIONS = ('.xlsx', '.xlsm')
+
+EXCEL_ERRORS = ['#VALUE!', '#DIV/0!', '#REF!', '#NAME?', '#NULL!', '#NUM!', '#N/A']
+MAX_LOCATIONS = 20  # Locations reported per error type
+
+SPREADSHEET_NS = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+RELATIONSHIPS_NS = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+PACKAGE_RELATIONSHIPS_NS = '{http://schemas.openxmlformats.org/package/2006/relationships}'
 
 
 def setup_libreoffice_macro():
@@ -32,46 +50,22 @@ def setup_libreoffice_macro():
                       capture_output=True, timeout=10)
         os.makedirs(macro_dir, exist_ok=True)
     
-    macro_content = '''<?xml version="1.0" encoding="UTF-8"?>
-<!DOCTYPE script:module PUBLIC "-//OpenOffice.org//DTD OfficeDocument 1.0//EN" "module.dtd">
-<script:module xmlns:script="http://openoffice.org/2000/script" script:name="Module1" script:language="StarBasic">
-    Sub RecalculateAndSave()
-      ThisComponent.calculateAll()
-      ThisComponent.store()
-      ThisComponent.close(True)
-    End Sub
-</script:module>'''
-    
     try:
         with open(macro_file, 'w') as f:
-            f.write(macro_content)
+            f.write(RECALC_MACRO)
         return True
     except Exception:
         return False
 
 
-def recalc(filename, timeout=30):
-    """
-    Recalculate formulas in Excel file and report any errors
-    
-    Args:
-        filename: Path to Excel file
-        timeout: Maximum time to wait for recalculation (seconds)
-    
-    Returns:
-        dict with error locations and counts
-    """
-    if not Path(filename).exists():
-        return {'error': f'File {filename} does not exist'}
-    
-    abs_path = str(Path(filename).absolute())
-    
+def _recalc_with_soffice(abs_path, timeout):
+    """Run the recalculation macro in a new soffice process, returning an error dict on failure"""
     if not setup_libreoffice_macro():
         return {'error': 'Failed to setup LibreOffice macro'}
     
     cmd = [
         'soffice', '--headless', '--norestore',
-        'vnd.sun.star.script:Standard.Module1.RecalculateAndSave?language=Basic&location=application',
+        RECALC_MACRO_URL,
         abs_path
     ]
     
@@ -98,79 +92,348 @@ def recalc(filename, timeout=30):
         else:
             return {'error': error_msg}
     
+    return None
+
+
+def recalc(filename, timeout=30, pool=None, evaluate=True):
+    """
+    Recalculate formulas in Excel file and report any errors
+    
+    Workbooks whose formulas only use what evaluator.py supports are evaluated
+    in-process, without starting LibreOffice; all others are recalculated with
+    LibreOffice. Either way the cached values are written back into the file.
+    
+    Args:
+        filename: Path to Excel file
+        timeout: Maximum time to wait for recalculation (seconds)
+        pool: Optional soffice.SofficePool; recalculates on one of its warm
+            LibreOffice instances instead of starting soffice
+        evaluate: Try the in-process evaluator first (default: True)
+    
+    Returns:
+        dict with error locations and counts
+    """
+    if not Path(filename).exists():
+        return {'error': f'File {filename} does not exist'}
+    
+    abs_path = str(Path(filename).absolute())
+    
+    if evaluate and _evaluate_in_process(abs_path):
+        # Cached values are already written; LibreOffice is not needed
+        pass
+    elif pool is not None:
+        try:
+            pool.recalc(abs_path, timeout=timeout)
+        except Exception as e:
+            return {'error': str(e) or type(e).__name__}
+    else:
+        error = _recalc_with_soffice(abs_path, timeout)
+        if error:
+            return error
+    
     # Check for Excel errors in the recalculated file - scan ALL cells
     try:
-        wb = load_workbook(filename, data_only=True)
-        
-        excel_errors = ['#VALUE!', '#DIV/0!', '#REF!', '#NAME?', '#NULL!', '#NUM!', '#N/A']
-        error_details = {err: [] for err in excel_errors}
-        total_errors = 0
-        
-        for sheet_name in wb.sheetnames:
-            ws = wb[sheet_name]
-            # Check ALL rows and columns - no limits
-            for row in ws.iter_rows():
-                for cell in row:
-                    if cell.value is not None and isinstance(cell.value, str):
-                        for err in excel_errors:
-                            if err in cell.value:
-                                location = f"{sheet_name}!{cell.coordinate}"
-                                error_details[err].append(location)
-                                total_errors += 1
-                                break
-        
-        wb.close()
-        
-        # Build result summary
-        result = {
-            'status': 'success' if total_errors == 0 else 'errors_found',
-            'total_errors': total_errors,
-            'error_summary': {}
-        }
-        
-        # Add non-empty error categories
-        for err_type, locations in error_details.items():
-            if locations:
-                result['error_summary'][err_type] = {
-                    'count': len(locations),
-                    'locations': locations[:20]  # Show up to 20 locations
-                }
-        
-        # Add formula count for context - also check ALL cells
-        wb_formulas = load_workbook(filename, data_only=False)
-        formula_count = 0
-        for sheet_name in wb_formulas.sheetnames:
-            ws = wb_formulas[sheet_name]
-            for row in ws.iter_rows():
-                for cell in row:
-                    if cell.value and isinstance(cell.value, str) and cell.value.startswith('='):
-                        formula_count += 1
-        wb_formulas.close()
-        
-        result['total_formulas'] = formula_count
-        
-        return result
-        
+        error_counts, error_locations, formula_count = scan_workbook(filename)
     except Exception as e:
         return {'error': str(e)}
+    
+    total_errors = sum(error_counts.values())
+    
+    # Build result summary
+    result = {
+        'status': 'success' if total_errors == 0 else 'errors_found',
+        'total_errors': total_errors,
+        'error_summary': {}
+    }
+    
+    # Add non-empty error categories
+    for err_type, count in error_counts.items():
+        if count:
+            result['error_summary'][err_type] = {
+                'count': count,
+                'locations': error_locations[err_type]
+            }
+    
+    # Add formula count for context
+    result['total_formulas'] = formula_count
+    
+    return result
+
+
+def _evaluate_in_process(abs_path):
+    """
+    Evaluate the formulas with evaluator.py and write back their cached values
+    
+    Returns False, leaving the file unchanged, when the workbook needs LibreOffice
+    """
+    try:
+        # Imported here, as evaluator.py imports this module
+        from evaluator import evaluate_workbook
+    except ImportError:
+        # NumPy is not installed
+        return False
+    try:
+        evaluate_workbook(abs_path)
+    except Exception:
+        # UnsupportedFormula, or anything else the evaluator cannot read; LibreOffice decides
+        return False
+    return True
+
+
+def scan_workbook(filename, max_locations=MAX_LOCATIONS):
+    """
+    Count formulas and cached Excel errors in one streaming pass over the sheet XML
+    
+    Cells are read straight from the worksheet parts without loading the
+    workbook, so memory use does not grow with the sheet size. Errors are
+    cells with a cached error value (t="e"); only the first max_locations
+    locations of each error type are kept, the rest are just counted.
+    
+    Args:
+        filename: Path to Excel file
+        max_locations: Maximum locations kept per error type
+    
+    Returns:
+        (error_counts, error_locations, formula_count) where error_counts and
+        error_locations are keyed by error type, in EXCEL_ERRORS order
+    """
+    error_counts = dict.fromkeys(EXCEL_ERRORS, 0)
+    error_locations = {err: [] for err in EXCEL_ERRORS}
+    formula_count = 0
+    
+    cell_tag = f'{SPREADSHEET_NS}c'
+    formula_tag = f'{SPREADSHEET_NS}f'
+    row_tag = f'{SPREADSHEET_NS}row'
+    sheet_data_tag = f'{SPREADSHEET_NS}sheetData'
+    value_tag = f'{SPREADSHEET_NS}v'
+    
+    with zipfile.ZipFile(filename) as zf:
+        for sheet_name, part in worksheet_parts(zf):
+            if part not in zf.NameToInfo:
+                continue
+            with zf.open(part) as stream:
+                sheet_data = None
+                row_number = 0
+                column = 0
+                for event, elem in ElementTree.iterparse(stream, events=('start', 'end')):
+                    tag = elem.tag
+                    if event == 'start':
+                        if tag == row_tag:
+                            row_number = int(elem.get('r') or row_number + 1)
+                            column = 0
+                        elif tag == sheet_data_tag:
+                            sheet_data = elem
+                    elif tag == formula_tag:
+                        formula_count += 1
+                    elif tag == cell_tag:
+                        ref = elem.get('r')
+                        if ref:
+                            column = column_index(ref)
+                        else:
+                            # Cell references are optional; cells then follow each other
+                            column += 1
+                        if elem.get('t') == 'e':
+                            value = elem.findtext(value_tag)
+                            if value in error_counts:
+                                error_counts[value] += 1
+                                locations = error_locations[value]
+                                if len(locations) < max_locations:
+                                    locations.append(
+                                        f"{sheet_name}!{ref or column_letter(column) + str(row_number)}"
+                                    )
+                    elif tag == row_tag and sheet_data is not None:
+                        # Drop finished rows so memory stays flat
+                        sheet_data.remove(elem)
+    
+    return error_counts, error_locations, formula_count
+
+
+def worksheet_parts(zf):
+    """Return (sheet name, part name) for each sheet of the workbook, in tab order"""
+    workbook = ElementTree.fromstring(zf.read('xl/workbook.xml'))
+    rels = ElementTree.fromstring(zf.read('xl/_rels/workbook.xml.rels'))
+    targets = {
+        rel.get('Id'): rel.get('Target')
+        for rel in rels.iter(f'{PACKAGE_RELATIONSHIPS_NS}Relationship')
+    }
+    parts = []
+    for sheet in workbook.iter(f'{SPREADSHEET_NS}sheet'):
+        target = targets.get(sheet.get(f'{RELATIONSHIPS_NS}id'))
+        if target is None:
+            continue
+        if target.startswith('/'):
+            part = target.lstrip('/')
+        else:
+            part = posixpath.normpath(posixpath.join('xl', target))
+        parts.append((sheet.get('name'), part))
+    return parts
+
+
+def column_index(ref):
+    """Return the 1-based column number of a cell reference such as 'AB12'"""
+    index = 0
+    for char in ref:
+        if char.isdigit():
+            break
+        index = index * 26 + ord(char) - 64
+    return index
+
+
+def column_letter(index):
+    """Return the column letters for a 1-based column number"""
+    letters = ''
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def find_workbooks(paths):
+    """
+    Expand files and directories into a sorted list of workbook paths
+    
+    Directories contribute their .xlsx/.xlsm files (not recursive), skipping
+    Office lock files such as ~$report.xlsx.
+    """
+    workbooks = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            workbooks.extend(sorted(
+                child for child in path.iterdir()
+                if child.suffix.lower() in WORKBOOK_EXTENSIONS and not child.name.startswith('~$')
+            ))
+        else:
+            workbooks.append(path)
+    return workbooks
+
+
+def recalc_batch(paths, jobs=1, timeout=30, evaluate=True):
+    """
+    Recalculate many workbooks through one set of warm LibreOffice instances
+    
+    LibreOffice is started once, with `jobs` instances working in parallel,
+    instead of once per workbook, and only when the first workbook the
+    in-process evaluator cannot handle comes up.
+    
+    Args:
+        paths: Workbook files and/or directories of workbooks
+        jobs: Number of workbooks recalculated in parallel
+        timeout: Maximum time to wait for each recalculation (seconds)
+        evaluate: Try the in-process evaluator first (default: True)
+    
+    Yields:
+        recalc() result dict per workbook, in completion order, with the
+        workbook path under 'file' and the time it took under 'seconds'
+    """
+    workbooks = find_workbooks(paths)
+    if not workbooks:
+        return
+    
+    def run(path):
+        start = time.perf_counter()
+        result = recalc(str(path), timeout, pool, evaluate)
+        return {'file': str(path), **result, 'seconds': round(time.perf_counter() - start, 3)}
+    
+    jobs = max(1, min(jobs, len(workbooks)))
+    with _LazyPool(size=jobs, timeout=timeout) as pool:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as executor:
+            futures = [executor.submit(run, path) for path in workbooks]
+            try:
+                for future in concurrent.futures.as_completed(futures):
+                    yield future.result()
+            except BaseException:
+                # Don't let queued workbooks be recalculated after the caller stopped reading
+                executor.shutdown(cancel_futures=True)
+                raise
+
+
+class _LazyPool:
+    """SofficePool that starts LibreOffice on the first recalc() call
+    
+    Startup is attempted only once: if it fails, the error is kept in
+    start_error and re-raised by every later recalc() call, so each workbook
+    that needs LibreOffice fails with it while the others are still evaluated.
+    """
+    
+    def __init__(self, **kwargs):
+        self._kwargs = kwargs
+        self._pool = None
+        self._lock = threading.Lock()
+        self.start_error = None
+    
+    def recalc(self, path, timeout=None):
+        with self._lock:
+            if self.start_error is not None:
+                raise self.start_error
+            if self._pool is None:
+                try:
+                    self._pool = SofficePool(**self._kwargs)
+                except (OSError, RuntimeError) as e:
+                    self.start_error = RuntimeError(f'LibreOffice could not be started: {e}')
+                    raise self.start_error from e
+        return self._pool.recalc(path, timeout=timeout)
+    
+    def close(self):
+        if self._pool is not None:
+            self._pool.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def batch_main(argv):
+    parser = argparse.ArgumentParser(
+        prog='recalc.py --batch',
+        description='Recalculate many Excel files with one LibreOffice session, '
+                    'printing one JSON result per line'
+    )
+    parser.add_argument('paths', nargs='+', help='Excel files or directories containing them')
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='Number of workbooks recalculated in parallel (default: 1)')
+    parser.add_argument('--timeout', type=int, default=30,
+                        help='Maximum seconds per workbook (default: 30)')
+    parser.add_argument('--libreoffice', action='store_true',
+                        help='Always recalculate with LibreOffice, skipping the in-process evaluator')
+    args = parser.parse_args(argv)
+    
+    failed = False
+    for result in recalc_batch(args.paths, args.jobs, args.timeout, not args.libreoffice):
+        failed = failed or 'error' in result
+        print(json.dumps(result), flush=True)
+    sys.exit(1 if failed else 0)
 
 
 def main():
-    if len(sys.argv) < 2:
-        print("Usage: python recalc.py <excel_file> [timeout_seconds]")
-        print("\nRecalculates all formulas in an Excel file using LibreOffice")
+    if len(sys.argv) > 1 and sys.argv[1] == '--batch':
+        batch_main(sys.argv[2:])
+    
+    # --libreoffice skips the in-process evaluator
+    args = [arg for arg in sys.argv[1:] if arg != '--libreoffice']
+    evaluate = len(args) == len(sys.argv) - 1
+    
+    if not args:
+        print("Usage: python recalc.py <excel_file> [timeout_seconds] [--libreoffice]")
+        print("       python recalc.py --batch <excel_file_or_dir>... [--jobs N] [--timeout S] [--libreoffice]")
+        print("\nRecalculates all formulas in an Excel file, in-process when every formula")
+        print("uses supported functions (see evaluator.py) and with LibreOffice otherwise")
         print("\nReturns JSON with error details:")
         print("  - status: 'success' or 'errors_found'")
         print("  - total_errors: Total number of Excel errors found")
         print("  - total_formulas: Number of formulas in the file")
         print("  - error_summary: Breakdown by error type with locations")
         print("    - #VALUE!, #DIV/0!, #REF!, #NAME?, #NULL!, #NUM!, #N/A")
+        print("\nWith --batch, prints one JSON result per line per workbook, adding")
+        print("  - file: Path of the workbook")
+        print("  - seconds: Time taken for the workbook")
         sys.exit(1)
     
-    filename = sys.argv[1]
-    timeout = int(sys.argv[2]) if len(sys.argv) > 2 else 30
+    filename = args[0]
+    timeout = int(args[1]) if len(args) > 1 else 30
     
-    result = recalc(filename, timeout)
+    result = recalc(filename, timeout, evaluate=evaluate)
     print(json.dumps(result, indent=2))
 
 